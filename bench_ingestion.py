@@ -0,0 +1,90 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import tracemalloc
+from datetime import datetime, timedelta
+
+import openpyxl
+import pandas as pd
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from price_reversal_core.ingestion import load_excel
+from price_reversal_core.subsets import columns_for_mode
+
+
+def create_synthetic_workbook(file_path: str, rows: int, template_path: str):
+    """
+    Writes a workbook with the same header as the template, repeating its rows
+    across consecutive Reversal Dates until the requested row count is reached.
+    """
+    template = pd.read_excel(template_path)
+    header = list(template.columns)
+    records = list(template.itertuples(index=False, name=None))
+    date_idx = header.index('Reversal Date')
+
+    workbook = openpyxl.Workbook(write_only=True)
+    worksheet = workbook.create_sheet()
+    worksheet.append(header)
+    start = datetime(2025, 1, 1)
+    for i in range(rows):
+        record = list(records[i % len(records)])
+        # Real date cells, as in the uploads, so the benchmark parses the same cell types
+        record[date_idx] = start + timedelta(days=i // len(records))
+        worksheet.append([None if pd.isna(value) else value for value in record])
+    workbook.save(file_path)
+
+
+def measure(label: str, func, trace_memory: bool = False):
+    """
+    Runs func once and prints wall time. With trace_memory, peak traced memory is
+    measured in a second pass, since tracemalloc slows parsing down considerably.
+    """
+    start = time.perf_counter()
+    df = func()
+    elapsed = time.perf_counter() - start
+    line = f"  {label:<28} {elapsed:8.2f} s  rows {len(df)}  cols {len(df.columns)}"
+    if trace_memory:
+        del df
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        line += f"  peak {peak / 1024 / 1024:8.1f} MB"
+    print(line)
+
+
+def benchmark(file_path: str, mode: str, trace_memory: bool = False):
+    """
+    Times the full read, the cold streaming parse and a warm Parquet cache hit. The cache
+    lives in a temporary directory, so the parse rows never hit a cache and nothing is left on disk.
+    """
+    print(f"\nBenchmark: {file_path} ({os.path.getsize(file_path) / 1024 / 1024:.1f} MB)")
+    columns = columns_for_mode(mode)
+    measure("pd.read_excel (all columns)", lambda: pd.read_excel(file_path), trace_memory)
+    measure("load_excel (pruned, stream)", lambda: load_excel(file_path, columns=columns, use_cache=False), trace_memory)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        load_excel(file_path, columns=columns, cache_dir=cache_dir, use_cache=True)
+        measure("load_excel (cache hit)", lambda: load_excel(file_path, columns=columns, cache_dir=cache_dir, use_cache=True), trace_memory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark full vs. column-pruned streaming Excel ingestion.")
+    parser.add_argument("--mode", type=str, default="default", help="Subset mode whose columns are read.")
+    parser.add_argument("--rows", type=int, default=500000, help="Rows in the synthetic workbook.")
+    parser.add_argument("--skip-synthetic", action="store_true", help="Only benchmark the sample workbook.")
+    parser.add_argument("--trace-memory", action="store_true", help="Also report peak memory (slow).")
+    args = parser.parse_args()
+
+    sample_path = "SP500_2025-07-18.xlsx"
+    benchmark(sample_path, args.mode, args.trace_memory)
+
+    if not args.skip_synthetic:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            synthetic_path = os.path.join(tmp_dir, f"synthetic_{args.rows}.xlsx")
+            print(f"\nWriting synthetic workbook with {args.rows} rows...")
+            create_synthetic_workbook(synthetic_path, args.rows, sample_path)
+            benchmark(synthetic_path, args.mode, args.trace_memory)
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import random
+import argparse
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from price_reversal_core.markdown_flowables import markdown_to_paragraphs, report_styles
+
+_WORDS = (
+    "reversal momentum guidance earnings downgrade upgrade support resistance volume "
+    "capitulation sector macro catalyst sentiment outlook margin revenue analyst target"
+).split()
+
+
+def synthetic_section(rng: random.Random, index: int) -> str:
+    """One analysis block mixing the markdown a Gemini section typically contains."""
+    sentence = lambda n: " ".join(rng.choice(_WORDS) for _ in range(n))
+    rows = "\n".join(f"| SYM{index}{r} | {rng.randint(1, 10)} | **{sentence(3)}** |" for r in range(5))
+    return (
+        f"## {index}. {sentence(4).title()}\n"
+        f"{sentence(25)} with **{sentence(3)} *{sentence(2)}* {sentence(2)}** and `HR1 < -0.5`.\n\n"
+        f"1. {sentence(12)}\n2. {sentence(10)}\n   - {sentence(8)}\n* {sentence(9)}\n\n"
+        f"| Symbol | Risk | Thesis |\n|---|---|---|\n{rows}\n\n"
+        f"```\nexpected_move = {rng.random():.3f}\n```\n\n"
+    )
+
+
+def synthetic_markdown(size_kb: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts, length, index = [], 0, 0
+    while length < size_kb * 1024:
+        parts.append(synthetic_section(rng, index))
+        length += len(parts[-1])
+        index += 1
+    return "".join(parts)
+
+
+def benchmark(size_kb: int, repeat: int):
+    text = synthetic_markdown(size_kb)
+    best = None
+    for _ in range(repeat):
+        styles = report_styles()
+        start = time.perf_counter()
+        flowables = markdown_to_paragraphs(text, styles)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    per_kb = best * 1e6 / (len(text) / 1024)
+    print(f"  {len(text) / 1024:8.0f} KB  {best * 1000:9.1f} ms  {per_kb:8.1f} us/KB  {len(flowables):>7} flowables")
+    return per_kb
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark markdown to ReportLab flowable conversion on large model outputs.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 200, 400, 800], help="Markdown sizes in KB.")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per size; the fastest is reported.")
+    args = parser.parse_args()
+
+    print("Markdown conversion benchmark (time per KB should stay flat as size grows):")
+    costs = [benchmark(size_kb, args.repeat) for size_kb in args.sizes]
+    print(f"  Largest / smallest cost per KB: {costs[-1] / costs[0]:.2f}x")
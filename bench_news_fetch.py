@@ -0,0 +1,65 @@
+import io
+import os
+import sys
+import time
+import argparse
+from contextlib import redirect_stdout
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+# The benchmark never touches the live API, the response cache or the article store
+os.environ["NEWS_CACHE_ENABLED"] = "False"
+
+from price_reversal_core.news_fetcher import fetch_news_records
+from price_reversal_core.newsapi_replay import ReplayNewsApiClient
+
+
+def synthetic_companies(count: int):
+    """Companies with distinct symbols and search queries, as produced by normalization."""
+    return [{'Symbol': f"SYM{i:05d}", 'SearchQuery': f"Company {i:05d} Holdings"} for i in range(count)]
+
+
+def benchmark(count: int, args):
+    client = ReplayNewsApiClient(
+        recordings_dir=None,
+        articles_per_term=args.articles,
+        latency_ms=args.latency_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+    )
+    companies = synthetic_companies(count)
+    start = time.perf_counter()
+    # Per-company progress lines would drown the results
+    with redirect_stdout(io.StringIO()):
+        news_list = fetch_news_records(
+            companies,
+            max_workers=args.max_workers,
+            rate_per_sec=args.rate,
+            batch_size=args.batch_size,
+            incremental=False,
+            newsapi=client,
+        )
+    elapsed = time.perf_counter() - start
+    articles = sum(len(news.articles) for news in news_list)
+    failed = sum(1 for news in news_list if news.error is not None)
+    print(f"  {count:>6} symbols  {elapsed:8.2f} s  {client.calls:>6} calls  {client.calls / elapsed:7.1f} calls/s"
+          f"  {client.rate_limited:>4} x 429  {failed:>4} failed  {articles:>7} articles")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the news fetch stage against the offline NewsAPI replay client.")
+    parser.add_argument("--symbols", type=int, nargs="+", default=[500, 1000, 5000], help="Subset sizes to fetch.")
+    parser.add_argument("--rate", type=float, default=50.0, help="Token bucket rate in requests per second.")
+    parser.add_argument("--max-workers", type=int, default=16, help="Concurrent requests.")
+    parser.add_argument("--batch-size", type=int, default=1, help="Companies per batched query.")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Mean simulated response latency.")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Fraction of calls answered with a 429.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of calls failing with a server error.")
+    parser.add_argument("--articles", type=int, default=5, help="Synthetic articles per query term.")
+    args = parser.parse_args()
+
+    print(f"News fetch benchmark: rate {args.rate}/s, {args.max_workers} workers, batch size {args.batch_size}, "
+          f"latency {args.latency_ms} ms, 429 rate {args.rate_limit_rate}, error rate {args.error_rate}")
+    for count in args.symbols:
+        benchmark(count, args)
@@ -0,0 +1,82 @@
+import io
+import os
+import sys
+import time
+import datetime
+import argparse
+
+# Add project root to path
+sys.path.append(os.getcwd())
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph
+
+from bench_markdown import synthetic_markdown
+from price_reversal_core.markdown_flowables import markdown_to_paragraphs, report_styles
+from price_reversal_core.pdf_report_generator import PageFooter
+
+
+def legacy_footer(canvas_obj, doc):
+    """The former per-page footer, kept for comparison: styles, timestamp and paragraphs rebuilt on every page."""
+    canvas_obj.saveState()
+    advisory = "<i>This content was created with Artificial Intelligence</i>"
+    timestamp = f"<i>Generated on: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</i>"
+    styles = getSampleStyleSheet()
+    footer_style = ParagraphStyle('footer', parent=styles['Normal'], alignment=1, fontSize=8, leading=10, textColor=colors.gray)
+    canvas_obj.setFont('Helvetica', 8)
+    canvas_obj.setFillColor(colors.gray)
+    canvas_obj.drawString(inch, 0.75 * inch, f"Page {doc.page}")
+    for text, y in ((advisory, 0.85 * inch), (timestamp, 0.75 * inch)):
+        paragraph = Paragraph(text, footer_style)
+        text_width, _ = paragraph.wrapOn(canvas_obj, doc.width, doc.bottomMargin)
+        paragraph.drawOn(canvas_obj, doc.leftMargin + (doc.width - text_width) / 2.0, y)
+    canvas_obj.restoreState()
+
+
+class TimedFooter:
+    """Wraps a page callback and adds up the time spent in it."""
+
+    def __init__(self, footer):
+        self.footer = footer
+        self.seconds = 0.0
+
+    def __call__(self, canvas_obj, doc):
+        start = time.perf_counter()
+        self.footer(canvas_obj, doc)
+        self.seconds += time.perf_counter() - start
+
+
+def build(markdown: str, footer):
+    """
+    Builds the report body in memory with the given page callback.
+    Returns (build seconds, footer seconds, pages, PDF bytes).
+    """
+    styles = report_styles()
+    story = [Paragraph("Price Reversal News Summary - benchmark", styles['Title'])]
+    story.extend(markdown_to_paragraphs(markdown, styles))
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=inch/2, bottomMargin=inch)
+    timed = TimedFooter(footer)
+    start = time.perf_counter()
+    doc.build(story, onFirstPage=timed, onLaterPages=timed)
+    return time.perf_counter() - start, timed.seconds, doc.page, len(buffer.getvalue())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark doc.build of large reports with the legacy and the pre-rendered page footer.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[240, 480], help="Report body sizes in KB of markdown.")
+    parser.add_argument("--repeat", type=int, default=3, help="Builds per size and footer; the fastest is reported.")
+    args = parser.parse_args()
+
+    print("doc.build benchmark:")
+    for size_kb in args.sizes:
+        markdown = synthetic_markdown(size_kb)
+        results = {}
+        for name, make_footer in (("legacy", lambda: legacy_footer), ("cached", PageFooter)):
+            results[name] = min(build(markdown, make_footer()) for _ in range(args.repeat))
+            seconds, footer_seconds, pages, size = results[name]
+            print(f"  {size_kb:>5} KB  {name:>6}  {pages:>5} pages  build {seconds:7.2f} s"
+                  f"  footer {footer_seconds * 1000:8.1f} ms ({footer_seconds * 1e6 / pages:7.1f} us/page)  PDF {size / 1024:7.0f} KB")
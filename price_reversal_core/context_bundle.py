@@ -0,0 +1,201 @@
+import os
+import re
+import json
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import pypdf
+
+from price_reversal_core.watchlists import CONFIG_DIR, seed_watchlist
+
+# Primer text, parsed prompts and watchlists are compiled once into a JSON artifact and
+# reloaded from it until a source file changes.
+CONTEXT_BUNDLE_ENABLED = os.getenv("CONTEXT_BUNDLE_ENABLED", "True").lower() == "true"
+CONTEXT_BUNDLE_PATH = os.getenv("CONTEXT_BUNDLE_PATH", os.path.join("files", "cache", "context_bundle.json"))
+PRIMER_MD_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "prompts", "price_reversal_primer.md"))
+
+# Bump when parsing or normalization changes, so existing artifacts are rebuilt.
+BUNDLE_VERSION = 1
+
+_SPACES = re.compile(r"[ \t\u00a0]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+
+# (source stats, bundle) of the last bundle loaded by this process.
+_loaded = (None, None)
+_lock = threading.Lock()
+
+
+@dataclass(slots=True)
+class ContextBundle:
+    """The static report context: primer text, parsed prompts and watchlist symbols."""
+    primer_text: str
+    prompts: List[str]
+    watchlists: Dict[str, List[str]] = field(default_factory=dict)
+    rebuilt: List[str] = field(default_factory=list)
+
+
+def normalize_text(text: str) -> str:
+    """Collapses runs of spaces and blank lines, and trims each line."""
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = [_SPACES.sub(" ", line).strip() for line in text.split("\n")]
+    return _BLANK_LINES.sub("\n\n", "\n".join(lines)).strip()
+
+
+def split_prompts(text: str) -> List[str]:
+    """Prompts are separated by blank lines."""
+    return [p.strip() for p in text.split('\n\n') if p.strip()]
+
+
+def _read_text(path: str) -> str:
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        return f.read()
+
+
+def _read_pdf(path: str) -> str:
+    reader = pypdf.PdfReader(path)
+    return normalize_text("".join(page.extract_text() for page in reader.pages))
+
+
+def _read_watchlist(path: str) -> Optional[List[str]]:
+    """The symbols of a watchlist config, or None for config files that are not watchlists."""
+    with open(path, "r", encoding="utf-8") as f:
+        entries = json.load(f)
+    if not (isinstance(entries, list) and all(isinstance(entry, dict) and 'Ticker' in entry for entry in entries)):
+        return None
+    return sorted({str(entry['Ticker']).strip().upper() for entry in entries if entry.get('Ticker')})
+
+
+_PARSERS = {
+    "primer_md": lambda path: normalize_text(_read_text(path)),
+    "primer_pdf": _read_pdf,
+    "prompts": lambda path: split_prompts(_read_text(path)),
+    "config": _read_watchlist,
+}
+
+
+def _sources(primer_pdf_path: str, prompts_path: str, primer_md_path: str, config_dir: str) -> Dict[str, str]:
+    """Maps each source key to its path. Every JSON file in config is a candidate watchlist."""
+    sources = {"primer_md": primer_md_path, "primer_pdf": primer_pdf_path, "prompts": prompts_path}
+    if os.path.isdir(config_dir):
+        for filename in sorted(os.listdir(config_dir)):
+            if filename.endswith(".json"):
+                sources[f"config:{filename[:-len('.json')]}"] = os.path.join(config_dir, filename)
+    return sources
+
+
+def _stat(path: str) -> Optional[List[float]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return [st.st_mtime, st.st_size]
+
+
+def _sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _read_artifact(path: str) -> Dict:
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            artifact = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if artifact.get("version") != BUNDLE_VERSION:
+        return {}
+    return artifact.get("entries", {})
+
+
+def _write_artifact(path: str, entries: Dict):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({"version": BUNDLE_VERSION, "entries": entries}, f)
+    os.replace(tmp_path, path)
+
+
+def build_context_bundle(
+    primer_pdf_path: str,
+    prompts_path: str,
+    primer_md_path: str = PRIMER_MD_PATH,
+    config_dir: str = CONFIG_DIR,
+    bundle_path: Optional[str] = CONTEXT_BUNDLE_PATH
+) -> ContextBundle:
+    """
+    Loads the context bundle artifact, re-parsing only the sources that changed.
+    A source whose mtime or size differs from the artifact is hashed. If the hash still
+    matches, the stored entry is kept, as for a touched but unchanged file. Otherwise
+    the source is parsed again. Missing or unreadable sources contribute nothing and are
+    not stored, so they are retried on the next run. The artifact is rewritten only
+    when something changed. bundle_path=None parses every source without an artifact.
+    """
+    stored = _read_artifact(bundle_path) if bundle_path else {}
+    entries = {}
+    rebuilt = []
+    for key, path in _sources(primer_pdf_path, prompts_path, primer_md_path, config_dir).items():
+        stat = _stat(path)
+        if stat is None:
+            if key in ("primer_pdf", "prompts"):
+                print(f"Context bundle source not found: {path}")
+            continue
+        entry = stored.get(key)
+        if entry is not None and entry.get("path") == path and entry.get("stat") == stat:
+            entries[key] = entry
+            continue
+        digest = _sha256(path)
+        if entry is not None and entry.get("path") == path and entry.get("sha256") == digest:
+            entries[key] = dict(entry, stat=stat)
+            continue
+        try:
+            data = _PARSERS[key.split(":", 1)[0]](path)
+        except Exception as e:
+            print(f"Could not read {path} for the context bundle: {e}")
+            continue
+        entries[key] = {"path": path, "stat": stat, "sha256": digest, "data": data}
+        rebuilt.append(key)
+    if bundle_path and entries != stored:
+        _write_artifact(bundle_path, entries)
+
+    watchlists = {}
+    for key, entry in entries.items():
+        if key.startswith("config:") and entry["data"] is not None:
+            watchlists[key.split(":", 1)[1]] = entry["data"]
+            # Subset selection then finds the watchlist already loaded
+            seed_watchlist(entry["path"], entry["stat"][0], entry["data"])
+    primer_parts = [entries[key]["data"] for key in ("primer_md", "primer_pdf") if key in entries]
+    return ContextBundle(
+        primer_text="\n\n".join(part for part in primer_parts if part),
+        prompts=entries["prompts"]["data"] if "prompts" in entries else [],
+        watchlists=watchlists,
+        rebuilt=rebuilt,
+    )
+
+
+def load_context_bundle(primer_pdf_path: str, prompts_path: str, primer_md_path: str = PRIMER_MD_PATH) -> ContextBundle:
+    """
+    Returns the context bundle for these sources: the markdown and PDF primers as one
+    normalized text, the prompts split on blank lines, and the config watchlists.
+    Within a process the bundle is kept in memory and only re-checked when a source's
+    mtime or size changes. With CONTEXT_BUNDLE_ENABLED=False the sources are parsed
+    on every call and no artifact is written.
+    """
+    global _loaded
+    if not CONTEXT_BUNDLE_ENABLED:
+        return build_context_bundle(primer_pdf_path, prompts_path, primer_md_path, bundle_path=None)
+    with _lock:
+        sources = _sources(primer_pdf_path, prompts_path, primer_md_path, CONFIG_DIR)
+        stats = [(key, path, _stat(path)) for key, path in sources.items()]
+        if _loaded[0] != stats:
+            bundle = build_context_bundle(primer_pdf_path, prompts_path, primer_md_path)
+            if bundle.rebuilt:
+                print(f"Context bundle rebuilt for: {', '.join(bundle.rebuilt)}.")
+            _loaded = (stats, bundle)
+        return _loaded[1]
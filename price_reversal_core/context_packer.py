@@ -0,0 +1,198 @@
+import os
+import re
+import math
+import datetime
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional
+
+from price_reversal_core.news_records import NewsArticle, articles_path_for, read_articles_jsonl
+
+# Prompt budgets in estimated tokens (about 4 characters each); 2500 matches the former
+# 10000-character slices.
+REPORT_NEWS_TOKEN_BUDGET = int(os.getenv("REPORT_NEWS_TOKEN_BUDGET", 2500))
+REPORT_PRIMER_TOKEN_BUDGET = int(os.getenv("REPORT_PRIMER_TOKEN_BUDGET", 2500))
+# An article loses half of its recency score every this many days.
+NEWS_RECENCY_HALF_LIFE_DAYS = float(os.getenv("NEWS_RECENCY_HALF_LIFE_DAYS", 3))
+
+CHARS_PER_TOKEN = 4
+DESCRIPTION_CHARS = 200
+# Shorter tickers ("A", "ON", "IT") are everyday words; they only count as $ON or (ON).
+MIN_BARE_SYMBOL_CHARS = 3
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count for budgeting prompts, without a tokenizer."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def truncate_to_budget(text: str, budget: int) -> str:
+    """
+    Cuts text to the token budget at the last paragraph or sentence break that fits,
+    rather than mid-word.
+    """
+    limit = budget * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text
+    head = text[:limit]
+    for separator in ("\n\n", "\n", ". "):
+        cut = head.rfind(separator)
+        if cut > limit // 2:
+            return head[:cut + len(separator)].rstrip()
+    return head
+
+
+@dataclass(slots=True)
+class PackedContext:
+    """The packed news text and an account of what did not fit."""
+    text: str
+    tokens: int
+    budget: int
+    kept: int = 0
+    dropped: Dict[str, int] = field(default_factory=dict)
+    uncovered: List[str] = field(default_factory=list)
+
+    def summary(self) -> str:
+        dropped = sum(self.dropped.values())
+        line = f"News context: {self.kept} articles in {self.tokens}/{self.budget} tokens, {dropped} dropped"
+        if self.uncovered:
+            line += f"; no room for {len(self.uncovered)} symbols with news: {', '.join(self.uncovered[:10])}"
+            if len(self.uncovered) > 10:
+                line += ", ..."
+        return line + "."
+
+
+def _published(article: NewsArticle) -> Optional[datetime.datetime]:
+    try:
+        published = datetime.datetime.fromisoformat(article.publishedAt.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+    # NewsAPI timestamps are UTC
+    return published if published.tzinfo else published.replace(tzinfo=datetime.timezone.utc)
+
+
+def score_article(article: NewsArticle, pattern: Optional[re.Pattern], now: datetime.datetime, half_life_days: float = NEWS_RECENCY_HALF_LIFE_DAYS) -> float:
+    """
+    Relevance plus recency. Relevance counts 1 when the company pattern (see
+    company_pattern) matches the title and 0.5 when it only matches the description;
+    recency decays from 1 with the article's age.
+    """
+    relevance = 0.0
+    if pattern is not None:
+        if pattern.search(article.title or ''):
+            relevance = 1.0
+        elif pattern.search(article.description or ''):
+            relevance = 0.5
+    published = _published(article)
+    recency = 0.0
+    if published is not None:
+        age_days = max((now - published).total_seconds() / 86400, 0.0)
+        recency = math.pow(0.5, age_days / half_life_days)
+    return relevance + recency
+
+
+def render_article(article: NewsArticle, with_description: bool = True) -> str:
+    """One compact line per article: date, source, title and the start of the description."""
+    line = f"- {article.publishedAt[:10]} {article.source}: {article.title}"
+    if with_description and article.description:
+        description = article.description.strip()
+        if len(description) > DESCRIPTION_CHARS:
+            description = description[:DESCRIPTION_CHARS].rsplit(' ', 1)[0] + "..."
+        line += f" - {description}"
+    return line + "\n"
+
+
+def company_pattern(company: Dict) -> Optional[re.Pattern]:
+    """
+    One precompiled pattern naming the company: its SearchQuery or Company Name as whole
+    words in any case, or its Symbol as $SYM or (SYM). Symbols of MIN_BARE_SYMBOL_CHARS
+    or more also match as a bare upper-case word. None when the company has no terms.
+    """
+    names = {" ".join(str(company.get(key)).split()) for key in ('SearchQuery', 'Company Name') if company.get(key)}
+    alternatives = [rf"(?i:(?<!\w){re.escape(name)}(?!\w))" for name in sorted(names) if name]
+    symbol = str(company.get('Symbol') or '').strip().upper()
+    if symbol:
+        escaped = re.escape(symbol)
+        alternatives.append(rf"\${escaped}(?!\w)|\({escaped}\)")
+        if len(symbol) >= MIN_BARE_SYMBOL_CHARS:
+            alternatives.append(rf"(?<![\w$]){escaped}(?!\w)")
+    return re.compile("|".join(alternatives)) if alternatives else None
+
+
+def pack_articles(
+    articles: Iterable[NewsArticle],
+    companies: List[Dict],
+    budget: int = REPORT_NEWS_TOKEN_BUDGET,
+    now: datetime.datetime = None
+) -> PackedContext:
+    """
+    Fills the token budget fairly across symbols: each round adds every symbol's best
+    remaining article (by score_article) that still fits, so all symbols get their top
+    story before any symbol gets a second one. When the top stories of all symbols would
+    not fit with descriptions, headlines are packed alone so more symbols are covered.
+    Symbols keep the order of companies.
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    patterns = {company.get('Symbol'): company_pattern(company) for company in companies}
+    by_symbol: Dict[str, List[NewsArticle]] = {}
+    for article in articles:
+        by_symbol.setdefault(article.symbol, []).append(article)
+
+    queues = {}
+    for symbol in list(patterns) + [s for s in by_symbol if s not in patterns]:
+        candidates = by_symbol.get(symbol)
+        if candidates:
+            pattern = patterns.get(symbol) or company_pattern({'Symbol': symbol})
+            scored = [(score_article(article, pattern, now), i, article) for i, article in enumerate(candidates)]
+            queues[symbol] = [article for _, _, article in sorted(scored, key=lambda entry: (-entry[0], entry[1]))]
+
+    headers = {symbol: f"\n## {symbol}\n" for symbol in queues}
+    first_round = sum(estimate_tokens(headers[symbol]) + estimate_tokens(render_article(queue[0])) for symbol, queue in queues.items())
+    with_description = first_round <= budget
+    selected: Dict[str, List[str]] = {symbol: [] for symbol in queues}
+    used = 0
+    active = list(queues)
+    while active:
+        still_active = []
+        for symbol in active:
+            line = render_article(queues[symbol][0], with_description)
+            cost = estimate_tokens(line) + (0 if selected[symbol] else estimate_tokens(headers[symbol]))
+            if used + cost > budget:
+                # This symbol is done; other symbols' shorter lines may still fit
+                continue
+            used += cost
+            selected[symbol].append(line)
+            queues[symbol].pop(0)
+            if queues[symbol]:
+                still_active.append(symbol)
+        active = still_active
+
+    parts = []
+    packed = PackedContext(text="", tokens=used, budget=budget)
+    for symbol, lines in selected.items():
+        packed.dropped[symbol] = len(queues[symbol])
+        if lines:
+            parts.append(headers[symbol])
+            parts.extend(lines)
+            packed.kept += len(lines)
+        else:
+            packed.uncovered.append(symbol)
+    packed.dropped = {symbol: count for symbol, count in packed.dropped.items() if count}
+    packed.text = "".join(parts).lstrip("\n")
+    return packed
+
+
+def pack_news_context(news_summary_path: str, companies: List[Dict], budget: int = REPORT_NEWS_TOKEN_BUDGET) -> PackedContext:
+    """
+    Packs the articles saved next to a news summary into the budget. Recency is scored
+    against the time the articles were fetched and saved (the article file's mtime), not
+    the current time, so packing the same summary again gives the same text and the
+    report prompts stay cacheable. Summaries without an article file (written before
+    JSONL records existed) fall back to the text, cut at a line break within the budget.
+    """
+    articles_path = articles_path_for(news_summary_path)
+    if os.path.exists(articles_path):
+        fetched_at = datetime.datetime.fromtimestamp(os.path.getmtime(articles_path), datetime.timezone.utc)
+        return pack_articles(read_articles_jsonl(articles_path), companies, budget, now=fetched_at)
+    with open(news_summary_path, "r", encoding="utf-8", errors="replace") as f:
+        text = truncate_to_budget(f.read(), budget)
+    return PackedContext(text=text, tokens=estimate_tokens(text), budget=budget)
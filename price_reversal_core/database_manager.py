@@ -1,7 +1,7 @@
 import sqlite3
 import os
 from datetime import datetime
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Tuple
 
 DATABASE_NAME = "pipeline_metrics.db"
 DB_PATH = os.path.join(os.path.dirname(__file__), DATABASE_NAME)
@@ -26,6 +26,53 @@ def initialize_database():
                 created_at TEXT NOT NULL
             )
         """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS row_results (
+                symbol TEXT NOT NULL,
+                reversal_date TEXT NOT NULL,
+                search_query TEXT,
+                news_section TEXT,
+                input_filename TEXT NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (symbol, reversal_date)
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS news_watermarks (
+                symbol TEXT PRIMARY KEY,
+                search_query TEXT NOT NULL,
+                high_water_mark TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS news_articles (
+                symbol TEXT NOT NULL,
+                url TEXT NOT NULL,
+                published_at TEXT NOT NULL,
+                article TEXT NOT NULL,
+                PRIMARY KEY (symbol, url)
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS search_queries (
+                symbol TEXT PRIMARY KEY,
+                company_name TEXT,
+                search_query TEXT NOT NULL,
+                normalizer_version INTEGER NOT NULL,
+                updated_at TEXT NOT NULL
+            )
+        """)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS run_stats (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                input_filename TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                name TEXT NOT NULL,
+                value REAL,
+                created_at TEXT NOT NULL
+            )
+        """)
         conn.commit()
         print(f"Database '{DATABASE_NAME}' initialized successfully.")
     except sqlite3.Error as e:
@@ -76,3 +123,259 @@ def insert_metrics_record(
         if conn:
             conn.close()
 
+def insert_run_stats(input_filename: str, stage: str, stats: Dict[str, Any]):
+    """
+    Records per-run counters of a pipeline stage (e.g. how many names each normalization
+    path resolved) as one run_stats row per name.
+    """
+    if not stats:
+        return
+    conn = None
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        created_at = datetime.now().isoformat()
+        cursor.executemany("""
+            INSERT INTO run_stats (input_filename, stage, name, value, created_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, [(input_filename, stage, name, value, created_at) for name, value in stats.items()])
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Error inserting run stats: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+def upsert_row_results(input_filename: str, results: List[Dict[str, Any]]):
+    """
+    Stores the per-row normalization and news results of a run, keyed by symbol and
+    reversal date, so a later delta run can reuse them for unchanged rows.
+    Each result needs 'symbol', 'reversal_date', 'search_query' and 'news_section'
+    (the company's news serialized with CompanyNews.to_json).
+    """
+    conn = None
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+
+        updated_at = datetime.now().isoformat()
+
+        cursor.executemany("""
+            INSERT OR REPLACE INTO row_results (
+                symbol,
+                reversal_date,
+                search_query,
+                news_section,
+                input_filename,
+                updated_at
+            ) VALUES (?, ?, ?, ?, ?, ?)
+        """, [
+            (
+                result['symbol'],
+                result['reversal_date'],
+                result.get('search_query'),
+                result.get('news_section'),
+                input_filename,
+                updated_at
+            )
+            for result in results
+        ])
+        conn.commit()
+        print(f"Stored {len(results)} row results for run '{input_filename}'.")
+    except sqlite3.Error as e:
+        print(f"Error storing row results: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+def fetch_row_results(keys: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    """
+    Returns stored row results for the given (symbol, reversal_date) keys.
+    Keys without a stored result are omitted.
+    """
+    keys = list(keys)
+    results = {}
+    if not keys:
+        return results
+    conn = None
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        # Stay well under SQLite's bound-parameter limit
+        batch_size = 400
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            placeholders = ", ".join(["(?, ?)"] * len(batch))
+            params = [value for key in batch for value in key]
+            cursor.execute(f"""
+                SELECT symbol, reversal_date, search_query, news_section
+                FROM row_results
+                WHERE (symbol, reversal_date) IN (VALUES {placeholders})
+            """, params)
+            for symbol, reversal_date, search_query, news_section in cursor.fetchall():
+                results[(symbol, reversal_date)] = {
+                    'search_query': search_query,
+                    'news_section': news_section,
+                }
+    except sqlite3.Error as e:
+        print(f"Error fetching row results: {e}")
+    finally:
+        if conn:
+            conn.close()
+    return results
+
+def fetch_news_watermarks(symbols: Iterable[str]) -> Dict[str, Tuple[str, str]]:
+    """
+    Returns {symbol: (search_query, high_water_mark)} for the given symbols, where the
+    mark is the newest publishedAt stored for the symbol. A mark is only returned while
+    the article it was taken from is still stored, so a symbol whose articles were lost
+    is fetched in full again. Symbols never fetched are omitted.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    marks = {}
+    if not symbols:
+        return marks
+    conn = None
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        batch_size = 400
+        for start in range(0, len(symbols), batch_size):
+            batch = symbols[start:start + batch_size]
+            cursor.execute(f"""
+                SELECT w.symbol, w.search_query, w.high_water_mark
+                FROM news_watermarks w
+                WHERE w.symbol IN ({", ".join(["?"] * len(batch))})
+                AND EXISTS (
+                    SELECT 1 FROM news_articles a
+                    WHERE a.symbol = w.symbol AND a.published_at = w.high_water_mark
+                )
+            """, batch)
+            for symbol, search_query, high_water_mark in cursor.fetchall():
+                marks[symbol] = (search_query, high_water_mark)
+    except sqlite3.Error as e:
+        print(f"Error fetching news watermarks: {e}")
+    finally:
+        if conn:
+            conn.close()
+    return marks
+
+def fetch_stored_articles(symbols: Iterable[str], since: str) -> Dict[str, List[str]]:
+    """
+    Returns {symbol: [article JSON, ...]} for articles published at or after since,
+    newest first.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    articles = {}
+    if not symbols:
+        return articles
+    conn = None
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        batch_size = 400
+        for start in range(0, len(symbols), batch_size):
+            batch = symbols[start:start + batch_size]
+            cursor.execute(f"""
+                SELECT symbol, article
+                FROM news_articles
+                WHERE symbol IN ({", ".join(["?"] * len(batch))}) AND published_at >= ?
+                ORDER BY published_at DESC
+            """, batch + [since])
+            for symbol, article in cursor.fetchall():
+                articles.setdefault(symbol, []).append(article)
+    except sqlite3.Error as e:
+        print(f"Error fetching stored articles: {e}")
+    finally:
+        if conn:
+            conn.close()
+    return articles
+
+def store_news_articles(
+    articles: List[Tuple[str, str, str, str]],
+    watermarks: List[Tuple[str, str, str]],
+    prune_before: str = None,
+    replace_symbols: Iterable[str] = ()
+):
+    """
+    Stores fetched articles as (symbol, url, published_at, article JSON) rows and
+    the per-symbol (symbol, search_query, high_water_mark) marks in one transaction, so
+    a mark is never recorded without its articles. Stored articles of
+    replace_symbols are dropped first, for symbols whose full window was refetched.
+    Articles published before prune_before have left the news window and are deleted.
+    """
+    conn = None
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        cursor.executemany("DELETE FROM news_articles WHERE symbol = ?", [(symbol,) for symbol in replace_symbols])
+        cursor.executemany("""
+            INSERT OR REPLACE INTO news_articles (symbol, url, published_at, article)
+            VALUES (?, ?, ?, ?)
+        """, articles)
+        updated_at = datetime.now().isoformat()
+        cursor.executemany("""
+            INSERT OR REPLACE INTO news_watermarks (symbol, search_query, high_water_mark, updated_at)
+            VALUES (?, ?, ?, ?)
+        """, [mark + (updated_at,) for mark in watermarks])
+        if prune_before is not None:
+            cursor.execute("DELETE FROM news_articles WHERE published_at < ?", (prune_before,))
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Error storing news articles: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+def fetch_search_queries(symbols: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Returns the stored normalization of each symbol as {symbol: {'company_name',
+    'search_query', 'normalizer_version', 'updated_at'}}. Unknown symbols are omitted.
+    """
+    symbols = list(dict.fromkeys(symbols))
+    entries = {}
+    if not symbols:
+        return entries
+    conn = None
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        batch_size = 400
+        for start in range(0, len(symbols), batch_size):
+            batch = symbols[start:start + batch_size]
+            cursor.execute(f"""
+                SELECT symbol, company_name, search_query, normalizer_version, updated_at
+                FROM search_queries
+                WHERE symbol IN ({", ".join(["?"] * len(batch))})
+            """, batch)
+            for symbol, company_name, search_query, normalizer_version, updated_at in cursor.fetchall():
+                entries[symbol] = {
+                    'company_name': company_name,
+                    'search_query': search_query,
+                    'normalizer_version': normalizer_version,
+                    'updated_at': updated_at,
+                }
+    except sqlite3.Error as e:
+        print(f"Error fetching search queries: {e}")
+    finally:
+        if conn:
+            conn.close()
+    return entries
+
+def upsert_search_queries(entries: List[Tuple[str, str, str]], normalizer_version: int):
+    """Stores (symbol, company_name, search_query) normalizations made by the given normalizer version."""
+    conn = None
+    try:
+        conn = sqlite3.connect(DB_PATH)
+        cursor = conn.cursor()
+        updated_at = datetime.now().isoformat()
+        cursor.executemany("""
+            INSERT OR REPLACE INTO search_queries (symbol, company_name, search_query, normalizer_version, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+        """, [entry + (normalizer_version, updated_at) for entry in entries])
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"Error storing search queries: {e}")
+    finally:
+        if conn:
+            conn.close()
@@ -0,0 +1,97 @@
+import os
+import re
+import zlib
+from typing import Dict, List, Set, Tuple
+
+import numpy as np
+
+from price_reversal_core.news_records import CompanyNews, NewsArticle
+
+# Articles whose headlines share at least this fraction of character shingles are near-duplicates.
+# Rewordings of one story by different outlets score around 0.4-0.7, unrelated headlines below 0.1.
+NEWS_DEDUPE_ENABLED = os.getenv("NEWS_DEDUPE_ENABLED", "True").lower() == "true"
+NEWS_DEDUPE_THRESHOLD = float(os.getenv("NEWS_DEDUPE_THRESHOLD", 0.4))
+
+SHINGLE_SIZE = 5
+# 40 bands of 3 rows: pairs at the threshold become LSH candidates with ~94% probability,
+# unrelated pairs with well under 1%. Candidates are confirmed with exact Jaccard similarity.
+BANDS = 40
+ROWS = 3
+_PRIME = (1 << 31) - 1
+_rng = np.random.default_rng(20251208)
+_A = _rng.integers(1, _PRIME, size=BANDS * ROWS, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, size=BANDS * ROWS, dtype=np.uint64)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[str]:
+    """Character shingles of the lower-cased text with punctuation and extra whitespace removed."""
+    normalized = " ".join(re.sub(r"[^a-z0-9]+", " ", text.lower()).split())
+    if len(normalized) <= size:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def minhash(shingle_set: Set[str]) -> np.ndarray:
+    """MinHash signature of BANDS * ROWS values, from one universal hash per row."""
+    hashes = np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingle_set), dtype=np.uint64, count=len(shingle_set)) % _PRIME
+    return ((_A[:, None] * hashes[None, :] + _B[:, None]) % _PRIME).min(axis=1)
+
+
+def _jaccard(a: Set[str], b: Set[str]) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+class NearDuplicateIndex:
+    """
+    LSH index over the headlines kept so far. Each signature is split into bands, and
+    only articles sharing a band bucket are compared, so checking a headline costs about
+    the same whether the run holds fifty articles or fifty thousand.
+    """
+
+    def __init__(self, threshold: float = NEWS_DEDUPE_THRESHOLD):
+        self.threshold = threshold
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        self._shingles: List[Set[str]] = []
+
+    def add_if_new(self, text: str) -> bool:
+        """Adds the text unless a near-duplicate is already indexed. Returns whether it was added."""
+        shingle_set = shingles(text)
+        if not shingle_set:
+            return True
+        bands = [(band, row.tobytes()) for band, row in enumerate(minhash(shingle_set).reshape(BANDS, ROWS))]
+        candidates = {i for key in bands for i in self._buckets.get(key, ())}
+        if any(_jaccard(shingle_set, self._shingles[i]) >= self.threshold for i in candidates):
+            return False
+        index = len(self._shingles)
+        self._shingles.append(shingle_set)
+        for key in bands:
+            self._buckets.setdefault(key, []).append(index)
+        return True
+
+
+def dedupe_news(news_list: List[CompanyNews], threshold: float = NEWS_DEDUPE_THRESHOLD) -> List[CompanyNews]:
+    """
+    Drops articles that repeat a story already listed earlier in the run: the same URL,
+    or a headline that is a near-duplicate of one already kept, under this company or
+    any other. The first occurrence wins. Returns new CompanyNews objects; the input
+    records are left unchanged so per-row results can still be stored as fetched.
+    """
+    index = NearDuplicateIndex(threshold)
+    seen_urls = set()
+    deduped, dropped = [], 0
+    for news in news_list:
+        kept: List[NewsArticle] = []
+        for article in news.articles:
+            if article.url and article.url in seen_urls:
+                dropped += 1
+                continue
+            if not index.add_if_new(article.title):
+                dropped += 1
+                continue
+            if article.url:
+                seen_urls.add(article.url)
+            kept.append(article)
+        deduped.append(CompanyNews(symbol=news.symbol, query=news.query, articles=kept, error=news.error))
+    if dropped:
+        print(f"Removed {dropped} duplicate or near-duplicate articles.")
+    return deduped
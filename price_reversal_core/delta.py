@@ -0,0 +1,103 @@
+import os
+import glob
+import pandas as pd
+from typing import Dict, List, Optional, Set, Tuple
+
+from price_reversal_core.ingestion import load_excel
+from price_reversal_core.database_manager import fetch_row_results
+from price_reversal_core.news_records import CompanyNews
+
+# A row is identified across uploads by its symbol and reversal date.
+KEY_COLUMNS = ['Symbol', 'Reversal Date']
+
+COMPLETED_DIR = os.path.join("files", "uploads", "completed")
+
+
+def row_key(symbol, reversal_date) -> Tuple[str, str]:
+    """Returns the (Symbol, yyyy-mm-dd) key used to match rows between uploads and stored results."""
+    return str(symbol), pd.Timestamp(reversal_date).strftime('%Y-%m-%d')
+
+
+def has_keys(df: pd.DataFrame) -> bool:
+    """Whether the frame carries the columns that identify a row across uploads."""
+    return all(col in df.columns for col in KEY_COLUMNS)
+
+
+def latest_completed_upload(completed_dir: str = COMPLETED_DIR, exclude: str = None) -> Optional[str]:
+    """
+    Returns the most recently modified .xlsx in the completed uploads directory,
+    ignoring exclude (the file currently being processed), or None if there is none.
+    """
+    candidates = glob.glob(os.path.join(completed_dir, "*.xlsx"))
+    if exclude:
+        candidates = [path for path in candidates if os.path.abspath(path) != os.path.abspath(exclude)]
+    if not candidates:
+        return None
+    return max(candidates, key=os.path.getmtime)
+
+
+def _row_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """Returns a frame of (Symbol, yyyy-mm-dd Reversal Date) keys aligned with df's rows."""
+    return pd.DataFrame({
+        'Symbol': df['Symbol'].astype(str).to_numpy(),
+        'Reversal Date': pd.to_datetime(df['Reversal Date']).dt.strftime('%Y-%m-%d').to_numpy(),
+    })
+
+
+def _hash_rows(df: pd.DataFrame, value_columns: List[str]) -> pd.DataFrame:
+    """Returns the row keys together with a hash of each row's value columns."""
+    keys = _row_keys(df)
+    # Nullable so rows missing from the other upload stay <NA> through the merge instead of becoming float
+    keys['row_hash'] = pd.array(pd.util.hash_pandas_object(df[value_columns], index=False).to_numpy(), dtype='UInt64')
+    return keys
+
+
+def find_changed_keys(current_df: pd.DataFrame, previous_df: pd.DataFrame) -> Set[Tuple[str, str]]:
+    """
+    Compares two uploads by Symbol + Reversal Date.
+    Returns the keys of rows in current_df that are new or whose values differ from previous_df.
+    """
+    if current_df.empty:
+        return set()
+    if previous_df is None or previous_df.empty or not has_keys(previous_df):
+        keys = _row_keys(current_df)
+        return set(zip(keys['Symbol'], keys['Reversal Date']))
+
+    value_columns = [col for col in current_df.columns if col in previous_df.columns and col not in KEY_COLUMNS]
+    current = _hash_rows(current_df, value_columns)
+    previous = _hash_rows(previous_df, value_columns).drop_duplicates(subset=KEY_COLUMNS, keep='last')
+
+    merged = current.merge(previous, on=KEY_COLUMNS, how='left', suffixes=('', '_previous'), indicator=True)
+    changed = (merged['_merge'] == 'left_only') | (merged['row_hash'] != merged['row_hash_previous'])
+    changed = changed.fillna(True).astype(bool)
+    return set(zip(merged.loc[changed, 'Symbol'], merged.loc[changed, 'Reversal Date']))
+
+
+def reusable_results(subset_df: pd.DataFrame, file_path: str, columns: List[str], completed_dir: str = COMPLETED_DIR) -> Dict[Tuple[str, str], Dict]:
+    """
+    Diffs the subset against the last completed upload and returns the stored results of
+    the previous run for every row that is unchanged, keyed by (Symbol, yyyy-mm-dd).
+    Each result holds the row's 'search_query' and its CompanyNews as 'news'.
+    Rows that are new, changed or have no stored result are left out and must be reprocessed.
+    """
+    if subset_df.empty or not has_keys(subset_df):
+        return {}
+    previous_path = latest_completed_upload(completed_dir, exclude=file_path)
+    if previous_path is None:
+        print(f"Delta mode: no previous upload in '{completed_dir}'. Processing all rows.")
+        return {}
+
+    print(f"Delta mode: comparing against previous upload {previous_path}")
+    previous_df = load_excel(previous_path, columns=columns)
+    changed = find_changed_keys(subset_df, previous_df)
+    keys = _row_keys(subset_df)
+    unchanged = set(zip(keys['Symbol'], keys['Reversal Date'])) - changed
+    stored = {}
+    for key, result in fetch_row_results(unchanged).items():
+        try:
+            stored[key] = {'search_query': result['search_query'], 'news': CompanyNews.from_json(result['news_section'])}
+        except (TypeError, ValueError, KeyError):
+            # Results stored in an older format are simply reprocessed
+            continue
+    print(f"Delta mode: {len(changed)} new or changed rows, {len(stored)} of {len(unchanged)} unchanged rows reused from the previous run.")
+    return stored
@@ -1,19 +1,185 @@
 import pandas as pd
 import os
+import hashlib
+import json
+from operator import itemgetter
+from typing import Iterator, List, Optional
 
+import openpyxl
 
-def load_excel(file_path: str) -> pd.DataFrame:
-    """Load an Excel file into a pandas DataFrame and report progress."""
+from price_reversal_core.schema import REQUIRED_COLUMNS, validate_frame
+
+# Load environment variables
+from dotenv import load_dotenv
+load_dotenv()
+
+# Rows per DataFrame chunk when streaming a workbook in read-only mode. This bounds the
+# row buffer of iter_excel_chunks; load_excel still holds every row of the selected columns.
+DEFAULT_CHUNK_SIZE = int(os.getenv("INGESTION_CHUNK_SIZE", 50000))
+
+# Parsed workbooks are cached as Parquet files keyed by a hash of the workbook bytes.
+CACHE_ENABLED = os.getenv("INGESTION_CACHE_ENABLED", "True").lower() == "true"
+CACHE_DIR = os.getenv("INGESTION_CACHE_DIR", os.path.join("files", "cache", "ingestion"))
+CACHE_MAX_BYTES = int(float(os.getenv("INGESTION_CACHE_MAX_MB", 512)) * 1024 * 1024)
+# Bump when the parsed representation changes so stale cache entries are ignored.
+CACHE_FORMAT_VERSION = 2
+
+
+def iter_excel_chunks(file_path: str, columns: List[str], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Streams the first sheet of an Excel file in read-only mode and yields DataFrames
+    of at most chunk_size rows containing only the requested columns.
+    Requested columns that are not present in the header are skipped.
+    Memory stays bounded by one chunk only for callers that consume the chunks one at
+    a time; load_excel concatenates them.
+    """
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook.worksheets[0]
+        rows = worksheet.iter_rows(values_only=True)
+
+        header = next(rows, None)
+        if header is None:
+            return
+        header = [str(cell).strip() if cell is not None else None for cell in header]
+
+        selected = [col for col in columns if col in header]
+        missing = [col for col in columns if col not in header]
+        if missing:
+            print(f"Columns not found in workbook, skipping: {missing}")
+        if not selected:
+            return
+
+        indices = [header.index(col) for col in selected]
+        width = max(indices) + 1
+        pick = itemgetter(*indices)
+        if len(indices) == 1:
+            # itemgetter with a single index returns a scalar rather than a tuple
+            single = pick
+            pick = lambda row: (single(row),)
+
+        buffer = []
+        for row in rows:
+            if len(row) < width:
+                row = tuple(row) + (None,) * (width - len(row))
+            values = pick(row)
+            if all(value is None for value in values):
+                continue
+            buffer.append(values)
+            if len(buffer) >= chunk_size:
+                yield pd.DataFrame.from_records(buffer, columns=selected)
+                buffer = []
+        if buffer:
+            yield pd.DataFrame.from_records(buffer, columns=selected)
+    finally:
+        workbook.close()
+
+
+def _cache_key(file_path: str, columns: Optional[List[str]], required_columns: Optional[List[str]]) -> str:
+    """Hashes the workbook bytes together with the requested columns, validation and cache format."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    digest.update(json.dumps({"columns": columns, "required": required_columns, "version": CACHE_FORMAT_VERSION}).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path: str) -> Optional[pd.DataFrame]:
+    """Returns the cached DataFrame, or None if the entry is missing or unreadable."""
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        df = pd.read_parquet(cache_path, memory_map=True)
+        # Touch the entry so eviction removes the least recently used files first
+        os.utime(cache_path)
+        return df
+    except Exception as e:
+        print(f"Ignoring unreadable cache entry {cache_path}: {e}")
+        return None
+
+
+def _write_cache(df: pd.DataFrame, cache_path: str, cache_dir: str, max_bytes: int):
+    """Writes the DataFrame atomically to the cache, then evicts old entries over max_bytes."""
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{cache_path}.tmp"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, cache_path)
+    except Exception as e:
+        print(f"Could not write ingestion cache entry {cache_path}: {e}")
+        return
+    evict_cache(cache_dir, max_bytes)
+
+
+def evict_cache(cache_dir: str = CACHE_DIR, max_bytes: int = CACHE_MAX_BYTES):
+    """Deletes the least recently used cache entries until the cache fits in max_bytes."""
+    if not os.path.isdir(cache_dir):
+        return
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".parquet"):
+            path = os.path.join(cache_dir, name)
+            stat = os.stat(path)
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+            total -= size
+            print(f"Evicted ingestion cache entry: {path}")
+        except OSError as e:
+            print(f"Could not evict cache entry {path}: {e}")
+
+
+def load_excel(
+    file_path: str,
+    columns: List[str] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    use_cache: bool = CACHE_ENABLED,
+    cache_dir: str = CACHE_DIR,
+    required_columns: List[str] = REQUIRED_COLUMNS
+) -> pd.DataFrame:
+    """
+    Load an Excel file into a pandas DataFrame and report progress.
+    If columns is given, only those columns are read, streaming the sheet in
+    read-only mode. This speeds up parsing and keeps unused columns out of memory,
+    but the returned frame still holds every row of the selected columns: subset
+    selection and backfill grouping need the whole sheet at once.
+    With use_cache, the parsed frame is stored as Parquet keyed by the workbook
+    contents, so rereading the same upload skips the Excel parse entirely.
+    The frame is validated and typed once here (see schema.validate_frame);
+    pass required_columns=None to skip validation.
+    """
     print(f"Loading Excel file: {file_path}")
     if not os.path.exists(file_path):
         raise FileNotFoundError(f"File not found: {file_path}")
+
+    cache_path = None
+    if use_cache:
+        cache_path = os.path.join(cache_dir, f"{_cache_key(file_path, columns, required_columns)}.parquet")
+        cached_df = _read_cache(cache_path)
+        if cached_df is not None:
+            print(f"Loaded {len(cached_df)} rows from ingestion cache: {cache_path}")
+            return cached_df
+
     try:
-        df = pd.read_excel(file_path)
+        if columns is None:
+            df = pd.read_excel(file_path)
+        else:
+            chunks = list(iter_excel_chunks(file_path, columns, chunk_size=chunk_size))
+            if chunks:
+                df = pd.concat(chunks, ignore_index=True)
+            else:
+                df = pd.DataFrame(columns=columns)
         print(f"Loaded {len(df)} rows and columns: {list(df.columns)}")
-        # missing_cols = [col for col in required_columns if col not in df.columns]
-        # if missing_cols:
-        #     raise ValueError(f"Missing columns: {missing_cols}")
-        return df
+        if required_columns is not None:
+            df = validate_frame(df, required_columns)
     except Exception as e:
         raise ValueError(f"Error reading Excel file: {str(e)}")
 
+    if cache_path is not None:
+        _write_cache(df, cache_path, cache_dir, CACHE_MAX_BYTES)
+    return df
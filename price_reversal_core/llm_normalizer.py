@@ -1,14 +1,30 @@
 import google.generativeai as genai
 import os
+import re
 import json
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Tuple
 from tenacity import retry, stop_after_attempt, wait_exponential
 from google.api_core.exceptions import ResourceExhausted
 
+from price_reversal_core.schema import serialize_records
+from price_reversal_core.normalization_store import load_overrides, lookup_search_queries, remember_search_queries
+from price_reversal_core.name_rules import normalize_name
+
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
+# Large universes are normalized in chunks of this many companies, several calls at a time.
+NORMALIZATION_CHUNK_SIZE = int(os.getenv("NORMALIZATION_CHUNK_SIZE", 50))
+NORMALIZATION_MAX_CONCURRENCY = int(os.getenv("NORMALIZATION_MAX_CONCURRENCY", 4))
+
+# Names the rule-based normalizer can settle skip the LLM entirely.
+NORMALIZATION_RULES_ENABLED = os.getenv("NORMALIZATION_RULES_ENABLED", "True").lower() == "true"
+
+# A flat JSON object, for salvaging entries from a truncated response.
+_JSON_OBJECT = re.compile(r'\{[^{}]*\}')
+
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=2, min=5, max=60),
@@ -19,53 +35,143 @@ def _generate_with_retry(model, prompt: str):
     print("Generating content with Gemini...")
     return model.generate_content(prompt)
 
-def normalize_company_names(tickers_data: List[Dict]) -> List[Dict]:
+def _fall_back_to_company_names(tickers_data: List[Dict]):
+    for item in tickers_data:
+        item['SearchQuery'] = item.get('Company Name', '')
+
+def _parse_normalization_response(text: str) -> Dict[str, str]:
     """
-    Uses Gemini to normalize company names for better search results.
-    Input: List of dicts with 'Ticker' and 'Company Name'
-    Output: List of dicts with added 'SearchQuery'
+    Extracts {Symbol: SearchQuery} from a model response. Code fences and any prose
+    around the JSON list are ignored. If the list is truncated or malformed, the
+    complete objects it contains are still used.
     """
-    api_key = os.getenv("GEMINI_API_KEY")
-    if not api_key:
-        print("Warning: GEMINI_API_KEY not found. Using raw company names.")
-        for item in tickers_data:
-            item['SearchQuery'] = item.get('Company Name', '')
-        return tickers_data
-
-    genai.configure(api_key=api_key)
-    # Use 'gemini-pro-latest' which is a standard, generally available model.
-    model = genai.GenerativeModel('models/gemini-pro-latest')
+    text = text.replace("```json", "").replace("```", "").strip()
+    start, end = text.find('['), text.rfind(']')
+    try:
+        entries = json.loads(text[start:end + 1]) if start != -1 and end > start else None
+    except json.JSONDecodeError:
+        entries = None
+    if entries is None:
+        entries = []
+        for match in _JSON_OBJECT.finditer(text):
+            try:
+                entries.append(json.loads(match.group(0)))
+            except json.JSONDecodeError:
+                continue
+    return {
+        entry['Symbol']: entry['SearchQuery']
+        for entry in entries
+        if isinstance(entry, dict) and entry.get('Symbol') and entry.get('SearchQuery')
+    }
 
+def _normalize_chunk(model, chunk: List[Dict]) -> Tuple[Dict[str, str], str]:
+    """Normalizes one chunk with a single Gemini call. Returns the parsed lookup and the raw response."""
     prompt = f"""
     You are a financial data assistant. I will provide a list of companies. 
     Your task is to return a JSON list where each object has 'Symbol' and 'SearchQuery'.
     'SearchQuery' should be the best string to use for searching news about the company (e.g., removing 'Inc.', 'Corp.', adding common brand names).
     
     Input:
-    {json.dumps(tickers_data, default=str)}
+    {serialize_records(chunk, fields=['Symbol', 'Company Name'])}
     
     Output JSON:
     """
-    
-    try:
-        response = _generate_with_retry(model, prompt)
-        
-        with open("gemini_response.txt", "w") as f:
-            f.write(response.text)
-            
-        text = response.text.replace("```json", "").replace("```", "").strip()
-        normalized_data = json.loads(text)
-        
-        lookup = {item['Symbol']: item['SearchQuery'] for item in normalized_data}
-        
-        for item in tickers_data:
-            item['SearchQuery'] = lookup.get(item['Symbol'], item.get('Company Name', ''))
-            
-        return tickers_data
-        
-    except (ResourceExhausted, Exception) as e:
-        print(f"LLM normalization failed after multiple retries: {e}")
-        print("Falling back to using raw company names for news search.")
-        for item in tickers_data:
-            item['SearchQuery'] = item.get('Company Name', '')
-        return tickers_data
+    response = _generate_with_retry(model, prompt)
+    return _parse_normalization_response(response.text), response.text
+
+def _normalize_with_llm(tickers_data: List[Dict]) -> List[Dict]:
+    """
+    Asks Gemini for the SearchQuery of each item and sets it in place. The items are
+    split into chunks of NORMALIZATION_CHUNK_SIZE, normalized concurrently (at most
+    NORMALIZATION_MAX_CONCURRENCY calls at a time) and parsed independently, so a failed
+    or truncated chunk only sends its own items back to their Company Name.
+    Returns the items whose SearchQuery came from the LLM.
+    """
+    api_key = os.getenv("GEMINI_API_KEY")
+    if not api_key:
+        print("Warning: GEMINI_API_KEY not found. Using raw company names.")
+        _fall_back_to_company_names(tickers_data)
+        return []
+
+    genai.configure(api_key=api_key)
+    # Use 'gemini-pro-latest' which is a standard, generally available model.
+    model = genai.GenerativeModel('models/gemini-pro-latest')
+
+    chunks = [tickers_data[i:i + NORMALIZATION_CHUNK_SIZE] for i in range(0, len(tickers_data), NORMALIZATION_CHUNK_SIZE)]
+    if len(chunks) > 1:
+        print(f"Normalizing {len(tickers_data)} companies in {len(chunks)} chunks...")
+
+    def run_chunk(chunk: List[Dict]):
+        try:
+            return _normalize_chunk(model, chunk)
+        except (ResourceExhausted, Exception) as e:
+            print(f"LLM normalization failed after multiple retries for {len(chunk)} companies: {e}")
+            return {}, f"Error: {e}"
+
+    with ThreadPoolExecutor(max_workers=max(1, min(NORMALIZATION_MAX_CONCURRENCY, len(chunks)))) as executor:
+        results = list(executor.map(run_chunk, chunks))
+
+    with open("gemini_response.txt", "w") as f:
+        f.write("\n\n".join(text for _, text in results))
+
+    normalized = []
+    fallbacks = 0
+    for chunk, (lookup, _) in zip(chunks, results):
+        for item in chunk:
+            if item['Symbol'] in lookup:
+                item['SearchQuery'] = lookup[item['Symbol']]
+                normalized.append(item)
+            else:
+                item['SearchQuery'] = item.get('Company Name', '')
+                fallbacks += 1
+    if fallbacks:
+        print(f"Falling back to raw company names for {fallbacks} of {len(tickers_data)} companies.")
+    return normalized
+
+def normalize_company_names(tickers_data: List[Dict], metrics: Dict[str, int] = None) -> List[Dict]:
+    """
+    Sets a news SearchQuery on each record.
+    Manual overrides from config come first, then the rule-based normalizer (aliases,
+    suffix stripping, abbreviations) for names it can settle, then fresh entries of the
+    normalization store. Only the remaining ambiguous names go to Gemini, and its
+    answers are stored for later runs.
+    Input: List of records (or dicts) with 'Symbol' and 'Company Name'
+    Output: The same records with 'SearchQuery' set
+    metrics, if given, receives how many records each path resolved.
+    """
+    counts = {'override': 0, 'alias': 0, 'rules': 0, 'store': 0, 'llm': 0, 'fallback': 0}
+    overrides = load_overrides()
+    pending = []
+    for item in tickers_data:
+        symbol = item.get('Symbol')
+        if symbol in overrides:
+            item['SearchQuery'] = overrides[symbol]
+            counts['override'] += 1
+            continue
+        if NORMALIZATION_RULES_ENABLED:
+            result = normalize_name(item.get('Company Name'))
+            if result.query is not None:
+                item['SearchQuery'] = result.query
+                counts[result.path] += 1
+                continue
+        pending.append(item)
+
+    stored = lookup_search_queries(pending)
+    misses = []
+    for item in pending:
+        symbol = item.get('Symbol')
+        if symbol in stored:
+            item['SearchQuery'] = stored[symbol]
+            counts['store'] += 1
+        else:
+            misses.append(item)
+
+    if misses:
+        normalized = _normalize_with_llm(misses)
+        remember_search_queries(normalized)
+        counts['llm'] = len(normalized)
+        counts['fallback'] = len(misses) - len(normalized)
+    print("Normalization: " + ", ".join(f"{count} {path}" for path, count in counts.items()) + ".")
+    if metrics is not None:
+        metrics.update(counts)
+    return tickers_data
@@ -0,0 +1,203 @@
+import re
+from bisect import bisect_right
+from typing import List
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import ParagraphStyle, StyleSheet1, getSampleStyleSheet
+from reportlab.lib.units import inch
+from reportlab.platypus import Paragraph, Preformatted, Spacer, Table, TableStyle
+from reportlab.platypus.flowables import HRFlowable
+
+# Block patterns, tried in order on each line
+_FENCE = re.compile(r'^\s*(```|~~~)')
+_FENCE_LINE = re.compile(r'^[ \t]*(?:```|~~~)', re.MULTILINE)
+_HEADING = re.compile(r'^(#{1,6})\s+(.*?)\s*#*\s*$')
+_RULE = re.compile(r'^\s*([-*_])(?:\s*\1){2,}\s*$')
+_BULLET = re.compile(r'^(\s*)[*+\-]\s+(.*)$')
+_NUMBERED = re.compile(r'^(\s*)(\d{1,3})[.)]\s+(.*)$')
+_TABLE_SEPARATOR = re.compile(r'^\|[\s\-:|]*$')
+
+# Inline patterns: code spans first, so emphasis markers inside code are left alone.
+# Bold is matched before italic, so '**a *b* c**' nests as <b>a <i>b</i> c</b>.
+_CODE_SPAN = re.compile(r'`([^`\n]+)`')
+_BOLD_ITALIC = re.compile(r'\*\*\*(?=\S)(.+?)(?<=\S)\*\*\*')
+_BOLD = re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*|__(?=\S)(.+?)(?<=\S)__')
+_ITALIC = re.compile(r'(?<![*\w])\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?![*\w])|(?<![_\w])_(?=\S)(.+?)(?<=\S)_(?![_\w])')
+_CODE_PLACEHOLDER = re.compile('\x00(\\d+)\x00')
+
+HEADING_STYLES = {1: 'CustomH1', 2: 'CustomH2'}
+LIST_INDENT = 12
+MAX_LIST_DEPTH = 3
+BLOCK_SPACING = 12
+
+# Tables span the letter page less 0.5 inch margins on each side
+TABLE_WIDTH = letter[0] - 2 * (0.5 * inch)
+TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.lightgrey),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.black),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 6),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+    ('WORDWRAP', (0, 0), (-1, -1), True),
+])
+
+
+def _escape(text: str) -> str:
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def inline_markup(text: str) -> str:
+    """
+    Converts inline markdown to ReportLab paragraph markup: `code`, ***bold italic***,
+    **bold** / __bold__ and *italic* / _italic_, nested in either order. Everything
+    else is escaped, so stray '<' or '&' in model output cannot break the paragraph parser.
+    """
+    spans = []
+
+    def stash(match):
+        spans.append(f'<font face="Courier">{_escape(match.group(1))}</font>')
+        return f'\x00{len(spans) - 1}\x00'
+
+    text = _CODE_SPAN.sub(stash, text)
+    text = _escape(text)
+    text = _BOLD_ITALIC.sub(r'<b><i>\1</i></b>', text)
+    text = _BOLD.sub(lambda m: f'<b>{m.group(1) or m.group(2)}</b>', text)
+    text = _ITALIC.sub(lambda m: f'<i>{m.group(1) or m.group(2)}</i>', text)
+    if spans:
+        text = _CODE_PLACEHOLDER.sub(lambda m: spans[int(m.group(1))], text)
+    return text
+
+
+def _paragraph(text: str, style) -> Paragraph:
+    """A paragraph of inline markdown; crossed emphasis the parser rejects falls back to plain text."""
+    try:
+        return Paragraph(inline_markup(text), style)
+    except ValueError:
+        return Paragraph(_escape(text), style)
+
+
+def report_styles() -> StyleSheet1:
+    """The report style sheet: the sample sheet plus the heading and table cell styles used here."""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='CustomH1', parent=styles['Normal'], fontSize=18, leading=22, spaceAfter=12))
+    styles.add(ParagraphStyle(name='CustomH2', parent=styles['Normal'], fontSize=16, leading=20, spaceAfter=10))
+    styles.add(ParagraphStyle(name='CustomH3', parent=styles['Normal'], fontSize=14, leading=18, spaceAfter=8))
+    styles.add(ParagraphStyle(name='TableCell', parent=styles['Normal'], fontSize=8, leading=10)) # Smaller font for table cells
+    return styles
+
+
+def _list_styles(styles) -> List[ParagraphStyle]:
+    """List item styles per nesting depth, created once per style sheet."""
+    if 'MdList0' not in styles:
+        for depth in range(MAX_LIST_DEPTH + 1):
+            styles.add(ParagraphStyle(name=f'MdList{depth}', parent=styles['Normal'], leftIndent=depth * LIST_INDENT))
+    return [styles[f'MdList{depth}'] for depth in range(MAX_LIST_DEPTH + 1)]
+
+
+def _split_row(line: str) -> List[str]:
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|'):
+        line = line[:-1]
+    return [cell.strip() for cell in line.split('|')]
+
+
+def _table(rows: List[str], styles) -> Table:
+    """
+    Builds a table from consecutive '|' lines. A separator row (|---|) marks the rows above
+    it as the header, in bold; without one every row is body.
+    """
+    separator = next((i for i, row in enumerate(rows) if _TABLE_SEPARATOR.match(row.strip())), None)
+    normal = styles['Normal']
+    data = []
+    if separator is not None:
+        for row in rows[:separator]:
+            data.append([_paragraph(f"**{cell}**" if cell else "", normal) for cell in _split_row(row)])
+        body = rows[separator + 1:]
+    else:
+        body = rows
+    for row in body:
+        data.append([_paragraph(cell, normal) for cell in _split_row(row)])
+    max_cols = max(1, max(len(row) for row in data))
+    data = [row + [Paragraph('', normal) for _ in range(max_cols - len(row))] for row in data]
+    table = Table(data, colWidths=[TABLE_WIDTH / max_cols] * max_cols)
+    table.setStyle(TABLE_STYLE)
+    return table
+
+
+def markdown_to_paragraphs(markdown_text: str, styles) -> list:
+    """
+    Converts model markdown to a list of ReportLab Flowables in a single pass over the lines.
+    Handles #-headings, bullet and numbered lists (nested by indentation), fenced code
+    blocks, horizontal rules, '|' tables and inline emphasis and code. Each blank line
+    becomes a spacer, and every other line its own paragraph.
+    """
+    story = []
+    list_styles = _list_styles(styles)
+    normal = styles['Normal']
+    table_rows = []
+    code_lines = None
+
+    for line in markdown_text.split('\n'):
+        if code_lines is not None:
+            if _FENCE.match(line):
+                story.append(Preformatted('\n'.join(code_lines), styles['Code']))
+                code_lines = None
+            else:
+                code_lines.append(line)
+            continue
+
+        stripped = line.strip()
+        if stripped.startswith('|'):
+            table_rows.append(line)
+            continue
+        if table_rows:
+            story.append(_table(table_rows, styles))
+            story.append(Spacer(1, BLOCK_SPACING))
+            table_rows = []
+
+        if not stripped:
+            story.append(Spacer(1, BLOCK_SPACING))
+        elif _FENCE.match(line):
+            code_lines = []
+        elif (match := _HEADING.match(line)) is not None:
+            story.append(_paragraph(match.group(2), styles[HEADING_STYLES.get(len(match.group(1)), 'CustomH3')]))
+        elif _RULE.match(line):
+            story.append(HRFlowable(width="100%", thickness=0.5, color=colors.grey, spaceBefore=4, spaceAfter=4))
+        elif (match := _BULLET.match(line)) is not None:
+            depth = min(len(match.group(1).expandtabs(4)) // 2, MAX_LIST_DEPTH)
+            story.append(_paragraph(f"• {match.group(2)}", list_styles[depth]))
+        elif (match := _NUMBERED.match(line)) is not None:
+            depth = min(len(match.group(1).expandtabs(4)) // 2, MAX_LIST_DEPTH)
+            story.append(_paragraph(f"{match.group(2)}. {match.group(3)}", list_styles[depth]))
+        else:
+            story.append(_paragraph(line, normal))
+
+    if table_rows:
+        story.append(_table(table_rows, styles))
+        story.append(Spacer(1, BLOCK_SPACING))
+    if code_lines is not None:
+        # An unterminated fence (e.g. a truncated response) still shows its code
+        story.append(Preformatted('\n'.join(code_lines), styles['Code']))
+    return story
+
+
+def last_block_boundary(markdown_text: str) -> int:
+    """
+    Index of the newline that starts the last blank line outside a fenced code block, or
+    -1. Text before it is complete markdown, so it converts the same on its own as it
+    would as part of the whole text.
+    """
+    fences = [match.start() for match in _FENCE_LINE.finditer(markdown_text)]
+    cut = markdown_text.rfind('\n\n')
+    while cut != -1:
+        # Inside a code block when an odd number of fences precede the cut
+        if bisect_right(fences, cut) % 2 == 0:
+            return cut
+        cut = markdown_text.rfind('\n\n', 0, cut)
+    return -1
@@ -0,0 +1,120 @@
+import os
+import re
+import json
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+ALIASES_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "config", "name_aliases.json"))
+
+# Legal forms and explicitly marked share classes, which never help a news search.
+# Matched at the end of the name and stripped repeatedly ("Zimmer Biomet Hldgs Inc").
+_SUFFIXES = [
+    r"inc\.?", r"incorporated", r"incorp", r"corp\.?", r"corporation", r"co\.?", r"cos\.?", r"& co\.?",
+    r"company", r"companies", r"ltd\.?", r"limited", r"plc", r"llc", r"l\.?p\.?", r"n\.?v\.?",
+    r"s\.?a\.?", r"ag", r"se", r"holdings?", r"hldgs?\.?", r"group", r"grp\.?",
+    r"cl\.? ?[a-c]", r"class [a-c]", r"'[a-c]'", r"\(the\)",
+]
+_SUFFIX_PATTERN = re.compile(r"(?:[\s,]+|(?<=[a-z0-9.'\)])(?='))(?:" + "|".join(_SUFFIXES) + r")\s*$", re.IGNORECASE)
+# A legal form left inside the name means an unknown listing note followed it ("Corteva Inc W").
+_LEGAL_FORM = re.compile(r"^(?:" + "|".join(_SUFFIXES) + r"),?$", re.IGNORECASE)
+# Two-letter words that end real names ("T-Mobile US").
+_SHORT_WORDS = {"us", "uk"}
+_LEADING_THE = re.compile(r"^the\s+", re.IGNORECASE)
+# Connectors left dangling once "& Co" or "and Co" is gone ("Eli Lilly and Co").
+_TRAILING_CONNECTOR = re.compile(r"(?:\s+(?:and|&))+$", re.IGNORECASE)
+
+# Abbreviations used in exchange listings, expanded to the words the press uses.
+_ABBREVIATIONS = {
+    "finl": "Financial", "intl": "International", "int'l": "International", "svcs": "Services", "svc": "Service",
+    "ppty": "Property", "pptys": "Properties", "indus": "Industries", "ind": "Industries",
+    "glbl": "Global", "mgt": "Management", "petro": "Petroleum", "chem": "Chemicals",
+    "pwr": "Power", "amer": "American", "genl": "General", "bancshs": "Bancshares",
+    "assoc": "Associates", "rlty": "Realty", "apt": "Apartment", "proc": "Processing",
+    "mkts": "Markets", "repub": "Republic", "pub": "Public", "res": "Resources",
+    "labs": "Laboratories", "ld": "Land", "pac": "Pacific", "inv": "Investment", "tr": "Trust",
+}
+_ABBREVIATION_PATTERN = re.compile(r"(?<![\w'])(" + "|".join(re.escape(a) for a in sorted(_ABBREVIATIONS, key=len, reverse=True)) + r")(?![\w'])", re.IGNORECASE)
+
+# Names the rules cannot settle on their own go to the LLM.
+# "Tech" may mean Technology or Technologies, and the bare stem ("Align") is too vague.
+_AMBIGUOUS_TOKENS = {"tech", "cap"}
+# Single remaining words that are also everyday words or too generic to search for.
+_COMMON_WORDS = {
+    "target", "visa", "ball", "match", "pool", "carrier", "corning", "dover", "equity", "global",
+    "general", "united", "american", "first", "public", "realty", "southern", "progressive",
+    "best", "dow", "news", "williams", "booking", "regency", "waters", "ventas",
+}
+_PARENTHETICAL = re.compile(r"[()/]")
+
+
+@dataclass(slots=True)
+class RuleResult:
+    """The rule engine's SearchQuery for a name, or why the name needs the LLM."""
+    query: Optional[str]
+    ambiguous: Optional[str] = None
+    path: str = "rules"
+
+
+# ((path, mtime), {cleaned lower-case name: query}) of the alias file, reloaded when it changes.
+_aliases = (None, {})
+
+
+def load_aliases(path: str = ALIASES_PATH) -> Dict[str, str]:
+    """
+    Returns the alias map from config: {company name: SearchQuery}, keyed by the name
+    after suffix stripping, lower-cased. Used for renamed companies, misspelt listings
+    and brand names the rules cannot derive.
+    """
+    global _aliases
+    if not os.path.exists(path):
+        return {}
+    version = (path, os.path.getmtime(path))
+    if _aliases[0] != version:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        _aliases = (version, {strip_suffixes(name).lower(): query for name, query in entries.items() if query})
+    return _aliases[1]
+
+
+def _is_fragment(token: str) -> bool:
+    """A trailing one or two letter token: a share class or a truncated listing note ("Public Li")."""
+    return len(token) <= 2 and token.isalpha() and token.lower() not in _SHORT_WORDS
+
+
+def strip_suffixes(name: str) -> str:
+    """Removes the leading 'The', trailing legal forms and share classes, and stray punctuation."""
+    name = " ".join(str(name).split())
+    name = _LEADING_THE.sub("", name)
+    while True:
+        stripped = _TRAILING_CONNECTOR.sub("", _SUFFIX_PATTERN.sub("", name)).rstrip(" ,.-")
+        if stripped == name or not stripped:
+            break
+        name = stripped
+    return name
+
+
+def normalize_name(company_name: str) -> RuleResult:
+    """
+    Derives a news SearchQuery from a listed company name with precompiled rules: alias
+    lookup, suffix stripping and abbreviation expansion. Returns an ambiguous result,
+    with the reason, when the name should be left to the LLM.
+    """
+    if not company_name or not str(company_name).strip():
+        return RuleResult(None, "empty name")
+    stem = strip_suffixes(company_name)
+    alias = load_aliases().get(stem.lower())
+    if alias is not None:
+        return RuleResult(alias, path="alias")
+
+    if _PARENTHETICAL.search(stem):
+        return RuleResult(None, "inverted or qualified name")
+    words = stem.lower().replace("-", " ").split()
+    if any(word in _AMBIGUOUS_TOKENS for word in words):
+        return RuleResult(None, "ambiguous abbreviation")
+    query = _ABBREVIATION_PATTERN.sub(lambda m: _ABBREVIATIONS[m.group(1).lower()], stem)
+    tokens = query.split()
+    if len(tokens) > 1 and (_is_fragment(tokens[-1]) or any(_LEGAL_FORM.match(token) for token in tokens[1:])):
+        return RuleResult(None, "unrecognized listing suffix")
+    if len(query) <= 3 or (len(words) == 1 and words[0] in _COMMON_WORDS):
+        return RuleResult(None, "too short or generic")
+    return RuleResult(query)
@@ -1,80 +1,447 @@
 from newsapi import NewsApiClient
+from newsapi.newsapi_exception import NewsAPIException
 import os
+import re
+import json
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Optional
 import time # Import the time module
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
-def fetch_news(companies: List[Dict], days_back: int = 7) -> str:
+
+from price_reversal_core.rate_limiter import TokenBucket
+from price_reversal_core.ttl_cache import TTLCache
+from price_reversal_core.news_records import CompanyNews, NewsArticle, render_news_summary, write_articles_jsonl, articles_path_for
+from price_reversal_core.dedupe import NEWS_DEDUPE_ENABLED, dedupe_news
+from price_reversal_core.database_manager import fetch_news_watermarks, fetch_stored_articles, store_news_articles
+from price_reversal_core.newsapi_replay import ReplayNewsApiClient, RecordingNewsApiClient
+
+# Which client serves get_everything: "live" (NewsAPI), "record" (live, saving responses
+# for replay) or "replay" (offline stand-in, no API key needed).
+NEWSAPI_CLIENT = os.getenv("NEWSAPI_CLIENT", "live").lower()
+
+# NewsAPI quota: sustained requests per second, burst size, parallel requests and retries after a 429.
+NEWSAPI_RATE_PER_SEC = float(os.getenv("NEWSAPI_RATE_PER_SEC", 1.0))
+NEWSAPI_BURST = float(os.getenv("NEWSAPI_BURST", 1))
+NEWSAPI_MAX_WORKERS = int(os.getenv("NEWSAPI_MAX_WORKERS", 4))
+NEWSAPI_MAX_RETRIES = int(os.getenv("NEWSAPI_MAX_RETRIES", 3))
+
+# Batched mode: up to NEWSAPI_BATCH_SIZE companies share one OR query (1 = one query per company).
+# NewsAPI caps q at 500 characters and page_size at 100.
+NEWSAPI_BATCH_SIZE = int(os.getenv("NEWSAPI_BATCH_SIZE", 1))
+NEWSAPI_BATCH_PAGE_SIZE = int(os.getenv("NEWSAPI_BATCH_PAGE_SIZE", 100))
+MAX_QUERY_CHARS = 500
+ARTICLES_PER_COMPANY = 5
+
+# Successful get_everything responses are cached on disk, keyed by query and date window.
+NEWS_CACHE_ENABLED = os.getenv("NEWS_CACHE_ENABLED", "True").lower() == "true"
+NEWS_CACHE_PATH = os.getenv("NEWS_CACHE_PATH", os.path.join("files", "cache", "news_cache.db"))
+NEWS_CACHE_TTL_HOURS = float(os.getenv("NEWS_CACHE_TTL_HOURS", 6))
+NEWS_CACHE_MAX_MB = float(os.getenv("NEWS_CACHE_MAX_MB", 64))
+
+# Incremental mode: each symbol only requests articles newer than the newest one stored
+# for it (its high-water mark), and the rest of the window is filled from stored articles.
+NEWS_INCREMENTAL_ENABLED = os.getenv("NEWS_INCREMENTAL_ENABLED", "True").lower() == "true"
+
+def make_newsapi_client(client: str = NEWSAPI_CLIENT):
     """
-    Fetches news for a list of companies.
-    Returns a formatted string summary.
+    Returns the client configured by NEWSAPI_CLIENT, or None if the live API is needed
+    and NEWSAPI_KEY is missing.
     """
+    if client == "replay":
+        print("Using the offline NewsAPI replay client.")
+        return ReplayNewsApiClient()
     api_key = os.getenv("NEWSAPI_KEY")
     if not api_key:
-        print("NEWSAPI_KEY not found. News fetching skipped.")
-        return "Error: NEWSAPI_KEY not found."
-
+        return None
     print("Initializing NewsAPI client...")
     newsapi = NewsApiClient(api_key=api_key)
-    
-    end_date = datetime.now()
+    if client == "record":
+        print("Recording NewsAPI responses for replay.")
+        return RecordingNewsApiClient(newsapi)
+    return newsapi
+
+def open_news_cache() -> TTLCache:
+    """Returns the on-disk news cache configured in .env, or None if it is disabled."""
+    if not NEWS_CACHE_ENABLED:
+        return None
+    return TTLCache(NEWS_CACHE_PATH, NEWS_CACHE_TTL_HOURS * 3600, int(NEWS_CACHE_MAX_MB * 1024 * 1024), table="news_responses")
+
+def _cache_key(params: Dict) -> str:
+    """Hashes the request parameters, with the query lower-cased and whitespace collapsed."""
+    normalized = dict(params)
+    normalized['q'] = re.sub(r'\s+', ' ', str(params.get('q', ''))).strip().lower()
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()
+
+def _is_rate_limited(error: Exception) -> bool:
+    """Whether NewsAPI rejected the request for exceeding the rate limit (HTTP 429)."""
+    return isinstance(error, NewsAPIException) and isinstance(error.exception, dict) and error.exception.get('code') == 'rateLimited'
+
+def _error_message(error: Exception) -> str:
+    """NewsAPIException carries its message in the response body rather than in args."""
+    if isinstance(error, NewsAPIException) and isinstance(error.exception, dict):
+        return error.exception.get('message') or str(error.exception)
+    return str(error)
+
+def _get_everything(newsapi: NewsApiClient, limiter: TokenBucket, **params) -> dict:
+    """
+    Calls get_everything once a token is available. On a rate-limit response the limiter
+    slows down and the call is retried with exponential backoff.
+    """
+    for attempt in range(NEWSAPI_MAX_RETRIES + 1):
+        limiter.acquire()
+        try:
+            response = newsapi.get_everything(**params)
+        except NewsAPIException as e:
+            if not _is_rate_limited(e) or attempt == NEWSAPI_MAX_RETRIES:
+                raise
+            limiter.penalize()
+            delay = 2 ** attempt
+            print(f"    Rate limited by NewsAPI. Retrying in {delay}s at {limiter.rate:.2f} requests/s...")
+            time.sleep(delay)
+            continue
+        limiter.reward()
+        return response
+
+def _cached_get_everything(newsapi: NewsApiClient, limiter: TokenBucket, cache: TTLCache, **params) -> dict:
+    """Serves get_everything from the cache when possible; only successful responses are stored."""
+    if cache is None:
+        return _get_everything(newsapi, limiter, **params)
+    key = _cache_key(params)
+    cached = cache.get(key)
+    if cached is not None:
+        return json.loads(cached)
+    response = _get_everything(newsapi, limiter, **params)
+    if response.get('status') == 'ok':
+        cache.put(key, json.dumps(response))
+    return response
+
+def _company_query(company: Dict) -> str:
+    return company.get('SearchQuery', company.get('Company Name', company.get('Symbol')))
+
+def _phrase(query: str) -> str:
+    """The query as a single exact phrase, without quotes or extra whitespace."""
+    return re.sub(r'\s+', ' ', str(query).replace('"', ' ')).strip()
+
+def batch_companies(companies: List[Dict], batch_size: int = NEWSAPI_BATCH_SIZE, max_query_chars: int = MAX_QUERY_CHARS) -> List[List[Dict]]:
+    """
+    Splits companies into consecutive batches of at most batch_size whose combined
+    OR query fits within max_query_chars.
+    """
+    batches, batch, length = [], [], 0
+    for company in companies:
+        # Quoted phrase, plus " OR " unless it starts the batch
+        term_length = len(_phrase(_company_query(company))) + 2
+        if batch and (len(batch) >= batch_size or length + 4 + term_length > max_query_chars):
+            batches.append(batch)
+            batch, length = [], 0
+        length += term_length + (4 if batch else 0)
+        batch.append(company)
+    if batch:
+        batches.append(batch)
+    return batches
+
+class ArticleMatcher:
+    """
+    Assigns articles from a batched query back to companies. All company phrases are
+    compiled into one case-insensitive alternation, so each title and description is
+    scanned once regardless of how many companies share the batch.
+    """
+
+    def __init__(self, companies: List[Dict]):
+        self.companies_by_phrase = {}
+        for company in companies:
+            phrase = _phrase(_company_query(company)).lower()
+            if phrase:
+                self.companies_by_phrase.setdefault(phrase, []).append(company)
+        # Longest phrases first, so "Arch Capital Group" wins over "Arch Capital" at the same position
+        alternatives = sorted(self.companies_by_phrase, key=len, reverse=True)
+        pattern = "|".join(r"\s+".join(re.escape(word) for word in phrase.split()) for phrase in alternatives)
+        self.pattern = re.compile(rf"(?<!\w)(?:{pattern})(?!\w)", re.IGNORECASE) if alternatives else None
+
+    def match(self, article: Dict) -> List[Dict]:
+        """Returns the companies whose phrase occurs in the article's title or description."""
+        if self.pattern is None:
+            return []
+        text = f"{article.get('title') or ''}\n{article.get('description') or ''}"
+        matched = []
+        for phrase in dict.fromkeys(re.sub(r'\s+', ' ', m.group(0)).lower() for m in self.pattern.finditer(text)):
+            matched.extend(self.companies_by_phrase.get(phrase, []))
+        return matched
+
+def fetch_batch_news(
+    newsapi: NewsApiClient,
+    companies: List[Dict],
+    start_date: datetime,
+    end_date: datetime,
+    limiter: TokenBucket = None,
+    cache: TTLCache = None,
+    page_size: int = NEWSAPI_BATCH_PAGE_SIZE,
+    since: str = None
+) -> List[CompanyNews]:
+    """
+    Fetches news for several companies with a single OR query of their exact phrases,
+    then demultiplexes the articles locally by matching titles and descriptions.
+    An article naming two companies is listed under both; each company keeps at most
+    ARTICLES_PER_COMPANY articles. since narrows the request to articles published
+    from that timestamp on. If NewsAPI rejects the batched query for any reason other
+    than the rate limit, the error is logged and the companies are fetched one by one. Returns one CompanyNews per company, in order.
+    """
+    if len(companies) == 1:
+        return [fetch_company_news(newsapi, companies[0], start_date, end_date, limiter, cache, since)]
+    if limiter is None:
+        limiter = TokenBucket(NEWSAPI_RATE_PER_SEC, NEWSAPI_BURST)
+    query = " OR ".join(dict.fromkeys(f'"{_phrase(_company_query(company))}"' for company in companies))
+    symbols = [company.get('Symbol', 'Unknown') for company in companies]
+
+    print(f"  Fetching news for {', '.join(symbols)} with one batched query...")
+
+    news_list = [CompanyNews(symbol=symbol, query=_company_query(company)) for symbol, company in zip(symbols, companies)]
+    try:
+        response = _cached_get_everything(newsapi, limiter, cache,
+                                          q=query,
+                                          from_param=since or start_date.strftime('%Y-%m-%d'),
+                                          to=end_date.strftime('%Y-%m-%d'),
+                                          language='en',
+                                          sort_by='relevancy',
+                                          page_size=min(page_size, 100))
+    except Exception as e:
+        if isinstance(e, NewsAPIException) and not _is_rate_limited(e):
+            # The batched query itself was rejected (e.g. parameterInvalid); the companies may still succeed alone
+            code = e.exception.get('code') if isinstance(e.exception, dict) else None
+            print(f"    Batched query for {', '.join(symbols)} failed ({code or 'no code'}: {_error_message(e)}). "
+                  f"Fetching them one by one.")
+            return [fetch_company_news(newsapi, company, start_date, end_date, limiter, cache, since) for company in companies]
+        print(f"    Error fetching news for {', '.join(symbols)}: {_error_message(e)}")
+        for news in news_list:
+            news.error = _error_message(e)
+        return news_list
+
+    matcher = ArticleMatcher(companies)
+    news_by_symbol = {}
+    for news in news_list:
+        news_by_symbol.setdefault(news.symbol, []).append(news)
+    for article in response['articles']:
+        # A symbol listed twice in the batch gets the article under each of its entries, once
+        for symbol in dict.fromkeys(company.get('Symbol', 'Unknown') for company in matcher.match(article)):
+            for news in news_by_symbol[symbol]:
+                if len(news.articles) < ARTICLES_PER_COMPANY:
+                    news.articles.append(NewsArticle.from_api(news.symbol, article))
+    matched = sum(1 for news in news_list if news.articles)
+    print(f"    Batch returned {len(response.get('articles') or [])} articles, matched to {matched} of {len(companies)} companies.")
+    return news_list
+
+def fetch_company_news(
+    newsapi: NewsApiClient,
+    company: Dict,
+    start_date: datetime,
+    end_date: datetime,
+    limiter: TokenBucket = None,
+    cache: TTLCache = None,
+    since: str = None
+) -> CompanyNews:
+    """
+    Fetches news for a single company, waiting on the limiter before each request.
+    since narrows the request to articles published from that timestamp on.
+    Returns the company's articles, or the error that prevented fetching them.
+    """
+    if limiter is None:
+        limiter = TokenBucket(NEWSAPI_RATE_PER_SEC, NEWSAPI_BURST)
+    query = _company_query(company)
+    symbol = company.get('Symbol', 'Unknown')
+
+    print(f"  Fetching news for {symbol} with query: '{query}'...")
+
+    news = CompanyNews(symbol=symbol, query=query)
+    try:
+        articles = _cached_get_everything(newsapi, limiter, cache,
+                                          q=query,
+                                          from_param=since or start_date.strftime('%Y-%m-%d'),
+                                          to=end_date.strftime('%Y-%m-%d'),
+                                          language='en',
+                                          sort_by='relevancy',
+                                          page_size=5)
+
+        if articles['status'] == 'ok' and articles['articles']:
+            print(f"    Found {len(articles['articles'])} articles for {symbol}.")
+            news.articles = [NewsArticle.from_api(symbol, article) for article in articles['articles']]
+        else:
+            print(f"    No news found for {symbol}.")
+
+    except Exception as e:
+        print(f"    Error fetching news for {symbol}: {_error_message(e)}")
+        news.error = _error_message(e)
+
+    return news
+
+def _incremental_since(companies: List[Dict], window_start: str) -> Dict[str, str]:
+    """
+    Returns {symbol: high-water mark} for symbols whose stored mark is inside the window
+    and was recorded for the same search query; other symbols need the full window.
+    """
+    marks = fetch_news_watermarks(company.get('Symbol') for company in companies)
+    since = {}
+    for company in companies:
+        symbol = company.get('Symbol')
+        stored = marks.get(symbol)
+        if stored is not None and stored[0] == _company_query(company) and stored[1] >= window_start:
+            since[symbol] = stored[1]
+    return since
+
+def _merge_stored_news(news_list: List[CompanyNews], since: Dict[str, str], window_start: str) -> List[CompanyNews]:
+    """
+    Stores the newly fetched articles and advances each symbol's high-water mark, then
+    completes incrementally fetched symbols with their stored articles from the window.
+    Marks only advance to articles that are stored, which needs a URL and a publishedAt.
+    New articles come first; each symbol keeps at most ARTICLES_PER_COMPANY.
+    """
+    marks = {}
+    rows = []
+    for news in news_list:
+        if news.error is not None:
+            continue
+        published = []
+        for article in news.articles:
+            if article.url and article.publishedAt:
+                rows.append((news.symbol, article.url, article.publishedAt, json.dumps(article.to_dict())))
+                published.append(article.publishedAt)
+        newest = max(published + [since.get(news.symbol, "")])
+        if newest:
+            marks[news.symbol] = (news.symbol, news.query, newest)
+    stored = fetch_stored_articles(since, window_start) if since else {}
+    refetched = [news.symbol for news in news_list if news.error is None and news.symbol not in since]
+    store_news_articles(rows, list(marks.values()), prune_before=window_start, replace_symbols=refetched)
+
+    merged = []
+    for news in news_list:
+        if news.error is not None or news.symbol not in since:
+            merged.append(news)
+            continue
+        urls = {article.url for article in news.articles}
+        articles = list(news.articles)
+        for text in stored.get(news.symbol, []):
+            if len(articles) >= ARTICLES_PER_COMPANY:
+                break
+            article = NewsArticle.from_dict(json.loads(text))
+            if article.url not in urls:
+                urls.add(article.url)
+                articles.append(article)
+        merged.append(CompanyNews(symbol=news.symbol, query=news.query, articles=articles[:ARTICLES_PER_COMPANY]))
+    return merged
+
+def fetch_news_records(
+    companies: List[Dict],
+    days_back: int = 7,
+    max_workers: int = NEWSAPI_MAX_WORKERS,
+    rate_per_sec: float = NEWSAPI_RATE_PER_SEC,
+    batch_size: int = NEWSAPI_BATCH_SIZE,
+    incremental: bool = NEWS_INCREMENTAL_ENABLED,
+    newsapi=None,
+    end_date: datetime = None
+) -> Optional[List[CompanyNews]]:
+    """
+    Fetches news for a list of companies on a thread pool, with all requests sharing
+    one token bucket so the combined rate stays within the NewsAPI quota.
+    With batch_size > 1, companies are packed into batched OR queries. With
+    incremental, symbols fetched before only request articles newer than their
+    high-water mark, merged with the stored articles of the window.
+    The window covers days_back days up to end_date, by default now. High-water marks
+    track the current window, so a window ending at an earlier end_date is always
+    fetched in full.
+    newsapi overrides the client chosen by NEWSAPI_CLIENT.
+    Returns one CompanyNews per company, in the same order as companies,
+    or None if NEWSAPI_KEY is missing for the live client.
+    """
+    if newsapi is None:
+        newsapi = make_newsapi_client()
+    if newsapi is None:
+        print("NEWSAPI_KEY not found. News fetching skipped.")
+        return None
+
+    if end_date is not None:
+        incremental = False
+    end_date = end_date or datetime.now()
     start_date = end_date - timedelta(days=days_back)
-    
-    summary_text = f"News Summary generated on {end_date.strftime('%Y-%m-%d')}\n"
-    summary_text += "=" * 50 + "\n\n"
-    
+
     print(f"Fetching news for {len(companies)} companies from {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}...")
-    
-    for company in companies:
-        query = company.get('SearchQuery', company.get('Company Name', company.get('Symbol')))
-        symbol = company.get('Symbol', 'Unknown')
-        
-        print(f"  Fetching news for {symbol} with query: '{query}'...")
-        
-        try:
-            # Add a small delay or check rate limits if necessary in production
-            articles = newsapi.get_everything(q=query,
-                                              from_param=start_date.strftime('%Y-%m-%d'),
-                                              to=end_date.strftime('%Y-%m-%d'),
-                                              language='en',
-                                              sort_by='relevancy',
-                                              page_size=5)
-            
-            if articles['status'] == 'ok' and articles['articles']:
-                print(f"    Found {len(articles['articles'])} articles for {symbol}.")
-                summary_text += f"\n## News for {symbol} ({query})\n"
-                for article in articles['articles']:
-                    summary_text += f"- **{article['title']}** ({article['source']['name']}) - {article['publishedAt'][:10]}\n"
-                    summary_text += f"  {article['url']}\n"
-            else:
-                print(f"    No news found for {symbol}.")
-                summary_text += f"\n## No news found for {symbol} ({query})\n"
-                
-            time.sleep(1) # Add a 1-second delay to avoid rate limiting
-                
-        except Exception as e:
-            print(f"    Error fetching news for {symbol}: {str(e)}")
-            summary_text += f"\nError fetching news for {symbol}: {str(e)}\n"
-            
+
+    window_start = start_date.strftime('%Y-%m-%d')
+    since = _incremental_since(companies, window_start) if incremental else {}
+    if since:
+        print(f"Incremental news: {len(since)} of {len(companies)} companies only need articles newer than their last fetch.")
+
+    def batch_since(batch: List[Dict]) -> Optional[str]:
+        # A shared query must cover its oldest mark; one company without a mark needs the full window
+        marks = [since.get(company.get('Symbol')) for company in batch]
+        # NewsAPI takes the timestamp without its zone suffix
+        return min(marks)[:19] if all(marks) else None
+
+    limiter = TokenBucket(rate_per_sec, NEWSAPI_BURST)
+    cache = open_news_cache()
+    batches = batch_companies(companies, batch_size) if batch_size > 1 else [[company] for company in companies]
+    if batch_size > 1:
+        print(f"Packing {len(companies)} companies into {len(batches)} batched queries.")
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(batches)))) as executor:
+        # map() yields results in input order, so the summary order does not depend on timing
+        results = executor.map(lambda batch: fetch_batch_news(newsapi, batch, start_date, end_date, limiter, cache, since=batch_since(batch)), batches)
+        news_list = [news for batch_news in results for news in batch_news]
+    if cache is not None:
+        print(f"News cache: {cache.hits} hits, {cache.misses} misses ({cache.hit_rate():.0%} hit rate).")
+    if incremental:
+        news_list = _merge_stored_news(news_list, since, window_start)
+
     print("News fetching complete.")
-    return summary_text
+    return news_list
+
+def fetch_news(companies: List[Dict], days_back: int = 7) -> str:
+    """
+    Fetches news for a list of companies.
+    Returns a formatted string summary.
+    """
+    news_list = fetch_news_records(companies, days_back=days_back)
+    if news_list is None:
+        return "Error: NEWSAPI_KEY not found."
+    return "".join(render_news_summary(news_list))
 
-def save_news_summary(companies: List[Dict], output_dir: str = "files") -> str:
+def save_news_summary(
+    companies: List[Dict],
+    output_dir: str = "files",
+    report_date: str = None,
+    news_list: Optional[List[CompanyNews]] = None,
+    fetch: bool = True
+) -> str:
     """
-    Fetches news and saves it to a file named NewsSummary-yyyy-mm-dd.txt.
-    Returns the path to the saved file.
+    Fetches news and saves it to a file named NewsSummary-yyyy-mm-dd.txt, with the
+    article records in NewsSummary-yyyy-mm-dd.jsonl next to it.
+    report_date overrides the date in the filename; news_list skips fetching
+    and saves already fetched news. Callers that already tried to fetch pass
+    fetch=False, so a None news_list (no NEWSAPI_KEY) is saved as the error note
+    without a second attempt. Near-duplicate articles across the run are removed
+    before saving unless NEWS_DEDUPE_ENABLED is False.
+    Returns the path to the saved text file.
     """
-    summary_content = fetch_news(companies)
+    if news_list is None and fetch:
+        news_list = fetch_news_records(companies)
+    if news_list is not None and NEWS_DEDUPE_ENABLED:
+        news_list = dedupe_news(news_list)
     
-    current_date = datetime.now().strftime('%Y-%m-%d')
+    current_date = report_date or datetime.now().strftime('%Y-%m-%d')
     filename = f"NewsSummary-{current_date}.txt"
     
     os.makedirs(output_dir, exist_ok=True)
     file_path = os.path.join(output_dir, filename)
     
     with open(file_path, "w", encoding="utf-8") as f:
-        f.write(summary_content)
+        if news_list is None:
+            f.write("Error: NEWSAPI_KEY not found.")
+        else:
+            f.writelines(render_news_summary(news_list))
+
+    if news_list is not None:
+        count = write_articles_jsonl(news_list, articles_path_for(file_path))
+        print(f"Saved {count} article records to {articles_path_for(file_path)}")
         
     return file_path
@@ -0,0 +1,109 @@
+import os
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Iterable, Iterator, List, Optional
+
+
+@dataclass(slots=True)
+class NewsArticle:
+    """One article returned by NewsAPI for a symbol."""
+    symbol: str
+    title: str
+    source: str
+    publishedAt: str
+    url: str
+    description: Optional[str] = None
+
+    @classmethod
+    def from_api(cls, symbol: str, article: Dict) -> "NewsArticle":
+        """Builds a record from one entry of a get_everything response."""
+        return cls(
+            symbol=symbol,
+            title=article.get('title') or '',
+            source=(article.get('source') or {}).get('name') or '',
+            publishedAt=article.get('publishedAt') or '',
+            url=article.get('url') or '',
+            description=article.get('description'),
+        )
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "NewsArticle":
+        return cls(**{key: data.get(key) for key in cls.__slots__})
+
+    def to_dict(self) -> Dict:
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+@dataclass(slots=True)
+class CompanyNews:
+    """The news fetched for one company: its query, the articles found, or the error raised."""
+    symbol: str
+    query: str
+    articles: List[NewsArticle] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def to_json(self) -> str:
+        return json.dumps({
+            'symbol': self.symbol,
+            'query': self.query,
+            'articles': [article.to_dict() for article in self.articles],
+            'error': self.error,
+        })
+
+    @classmethod
+    def from_json(cls, text: str) -> "CompanyNews":
+        data = json.loads(text)
+        return cls(
+            symbol=data['symbol'],
+            query=data['query'],
+            articles=[NewsArticle.from_dict(article) for article in data.get('articles', [])],
+            error=data.get('error'),
+        )
+
+
+def render_company_news(news: CompanyNews) -> Iterator[str]:
+    """Yields the markdown lines of one company's section in the news summary."""
+    if news.error is not None:
+        yield f"\nError fetching news for {news.symbol}: {news.error}\n"
+    elif news.articles:
+        yield f"\n## News for {news.symbol} ({news.query})\n"
+        for article in news.articles:
+            yield f"- **{article.title}** ({article.source}) - {article.publishedAt[:10]}\n"
+            yield f"  {article.url}\n"
+    else:
+        yield f"\n## No news found for {news.symbol} ({news.query})\n"
+
+
+def render_news_summary(news_list: Iterable[CompanyNews], generated_on: datetime = None) -> Iterator[str]:
+    """Lazily yields the full text summary, header first, one company section after another."""
+    generated_on = generated_on or datetime.now()
+    yield f"News Summary generated on {generated_on.strftime('%Y-%m-%d')}\n"
+    yield "=" * 50 + "\n\n"
+    for news in news_list:
+        yield from render_company_news(news)
+
+
+def articles_path_for(news_summary_path: str) -> str:
+    """Returns the JSONL article file stored next to a NewsSummary-*.txt file."""
+    return os.path.splitext(news_summary_path)[0] + ".jsonl"
+
+
+def write_articles_jsonl(news_list: Iterable[CompanyNews], path: str) -> int:
+    """Writes one JSON article record per line. Returns the number of articles written."""
+    count = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for news in news_list:
+            for article in news.articles:
+                f.write(json.dumps(article.to_dict()) + "\n")
+                count += 1
+    return count
+
+
+def read_articles_jsonl(path: str) -> Iterator[NewsArticle]:
+    """Streams article records back from a JSONL file."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield NewsArticle.from_dict(json.loads(line))
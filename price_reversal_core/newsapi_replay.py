@@ -0,0 +1,178 @@
+import os
+import re
+import json
+import time
+import zlib
+import random
+import hashlib
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from newsapi.newsapi_exception import NewsAPIException
+
+# Offline stand-in for NewsApiClient, selected with NEWSAPI_CLIENT=replay in .env.
+NEWSAPI_REPLAY_DIR = os.getenv("NEWSAPI_REPLAY_DIR", os.path.join("files", "newsapi_recordings"))
+NEWSAPI_REPLAY_ARTICLES = int(os.getenv("NEWSAPI_REPLAY_ARTICLES", 5))
+NEWSAPI_REPLAY_LATENCY_MS = float(os.getenv("NEWSAPI_REPLAY_LATENCY_MS", 200))
+NEWSAPI_REPLAY_ERROR_RATE = float(os.getenv("NEWSAPI_REPLAY_ERROR_RATE", 0))
+NEWSAPI_REPLAY_RATE_LIMIT_RATE = float(os.getenv("NEWSAPI_REPLAY_RATE_LIMIT_RATE", 0))
+NEWSAPI_REPLAY_SEED = int(os.getenv("NEWSAPI_REPLAY_SEED", 0))
+
+_SOURCES = ["Reuters", "Bloomberg", "Yahoo Entertainment", "MarketWatch", "Biztoc.com", "Seeking Alpha", "CNBC"]
+# Headlines are random word sequences after the company name, so synthetic articles
+# stay distinct under near-duplicate detection
+_WORDS = (
+    "shares rally slide surge slump earnings guidance outlook dividend buyback merger "
+    "acquisition stake deal partnership contract lawsuit settlement regulator probe "
+    "upgrade downgrade analyst target forecast revenue margin profit loss quarter "
+    "annual capex spending expansion layoffs hiring chief executive board investors "
+    "bond offering debt rating credit supply chain demand pricing tariff export "
+    "launch product platform cloud chips energy drilling pipeline pharmacy trial "
+    "approval recall factory plant strike union record weekly options volatility "
+    "momentum reversal breakout support resistance futures premarket closing"
+).split()
+
+
+def recording_key(params: Dict) -> str:
+    """File name stem for a recorded response: the request parameters with the query normalized."""
+    normalized = {key: value for key, value in params.items() if key not in ('from_param', 'to')}
+    normalized['q'] = re.sub(r'\s+', ' ', str(params.get('q', ''))).strip().lower()
+    return hashlib.sha256(json.dumps(normalized, sort_keys=True).encode("utf-8")).hexdigest()[:32]
+
+
+def _query_terms(q: str) -> List[str]:
+    """The phrases of a query, split on OR, so batched queries get articles for each term."""
+    terms = [term.strip().strip('"()').strip() for term in re.split(r'\s+OR\s+', q or '')]
+    return [term for term in terms if term] or ['Market']
+
+
+def _parse_date(value: str, default: datetime) -> datetime:
+    if not value:
+        return default
+    try:
+        return datetime.fromisoformat(value.rstrip('Z'))
+    except ValueError:
+        return default
+
+
+class ReplayNewsApiClient:
+    """
+    Speaks the get_everything contract of NewsApiClient without a network.
+
+    Responses recorded by RecordingNewsApiClient are replayed when one exists for the
+    request; otherwise articles are synthesized deterministically from the query, with
+    articles_per_term headlines naming each OR term. Every call sleeps about latency_ms,
+    and fails with a rate-limit (429) or server error at the configured rates, so the
+    fetch stage can be load-tested at any volume.
+    """
+
+    def __init__(
+        self,
+        api_key: str = None,
+        recordings_dir: str = NEWSAPI_REPLAY_DIR,
+        articles_per_term: int = NEWSAPI_REPLAY_ARTICLES,
+        latency_ms: float = NEWSAPI_REPLAY_LATENCY_MS,
+        error_rate: float = NEWSAPI_REPLAY_ERROR_RATE,
+        rate_limit_rate: float = NEWSAPI_REPLAY_RATE_LIMIT_RATE,
+        seed: int = NEWSAPI_REPLAY_SEED
+    ):
+        self.recordings_dir = recordings_dir
+        self.articles_per_term = articles_per_term
+        self.latency_ms = latency_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.seed = seed
+        self.calls = 0
+        self.replayed = 0
+        self.rate_limited = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _load_recording(self, params: Dict) -> Dict:
+        if not self.recordings_dir:
+            return None
+        path = os.path.join(self.recordings_dir, f"{recording_key(params)}.json")
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def _synthesize(self, q: str, start: datetime, end: datetime, page_size: int) -> Dict:
+        articles = []
+        span = max((end - start).total_seconds(), 1.0)
+        for term in _query_terms(q):
+            # Seeded per term, so the same query always yields the same articles
+            rng = random.Random(zlib.crc32(term.lower().encode("utf-8")) ^ self.seed)
+            slug = re.sub(r'[^a-z0-9]+', '-', term.lower()).strip('-')
+            for i in range(self.articles_per_term):
+                published = start + timedelta(seconds=rng.random() * span)
+                articles.append({
+                    'source': {'id': None, 'name': rng.choice(_SOURCES)},
+                    'author': None,
+                    'title': f"{term}: {' '.join(rng.sample(_WORDS, 6))}",
+                    'description': f"Synthetic coverage of {term} for offline testing.",
+                    'url': f"https://replay.example.com/{slug}/{i}",
+                    'publishedAt': published.strftime('%Y-%m-%dT%H:%M:%SZ'),
+                    'content': None,
+                })
+        articles.sort(key=lambda article: article['publishedAt'], reverse=True)
+        return {'status': 'ok', 'totalResults': len(articles), 'articles': articles[:page_size]}
+
+    def get_everything(self, q: str = None, from_param: str = None, to: str = None, page_size: int = None, **kwargs) -> Dict:
+        with self._lock:
+            self.calls += 1
+            roll = self._random.random()
+            jitter = self._random.uniform(0.5, 1.5)
+        if self.latency_ms > 0:
+            time.sleep(self.latency_ms * jitter / 1000)
+        if roll < self.rate_limit_rate:
+            with self._lock:
+                self.rate_limited += 1
+            raise NewsAPIException({'status': 'error', 'code': 'rateLimited',
+                                    'message': 'You have made too many requests recently (replay).'})
+        if roll < self.rate_limit_rate + self.error_rate:
+            with self._lock:
+                self.errors += 1
+            raise NewsAPIException({'status': 'error', 'code': 'unexpectedError',
+                                    'message': 'Simulated server error (replay).'})
+
+        page_size = min(page_size or 100, 100)
+        recorded = self._load_recording(dict(kwargs, q=q, page_size=page_size))
+        if recorded is not None:
+            with self._lock:
+                self.replayed += 1
+            return dict(recorded, articles=recorded.get('articles', [])[:page_size])
+        now = datetime.now()
+        end = _parse_date(to, now)
+        if to and len(to) == 10:
+            # A date-only 'to' includes the whole day
+            end += timedelta(days=1)
+        end = min(end, now)
+        start = _parse_date(from_param, end - timedelta(days=7))
+        return self._synthesize(q, start, end, page_size)
+
+
+class RecordingNewsApiClient:
+    """
+    Wraps a live NewsApiClient and saves every successful get_everything response to
+    recordings_dir, in the layout ReplayNewsApiClient reads back.
+    Selected with NEWSAPI_CLIENT=record.
+    """
+
+    def __init__(self, client, recordings_dir: str = NEWSAPI_REPLAY_DIR):
+        self.client = client
+        self.recordings_dir = recordings_dir
+        os.makedirs(recordings_dir, exist_ok=True)
+
+    def get_everything(self, **params) -> Dict:
+        response = self.client.get_everything(**params)
+        if response.get('status') == 'ok':
+            key = dict(params, page_size=min(params.get('page_size') or 100, 100))
+            path = os.path.join(self.recordings_dir, f"{recording_key(key)}.json")
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(response, f)
+            os.replace(tmp_path, path)
+        return response
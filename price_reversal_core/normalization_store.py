@@ -0,0 +1,74 @@
+import os
+import json
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from price_reversal_core.database_manager import fetch_search_queries, upsert_search_queries
+
+# Bump when the normalization prompt or rules change, so stored queries are redone.
+NORMALIZER_VERSION = 1
+
+NORMALIZATION_STORE_ENABLED = os.getenv("NORMALIZATION_STORE_ENABLED", "True").lower() == "true"
+# Stored queries older than this are sent to the LLM again.
+NORMALIZATION_TTL_DAYS = float(os.getenv("NORMALIZATION_TTL_DAYS", 90))
+OVERRIDES_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "config", "search_query_overrides.json"))
+
+# (mtime, {symbol: query}) of the overrides file, reloaded when it changes.
+_overrides = (None, {})
+
+
+def load_overrides(path: str = OVERRIDES_PATH) -> Dict[str, str]:
+    """
+    Returns the manual {Symbol: SearchQuery} overrides from config. They always win
+    over stored and LLM queries. A missing file means no overrides.
+    """
+    global _overrides
+    if not os.path.exists(path):
+        return {}
+    mtime = os.path.getmtime(path)
+    if _overrides[0] != mtime:
+        with open(path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        _overrides = (mtime, {str(symbol).strip().upper(): query for symbol, query in entries.items() if query})
+        print(f"Loaded {len(_overrides[1])} search query overrides.")
+    return _overrides[1]
+
+
+def _is_fresh(entry: Dict, company_name: str, now: datetime) -> bool:
+    if entry['normalizer_version'] != NORMALIZER_VERSION:
+        return False
+    if (entry['company_name'] or '') != (company_name or ''):
+        return False
+    try:
+        updated_at = datetime.fromisoformat(entry['updated_at'])
+    except (TypeError, ValueError):
+        return False
+    return now - updated_at <= timedelta(days=NORMALIZATION_TTL_DAYS)
+
+
+def lookup_search_queries(tickers_data: List[Dict]) -> Dict[str, str]:
+    """
+    Returns the SearchQuery of each symbol with a fresh stored normalization. An entry
+    is stale when it was made by another normalizer version, for a different company
+    name, or more than NORMALIZATION_TTL_DAYS ago.
+    """
+    if not NORMALIZATION_STORE_ENABLED or not tickers_data:
+        return {}
+    entries = fetch_search_queries(item.get('Symbol') for item in tickers_data)
+    now = datetime.now()
+    stored = {}
+    for item in tickers_data:
+        entry = entries.get(item.get('Symbol'))
+        if entry is not None and _is_fresh(entry, item.get('Company Name'), now):
+            stored[item.get('Symbol')] = entry['search_query']
+    return stored
+
+
+def remember_search_queries(tickers_data: List[Dict]):
+    """Stores the SearchQuery of each item, as made by the current normalizer version."""
+    if not NORMALIZATION_STORE_ENABLED or not tickers_data:
+        return
+    upsert_search_queries(
+        [(item.get('Symbol'), item.get('Company Name'), item['SearchQuery']) for item in tickers_data],
+        NORMALIZER_VERSION,
+    )
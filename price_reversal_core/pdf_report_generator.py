@@ -2,6 +2,11 @@ import re
 import os
 import datetime
 import json
+import time
+import hashlib
+import queue
+import threading
+import itertools
 import pandas as pd
 import pypdf
 import google.generativeai as genai
@@ -10,57 +15,101 @@ from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, Tabl
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
-from typing import List, Dict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, List, Dict, Optional, Tuple
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from google.api_core.exceptions import ResourceExhausted, InternalServerError, ServiceUnavailable
+from google.api_core.exceptions import ResourceExhausted, InternalServerError, ServiceUnavailable, DeadlineExceeded
 
 # Load environment variables
 from dotenv import load_dotenv
 load_dotenv()
 
+from price_reversal_core.schema import serialize_records
+from price_reversal_core.context_packer import REPORT_PRIMER_TOKEN_BUDGET, pack_news_context, truncate_to_budget
+from price_reversal_core.ttl_cache import TTLCache
+from price_reversal_core.context_bundle import load_context_bundle
+from price_reversal_core.markdown_flowables import last_block_boundary, markdown_to_paragraphs, report_styles
+
+REPORT_MODEL = 'models/gemini-pro-latest'
+
+# Report prompts run concurrently, at most this many Gemini calls at a time.
+REPORT_MAX_CONCURRENCY = int(os.getenv("REPORT_MAX_CONCURRENCY", 5))
+# Each call is abandoned after this many seconds; a timed-out section is not retried.
+REPORT_CALL_TIMEOUT_SECONDS = float(os.getenv("REPORT_CALL_TIMEOUT_SECONDS", 180))
+# 'per_prompt' sends the shared context with every prompt; 'consolidated' sends it once
+# with all tasks in a single call.
+REPORT_MODE = os.getenv("REPORT_MODE", "per_prompt").lower()
+
+# Streaming renders each section's markdown into flowables while Gemini is still writing.
+# Past the deadline (seconds after generation starts, 0 for none) the report is built
+# with whatever the sections have produced so far.
+REPORT_STREAMING = os.getenv("REPORT_STREAMING", "False").lower() == "true"
+REPORT_DEADLINE_SECONDS = float(os.getenv("REPORT_DEADLINE_SECONDS", 0))
+DEADLINE_NOTE = "Section incomplete: the report deadline was reached."
+
+# Gemini report calls in flight across the whole process. Reports generated side by side
+# (backfill dates) share these slots, so together they stay within REPORT_MAX_CONCURRENCY.
+_call_slots = threading.BoundedSemaphore(max(1, REPORT_MAX_CONCURRENCY))
+
+# "=== SECTION 2 ===" on a line of its own, also as a heading or in bold ("### === SECTION 2 ===",
+# "**=== SECTION 2 ===**", "=== **SECTION 2** ===")
+_SECTION_MARKER = re.compile(
+    r'^[ \t]*(?:#{1,6}[ \t]*)?[*_]*[ \t]*=+[ \t]*[*_]*SECTION[ \t]+(\d+)[*_]*[ \t]*=+[ \t]*[*_]*[ \t]*$',
+    re.MULTILINE | re.IGNORECASE
+)
+
+# Section responses are cached by model and full prompt, so identical reruns skip Gemini.
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "True").lower() == "true"
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join("files", "cache", "llm_cache.db"))
+LLM_CACHE_TTL_HOURS = float(os.getenv("LLM_CACHE_TTL_HOURS", 72))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", 32))
+
+# Shared by every page footer, so it is built once
+FOOTER_STYLE = ParagraphStyle(
+    'footer',
+    parent=getSampleStyleSheet()['Normal'],
+    alignment=1, # TA_CENTER
+    fontSize=8,
+    leading=10,
+    textColor=colors.gray,
+)
+
 # --- Helper Functions ---
-def _footer_callback(canvas_obj, doc):
+class PageFooter:
     """
-    Draws the footer on each page.
+    Page callback drawing the footer: the AI advisory and generation timestamp, centred,
+    and the page number on the left.
+
+    The timestamp is taken once when the footer is created, so every page shows the same
+    time. The advisory and timestamp are wrapped and drawn once into a PDF form on the
+    first page; later pages reuse the form and only draw their page number.
     """
-    canvas_obj.saveState()
-    # Footer content
-    advisory = "<i>This content was created with Artificial Intelligence</i>"
-    generated_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    timestamp = f"<i>Generated on: {generated_time}</i>"
-
-    # Define a style for the footer
-    styles = getSampleStyleSheet()
-    footer_style = ParagraphStyle(
-        'footer',
-        parent=styles['Normal'],
-        alignment=1, # TA_CENTER
-        fontSize=8,
-        leading=10,
-        textColor=colors.gray,
-    )
-
-    # Page number
-    page_num_text = f"Page {doc.page}"
-    canvas_obj.setFont('Helvetica', 8)
-    canvas_obj.setFillColor(colors.gray)
-    canvas_obj.drawString(inch, 0.75 * inch, page_num_text) # Left aligned page number
-
-    # Advisory text
-    p_advisory = Paragraph(advisory, footer_style)
-    # Calculate width of the advisory paragraph
-    text_width, text_height = p_advisory.wrapOn(canvas_obj, doc.width, doc.bottomMargin)
-    # Center the advisory
-    p_advisory.drawOn(canvas_obj, doc.leftMargin + (doc.width - text_width) / 2.0, 0.85 * inch)
-    
-    # Timestamp text
-    p_timestamp = Paragraph(timestamp, footer_style)
-    # Calculate width of the timestamp paragraph
-    text_width, text_height = p_timestamp.wrapOn(canvas_obj, doc.width, doc.bottomMargin)
-    # Center the timestamp
-    p_timestamp.drawOn(canvas_obj, doc.leftMargin + (doc.width - text_width) / 2.0, 0.75 * inch)
-    
-    canvas_obj.restoreState()
+
+    FORM_NAME = "prns_footer"
+
+    def __init__(self, generated_time: datetime.datetime = None):
+        generated_time = (generated_time or datetime.datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
+        self.advisory = Paragraph("<i>This content was created with Artificial Intelligence</i>", FOOTER_STYLE)
+        self.timestamp = Paragraph(f"<i>Generated on: {generated_time}</i>", FOOTER_STYLE)
+
+    def _render_form(self, canvas_obj, doc):
+        canvas_obj.beginForm(self.FORM_NAME)
+        for paragraph, y in ((self.advisory, 0.85 * inch), (self.timestamp, 0.75 * inch)):
+            text_width, _ = paragraph.wrap(doc.width, doc.bottomMargin)
+            paragraph.drawOn(canvas_obj, doc.leftMargin + (doc.width - text_width) / 2.0, y)
+        canvas_obj.endForm()
+
+    def __call__(self, canvas_obj, doc):
+        canvas_obj.saveState()
+        if not canvas_obj.hasForm(self.FORM_NAME):
+            self._render_form(canvas_obj, doc)
+        canvas_obj.doForm(self.FORM_NAME)
+        # Page number
+        canvas_obj.setFont('Helvetica', 8)
+        canvas_obj.setFillColor(colors.gray)
+        canvas_obj.drawString(inch, 0.75 * inch, f"Page {doc.page}") # Left aligned page number
+        canvas_obj.restoreState()
 
 def extract_pdf_text(pdf_path: str) -> str:
     try:
@@ -72,189 +121,372 @@ def extract_pdf_text(pdf_path: str) -> str:
     except Exception as e:
         return f"Error reading PDF: {str(e)}"
 
-def markdown_to_paragraphs(markdown_text: str, styles: dict) -> list:
-    """
-    Converts a simple markdown text to a list of ReportLab Flowables.
-    Handles headings, bold, italic, lists, and basic tables as formatted ReportLab tables.
-    """
-    story = []
-    lines = markdown_text.split('\n')
-    in_table_block = False
-    table_lines = []
-
-    for line_idx, line in enumerate(lines):
-        # Detect markdown table lines (starts with '|' and contains other '|' or is a separator)
-        is_table_related_line = line.strip().startswith('|')
-        
-        if is_table_related_line:
-            table_lines.append(line)
-            in_table_block = True
-            continue
-        
-        if in_table_block and not is_table_related_line:
-            # End of table block, process collected table_lines
-            if table_lines:
-                processed_table_data = []
-                # First, determine if there's a separator line and process header/body separately
-                header_row = []
-                separator_idx = -1
-
-                # Find separator line (e.g., |---|---|) 
-                for i, t_line in enumerate(table_lines):
-                    # Check for a line consisting primarily of hyphens and pipes
-                    if re.match(r'^\|[\s\-\:|]*$', t_line.strip()):
-                        separator_idx = i
-                        break
-                
-                if separator_idx != -1:
-                    # Process header row
-                    header_row_str = table_lines[0]
-                    header_cells = [cell.strip() for cell in header_row_str.split('|') if cell.strip()]
-                    processed_table_data.append([Paragraph(f"<b>{cell}</b>", styles['Normal']) for cell in header_cells])
-
-                    # Process body rows (skip separator line)
-                    for b_line_str in table_lines[separator_idx + 1:]:
-                        body_cells = [cell.strip() for cell in b_line_str.split('|') if cell.strip()]
-                        processed_table_data.append([Paragraph(cell, styles['Normal']) for cell in body_cells])
-                else: # No explicit separator, treat all rows as body (no bold header)
-                    for t_line in table_lines:
-                        row_cells = [cell.strip() for cell in t_line.split('|')]
-                        processed_table_data.append([Paragraph(cell, styles['Normal']) for cell in row_cells if cell])
-                
-                if processed_table_data:
-                    # Ensure all rows have the same number of columns for ReportLab Table
-                    max_cols = max(len(row) for row in processed_table_data) if processed_table_data else 0
-                    max_cols = max(1, max_cols) # Ensure max_cols is at least 1
-                    processed_table_data = [row + [Paragraph('', styles['Normal'])] * (max_cols - len(row)) for row in processed_table_data]
-                    
-                    # Calculate column widths based on page size
-                    page_width = letter[0]
-                    left_right_margin = 0.5 * inch # Assuming 0.5 inch margin on each side
-                    available_width = page_width - (2 * left_right_margin)
-                    
-                    col_widths = [available_width / max_cols] * max_cols if max_cols > 0 else [None]
-                    
-                    table_style = TableStyle([
-                        ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-                        ('TEXTCOLOR', (0,0), (-1,0), colors.black),
-                        ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-                        ('FONTNAME', (0,0), (-1,0), 'Helvetica'), # Use Helvetica for general text
-                        ('BOTTOMPADDING', (0,0), (-1,0), 6),
-                        ('BACKGROUND', (0,1), (-1,-1), colors.white),
-                        ('GRID', (0,0), (-1,-1), 1, colors.black),
-                        ('VALIGN', (0,0), (-1,-1), 'TOP'),
-                        ('WORDWRAP', (0,0), (-1,-1), True), # Enable word wrapping
-                        ('FONTNAME', (0,0), (max_cols - 1,0), 'Helvetica-Bold'), # Header text is bold
-                    ])
-                    
-                    t = Table(processed_table_data, colWidths=col_widths)
-                    t.setStyle(table_style)
-                    story.append(t)
-                    story.append(Spacer(1, 12)) # Add spacing after table
-                
-                table_lines = [] # Clear for next table
-            in_table_block = False
-        
-        # If still in table block, continue to next line
-        if in_table_block:
-            continue
-
-        # Process non-table lines
-        if line.startswith('# '):
-            story.append(Paragraph(line[2:], styles['CustomH1']))
-        elif line.startswith('## '):
-            story.append(Paragraph(line[3:], styles['CustomH2']))
-        elif line.startswith('### '):
-            story.append(Paragraph(line[4:], styles['CustomH3']))
-        elif line.startswith('* '):
-            story.append(Paragraph(f"• {line[2:]}", styles['Normal']))
-        elif line.strip() == '':
-            story.append(Spacer(1, 12))
-        else:
-            # Simple bold and italic using regex
-            line = re.sub(r'\*\*(.*?)\*\*', r'<b>\1</b>', line)
-            line = re.sub(r'\*(.*?)\*', r'<i>\1</i>', line)
-            story.append(Paragraph(line, styles['Normal']))
-    
-    # Process any remaining table lines if file ends with a table
-    if in_table_block and table_lines:
-        processed_table_data = []
-        header_row = []
-        separator_idx = -1
-
-        for i, t_line in enumerate(table_lines):
-            if re.match(r'^\|[\s\-\:|]*$', t_line.strip()):
-                separator_idx = i
-                break
-        
-        if separator_idx != -1:
-            header_row_str = table_lines[0]
-            header_cells = [cell.strip() for cell in header_row_str.split('|') if cell.strip()]
-            processed_table_data.append([Paragraph(f"<b>{cell}</b>", styles['Normal']) for cell in header_cells])
-
-            for b_line_str in table_lines[separator_idx + 1:]:
-                body_cells = [cell.strip() for cell in b_line_str.split('|') if cell.strip()]
-                processed_table_data.append([Paragraph(cell, styles['Normal']) for cell in body_cells])
-        else:
-            for t_line in table_lines:
-                row_cells = [cell.strip() for cell in t_line.split('|')]
-                processed_table_data.append([Paragraph(cell, styles['Normal']) for cell in row_cells if cell])
-        
-        if processed_table_data:
-            max_cols = max(len(row) for row in processed_table_data) if processed_table_data else 0
-            max_cols = max(1, max_cols)
-            processed_table_data = [row + [Paragraph('', styles['Normal'])] * (max_cols - len(row)) for row in processed_table_data]
-
-            page_width = letter[0]
-            left_right_margin = 0.5 * inch
-            available_width = page_width - (2 * left_right_margin)
-            col_widths = [available_width / max_cols] * max_cols if max_cols > 0 else [None]
-
-            table_style = TableStyle([
-                ('BACKGROUND', (0,0), (-1,0), colors.lightgrey),
-                ('TEXTCOLOR', (0,0), (-1,0), colors.black),
-                ('ALIGN', (0,0), (-1,-1), 'LEFT'),
-                ('FONTNAME', (0,0), (-1,0), 'Helvetica'), # Use Helvetica for general text
-                ('BOTTOMPADDING', (0,0), (-1,0), 6),
-                ('BACKGROUND', (0,1), (-1,-1), colors.white),
-                ('GRID', (0,0), (-1,-1), 1, colors.black),
-                ('VALIGN', (0,0), (-1,-1), 'TOP'),
-                ('WORDWRAP', (0,0), (-1,-1), True), # Enable word wrapping
-                ('FONTNAME', (0,0), (max_cols - 1,0), 'Helvetica-Bold'), # Header text is bold
-            ])
-                
-            t = Table(processed_table_data, colWidths=col_widths)
-            t.setStyle(table_style)
-            story.append(t)
-            story.append(Spacer(1, 12)) # Add spacing after table
-            
-    return story
-
 @retry(
     stop=stop_after_attempt(3),
     wait=wait_exponential(multiplier=2, min=5, max=60),
     retry=retry_if_exception_type((ResourceExhausted, InternalServerError, ServiceUnavailable)),
     reraise=True
 )
-def _generate_response_with_retry(model, full_prompt: str) -> str:
+def _generate_response_with_retry(model, full_prompt: str):
     """Internal function to call the Gemini API for report generation with retry logic."""
-    return model.generate_content(full_prompt).text
+    # The slot is held per attempt, so backoff between retries leaves it to other sections
+    with _call_slots:
+        return model.generate_content(full_prompt, request_options={'timeout': REPORT_CALL_TIMEOUT_SECONDS})
+
+@retry(
+    stop=stop_after_attempt(3),
+    wait=wait_exponential(multiplier=2, min=5, max=60),
+    retry=retry_if_exception_type((ResourceExhausted, InternalServerError, ServiceUnavailable)),
+    reraise=True
+)
+def _start_stream_with_retry(model, full_prompt: str):
+    """
+    Opens a streaming response and waits for its first chunk, so that errors raised before
+    any text arrives are retried. Returns the response, the first chunk (None for an
+    empty stream) and the iterator over the remaining chunks.
+    """
+    response = model.generate_content(full_prompt, stream=True, request_options={'timeout': REPORT_CALL_TIMEOUT_SECONDS})
+    chunks = iter(response)
+    return response, next(chunks, None), chunks
+
+def _close_stream(response, chunks):
+    """Stops reading an abandoned stream and cancels the underlying call where the transport allows it."""
+    try:
+        chunks.close()
+        # The response wraps the transport's stream (a gRPC call or an HTTP response)
+        stream = getattr(response, '_iterator', None)
+        for name in ('cancel', 'close'):
+            method = getattr(stream, name, None)
+            if callable(method):
+                method()
+                break
+    except Exception as e:
+        print(f"Could not close an abandoned response stream: {e}")
+
+@dataclass(slots=True)
+class GenerationUsage:
+    """Gemini calls and tokens spent on one report, summed across worker threads."""
+    calls: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add(self, response):
+        metadata = getattr(response, 'usage_metadata', None)
+        try:
+            prompt_tokens = int(getattr(metadata, 'prompt_token_count', 0) or 0)
+            output_tokens = int(getattr(metadata, 'candidates_token_count', 0) or 0)
+        except (TypeError, ValueError):
+            prompt_tokens = output_tokens = 0
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += prompt_tokens
+            self.output_tokens += output_tokens
+
+def open_llm_cache() -> Optional[TTLCache]:
+    """Returns the on-disk report response cache configured in .env, or None if it is disabled."""
+    if not LLM_CACHE_ENABLED:
+        return None
+    return TTLCache(LLM_CACHE_PATH, LLM_CACHE_TTL_HOURS * 3600, int(LLM_CACHE_MAX_MB * 1024 * 1024), table="llm_responses")
+
+def llm_cache_key(model_name: str, full_prompt: str) -> str:
+    """Content address of a response: the model name and the fully assembled prompt."""
+    return hashlib.sha256(f"{model_name}\n{full_prompt}".encode("utf-8")).hexdigest()
+
+def _generate_cached(model, full_prompt: str, cache: TTLCache = None, usage: GenerationUsage = None, is_complete: Callable[[str], bool] = None) -> str:
+    """
+    Returns the response text for a prompt, from the cache when the same model already
+    saw the same prompt. Errors propagate after retries and nothing is cached for them.
+    With is_complete, a response it rejects is returned but not cached, so the next
+    run asks again.
+    """
+    key = llm_cache_key(REPORT_MODEL, full_prompt) if cache is not None else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+    response = _generate_response_with_retry(model, full_prompt)
+    if usage is not None:
+        usage.add(response)
+    response_text = response.text
+    if key is not None and (is_complete is None or is_complete(response_text)):
+        cache.put(key, response_text)
+    return response_text
+
+def _build_prompt(prompt_text: str, primer_text: str, news_summary: str, subset_str: str) -> str:
+    return f"""
+        You are a financial analyst.
+        CONTEXT: {primer_text}
+        NEWS SUMMARY: {news_summary}
+        DATA: {subset_str}
+        TASK: {prompt_text}
+        """
+
+def _build_consolidated_prompt(raw_prompts: List[str], primer_text: str, news_summary: str, subset_str: str) -> str:
+    """One prompt carrying the shared context once and every task, each answered under its own marker."""
+    tasks = "\n".join(f"TASK {i}: {prompt_text}\n" for i, prompt_text in enumerate(raw_prompts, start=1))
+    return f"""
+        You are a financial analyst.
+        CONTEXT: {primer_text}
+        NEWS SUMMARY: {news_summary}
+        DATA: {subset_str}
+        Complete each of the {len(raw_prompts)} tasks below separately and in order. Start each answer
+        with a line containing only "=== SECTION <task number> ===", followed by the answer in markdown.
+        Write nothing before the first marker.
+        {tasks}
+        """
+
+def _parse_sections(text: str, count: int) -> Dict[int, str]:
+    """
+    Splits a consolidated response on its section markers. Returns {task number: answer}
+    for the tasks 1..count with a non-empty answer; the first answer wins for repeats.
+    """
+    sections = {}
+    matches = list(_SECTION_MARKER.finditer(text))
+    for match, following in zip(matches, matches[1:] + [None]):
+        number = int(match.group(1))
+        body = text[match.end():following.start() if following else len(text)].strip()
+        if 1 <= number <= count and body and number not in sections:
+            sections[number] = body
+    return sections
+
+def _run_prompt(model, prompt_text: str, full_prompt: str, cache: TTLCache = None, usage: GenerationUsage = None) -> Dict:
+    """Runs one report prompt. Failures become the section's text, so the report is still built."""
+    try:
+        response_text = _generate_cached(model, full_prompt, cache, usage)
+    except (ResourceExhausted, InternalServerError, ServiceUnavailable) as e:
+        print(f"LLM call failed after retries for prompt '{prompt_text[:50]}...': {e}")
+        response_text = "Content generation failed due to API errors after multiple retries."
+    except DeadlineExceeded as e:
+        print(f"LLM call timed out after {REPORT_CALL_TIMEOUT_SECONDS:.0f}s for prompt '{prompt_text[:50]}...': {e}")
+        response_text = "Content generation timed out."
+    except Exception as e:
+        print(f"An unexpected error occurred for prompt '{prompt_text[:50]}...': {e}")
+        response_text = f"An unexpected error occurred: {str(e)}"
+    return {"prompt": prompt_text, "response": response_text}
+
+def _generate_responses(model, raw_prompts: List[str], primer_text: str, news_summary: str, subset_str: str, cache: TTLCache = None, usage: GenerationUsage = None) -> List[Dict]:
+    """
+    Runs the report prompts concurrently, at most REPORT_MAX_CONCURRENCY at a time, each
+    with its own retries and REPORT_CALL_TIMEOUT_SECONDS timeout, so a slow or backing-off
+    prompt does not hold up the others. Responses are returned in prompt order.
+    """
+    if not raw_prompts:
+        return []
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=max(1, min(REPORT_MAX_CONCURRENCY, len(raw_prompts)))) as executor:
+        futures = {
+            executor.submit(_run_prompt, model, prompt_text, _build_prompt(prompt_text, primer_text, news_summary, subset_str), cache, usage): i
+            for i, prompt_text in enumerate(raw_prompts)
+        }
+        for future in as_completed(futures):
+            print(f"Report section {futures[future] + 1}/{len(raw_prompts)} done in {time.perf_counter() - started:.1f}s.")
+        return [future.result() for future in sorted(futures, key=futures.get)]
+
+def _generate_consolidated(model, raw_prompts: List[str], primer_text: str, news_summary: str, subset_str: str, cache: TTLCache = None, usage: GenerationUsage = None) -> Tuple[List[Dict], int]:
+    """
+    Sends the shared context once with all tasks and splits the answer back into one
+    response per prompt. Sections that are missing or empty in the answer, or all of
+    them if the call fails, are generated with per-prompt calls instead.
+    Returns the responses in prompt order and the number of sections that fell back.
+    """
+    if not raw_prompts:
+        return [], 0
+    sections = {}
+    try:
+        # Only an answer with every section is cached; a partial one would skip the single call on every rerun
+        text = _generate_cached(
+            model, _build_consolidated_prompt(raw_prompts, primer_text, news_summary, subset_str), cache, usage,
+            is_complete=lambda answer: len(_parse_sections(answer, len(raw_prompts))) == len(raw_prompts),
+        )
+        sections = _parse_sections(text, len(raw_prompts))
+    except Exception as e:
+        print(f"Consolidated report call failed, falling back to per-prompt calls: {e}")
+    else:
+        missing = [str(i) for i in range(1, len(raw_prompts) + 1) if i not in sections]
+        if missing:
+            print(f"Consolidated response lacked sections {', '.join(missing)}; generating them separately.")
+    missing = [i for i in range(len(raw_prompts)) if i + 1 not in sections]
+    fallback = _generate_responses(model, [raw_prompts[i] for i in missing], primer_text, news_summary, subset_str, cache, usage)
+    fallback_by_index = dict(zip(missing, fallback))
+    responses = [
+        fallback_by_index[i] if i in fallback_by_index else {"prompt": prompt_text, "response": sections[i + 1]}
+        for i, prompt_text in enumerate(raw_prompts)
+    ]
+    return responses, len(missing)
+
+class StreamingSection:
+    """
+    Flowables of one report section, converted block by block as its markdown streams in.
+
+    Text is buffered up to the last blank line outside a code block. Everything before it
+    is complete markdown (a blank line also closes any table), so it is converted right
+    away and the buffer only ever holds the block still being written. Splitting there
+    gives the same flowables as converting the whole response at once.
+    """
+
+    def __init__(self, prompt_text: str, styles):
+        self.prompt_text = prompt_text
+        self.styles = styles
+        self.flowables = []
+        self.first_output_at = None
+        self.done = False
+        self._buffer = ""
+        self._lock = threading.Lock()
+
+    def feed(self, text: str):
+        with self._lock:
+            if self.done:
+                return
+            self._buffer += text
+            cut = last_block_boundary(self._buffer)
+            if cut == -1:
+                return
+            head, self._buffer = self._buffer[:cut], self._buffer[cut + 1:]
+            self._convert(head)
+
+    def _convert(self, text: str):
+        flowables = markdown_to_paragraphs(text, self.styles)
+        if flowables and self.first_output_at is None:
+            self.first_output_at = time.perf_counter()
+        self.flowables.extend(flowables)
+
+    def finish(self, note: str = None):
+        """Converts the rest of the buffer and appends note, if any, in italics."""
+        with self._lock:
+            if self.done:
+                return
+            if self._buffer:
+                self._convert(self._buffer)
+                self._buffer = ""
+            if note:
+                self.flowables.append(Paragraph(f"<i>{note}</i>", self.styles['Normal']))
+            self.done = True
+
+def _past(deadline: Optional[float]) -> bool:
+    return deadline is not None and time.perf_counter() > deadline
+
+def _stream_section(model, section: StreamingSection, full_prompt: str, cache: TTLCache = None, usage: GenerationUsage = None, deadline: float = None):
+    """
+    Streams one report prompt into its section. A complete response is cached; one cut
+    short by the deadline or an error mid-stream keeps what arrived, with a note.
+    A section already closed or past the deadline never starts a call, and a running
+    stream is closed as soon as either happens.
+    """
+    if section.done or _past(deadline):
+        section.finish(DEADLINE_NOTE)
+        return
+    key = llm_cache_key(REPORT_MODEL, full_prompt) if cache is not None else None
+    if key is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            section.feed(cached)
+            section.finish()
+            return
+    # Waits for a process-wide call slot, but not past the deadline
+    if not _call_slots.acquire(timeout=None if deadline is None else max(0.0, deadline - time.perf_counter())):
+        section.finish(DEADLINE_NOTE)
+        return
+    parts = []
+    try:
+        response, first, chunks = _start_stream_with_retry(model, full_prompt)
+        for chunk in itertools.chain([first] if first is not None else [], chunks):
+            if section.done or _past(deadline):
+                _close_stream(response, chunks)
+                section.finish(DEADLINE_NOTE)
+                return
+            parts.append(chunk.text)
+            section.feed(parts[-1])
+        if usage is not None:
+            usage.add(response)
+        if key is not None:
+            cache.put(key, "".join(parts))
+        section.finish()
+    except (ResourceExhausted, InternalServerError, ServiceUnavailable) as e:
+        print(f"LLM call failed after retries for prompt '{section.prompt_text[:50]}...': {e}")
+        section.finish("Content generation failed due to API errors after multiple retries.")
+    except DeadlineExceeded as e:
+        print(f"LLM call timed out after {REPORT_CALL_TIMEOUT_SECONDS:.0f}s for prompt '{section.prompt_text[:50]}...': {e}")
+        section.finish("Content generation timed out.")
+    except Exception as e:
+        print(f"An unexpected error occurred for prompt '{section.prompt_text[:50]}...': {e}")
+        section.finish(f"An unexpected error occurred: {str(e)}")
+    finally:
+        _call_slots.release()
+
+def _stream_responses(model, raw_prompts: List[str], primer_text: str, news_summary: str, subset_str: str, styles, cache: TTLCache = None, usage: GenerationUsage = None, deadline: float = None) -> List[StreamingSection]:
+    """
+    Streams the report prompts concurrently (at most REPORT_MAX_CONCURRENCY at a time)
+    into StreamingSections, in prompt order. At the deadline, sections still running are
+    closed with what they have so far, and sections not yet started are left empty with
+    a note and never call Gemini.
+
+    The workers are daemon threads, so a stream still blocked on the network after the
+    deadline does not hold up the process: the report is built right away, the worker
+    closes its stream when the next chunk arrives (or the call times out after
+    REPORT_CALL_TIMEOUT_SECONDS), and the interpreter can exit without waiting for it.
+    """
+    sections = [StreamingSection(prompt_text, styles) for prompt_text in raw_prompts]
+    if not sections:
+        return sections
+    work = queue.SimpleQueue()
+    for section in sections:
+        work.put(section)
+
+    def worker():
+        while True:
+            try:
+                section = work.get_nowait()
+            except queue.Empty:
+                return
+            _stream_section(model, section, _build_prompt(section.prompt_text, primer_text, news_summary, subset_str), cache, usage, deadline)
+
+    workers = [
+        threading.Thread(target=worker, name=f"report-stream-{i}", daemon=True)
+        for i in range(max(1, min(REPORT_MAX_CONCURRENCY, len(sections))))
+    ]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join(None if deadline is None else max(0.0, deadline - time.perf_counter()))
+    unfinished = [section for section in sections if not section.done]
+    if unfinished:
+        print(f"Report deadline reached with {len(unfinished)} of {len(sections)} sections unfinished; building a partial report.")
+        for section in unfinished:
+            section.finish(DEADLINE_NOTE)
+    return sections
 
 def generate_pdf_report(
     subset_data: List[Dict],
     news_summary_path: str,
     primer_pdf_path: str,
     prompts_path: str,
-    output_dir: str = "files"
+    output_dir: str = "files",
+    report_date: str = None,
+    use_llm_cache: bool = True,
+    stats: Dict[str, float] = None,
+    mode: str = None,
+    streaming: bool = None
 ) -> str:
-    
-    with open(news_summary_path, "r", encoding="utf-8", errors="replace") as f:
-        news_summary = f.read()
-    primer_text = extract_pdf_text(primer_pdf_path)
-    with open(prompts_path, "r", encoding="utf-8", errors="replace") as f:
-        prompts_content = f.read()
-    
-    raw_prompts = [p.strip() for p in prompts_content.split('\n\n') if p.strip()]
+    """
+    Generates the PDF report from the subset data, news summary, primer and prompts.
+    The primer (markdown and PDF) and prompts come from the precompiled context bundle.
+    The news and primer are packed into the REPORT_*_TOKEN_BUDGET token budgets.
+    report_date (yyyy-mm-dd) sets the report title and filename; defaults to today.
+    use_llm_cache=False bypasses the response cache and asks Gemini for every section.
+    mode is 'per_prompt' or 'consolidated' (one call for all prompts); defaults to REPORT_MODE.
+    streaming (per-prompt mode only; defaults to REPORT_STREAMING) renders sections while they
+    are generated and builds a partial report once REPORT_DEADLINE_SECONDS have passed.
+    stats, if given, receives the Gemini calls, tokens and latency, and the cache hit rate.
+    Returns the path to the generated PDF.
+    """
+
+    packed_news = pack_news_context(news_summary_path, subset_data)
+    print(packed_news.summary())
+    news_summary = packed_news.text
+    bundle = load_context_bundle(primer_pdf_path, prompts_path)
+    primer_text = truncate_to_budget(bundle.primer_text, REPORT_PRIMER_TOKEN_BUDGET)
+    raw_prompts = bundle.prompts
     
     api_key = os.getenv("GEMINI_API_KEY")
     if not api_key:
@@ -262,41 +494,52 @@ def generate_pdf_report(
         return "Error_GEMINI_API_KEY_not_found.pdf"
     
     genai.configure(api_key=api_key)
-    model = genai.GenerativeModel('models/gemini-pro-latest')
+    model = genai.GenerativeModel(REPORT_MODEL)
     
-    responses = []
-    subset_str = json.dumps(subset_data, default=str, indent=2)
+    subset_str = serialize_records(subset_data)
     
-    # Define styles locally for use in this function
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name='CustomH1', parent=styles['Normal'], fontSize=18, leading=22, spaceAfter=12))
-    styles.add(ParagraphStyle(name='CustomH2', parent=styles['Normal'], fontSize=16, leading=20, spaceAfter=10))
-    styles.add(ParagraphStyle(name='CustomH3', parent=styles['Normal'], fontSize=14, leading=18, spaceAfter=8))
-    styles.add(ParagraphStyle(name='TableCell', parent=styles['Normal'], fontSize=8, leading=10)) # Smaller font for table cells
+    styles = report_styles()
 
 
-    for prompt_text in raw_prompts:
-        full_prompt = f"""
-        You are a financial analyst.
-        CONTEXT: {primer_text[:10000]}
-        NEWS SUMMARY: {news_summary[:10000]}
-        DATA: {subset_str}
-        TASK: {prompt_text}
-        """
-        try:
-            response_text = _generate_response_with_retry(model, full_prompt)
-            responses.append({"prompt": prompt_text, "response": response_text})
-        except (ResourceExhausted, InternalServerError, ServiceUnavailable) as e:
-            print(f"LLM call failed after retries for prompt '{prompt_text[:50]}...': {e}")
-            error_message = "Content generation failed due to API errors after multiple retries."
-            responses.append({"prompt": prompt_text, "response": error_message})
-        except Exception as e:
-            print(f"An unexpected error occurred for prompt '{prompt_text[:50]}...': {e}")
-            error_message = f"An unexpected error occurred: {str(e)}"
-            responses.append({"prompt": prompt_text, "response": error_message})
-            
+    mode = (mode or REPORT_MODE).lower()
+    streaming = (REPORT_STREAMING if streaming is None else streaming) and mode != "consolidated"
+    cache = open_llm_cache() if use_llm_cache else None
+    usage = GenerationUsage()
+    started = time.perf_counter()
+    fallbacks = 0
+    # (prompt, flowables) per section, in prompt order
+    sections = []
+    if streaming:
+        deadline = started + REPORT_DEADLINE_SECONDS if REPORT_DEADLINE_SECONDS > 0 else None
+        streamed = _stream_responses(model, raw_prompts, primer_text, news_summary, subset_str, styles, cache, usage, deadline)
+        sections = [(section.prompt_text, list(section.flowables)) for section in streamed]
+        first_outputs = [section.first_output_at - started for section in streamed if section.first_output_at is not None]
+        if first_outputs:
+            print(f"First section output after {min(first_outputs):.1f}s.")
+            if stats is not None:
+                stats.update(first_output_seconds=round(min(first_outputs), 3))
+    elif mode == "consolidated":
+        responses, fallbacks = _generate_consolidated(model, raw_prompts, primer_text, news_summary, subset_str, cache, usage)
+    else:
+        responses = _generate_responses(model, raw_prompts, primer_text, news_summary, subset_str, cache, usage)
+    if not streaming:
+        sections = [(item['prompt'], markdown_to_paragraphs(item['response'], styles)) for item in responses]
+    elapsed = time.perf_counter() - started
+    print(f"Report generation ({mode}{', streaming' if streaming else ''}): {usage.calls} Gemini calls, {usage.prompt_tokens} prompt tokens, "
+          f"{usage.output_tokens} output tokens in {elapsed:.1f}s.")
+    if stats is not None:
+        stats.update(
+            consolidated=int(mode == "consolidated"), streaming=int(streaming), llm_calls=usage.calls, prompt_tokens=usage.prompt_tokens,
+            output_tokens=usage.output_tokens, generation_seconds=round(elapsed, 3), section_fallbacks=fallbacks,
+        )
+    if cache is not None:
+        hit_rate = cache.hit_rate()
+        print(f"LLM cache: {cache.hits} hits, {cache.misses} misses ({hit_rate:.0%}).")
+        if stats is not None:
+            stats.update(llm_cache_hits=cache.hits, llm_cache_misses=cache.misses, llm_cache_hit_rate=hit_rate)
+
     # --- PDF Creation Logic ---
-    current_date = datetime.datetime.now().strftime('%Y-%m-%d')
+    current_date = report_date or datetime.datetime.now().strftime('%Y-%m-%d')
     output_filename = f"PRNS_Summary-{current_date}.pdf"
     output_path = os.path.join(output_dir, output_filename)
     
@@ -325,7 +568,7 @@ def generate_pdf_report(
             row = []
             for col in key_columns:
                 value = item.get(col, '')
-                if col == 'Reversal Date' and isinstance(value, pd.Timestamp):
+                if col == 'Reversal Date' and isinstance(value, datetime.date):
                     formatted_value = value.strftime('%Y-%m-%d')
                 else:
                     formatted_value = str(value)
@@ -364,18 +607,18 @@ def generate_pdf_report(
     story.append(Paragraph("Gemini Analysis", styles['Heading2']))
     story.append(Spacer(1, 12))
     
-    for item in responses:
+    for prompt_text, response_paragraphs in sections:
         # Prompt Summary (First line of prompt)
-        prompt_lines = item['prompt'].split('\n')
+        prompt_lines = prompt_text.split('\n')
         prompt_title = prompt_lines[0] if prompt_lines else "Prompt"
         
         story.append(Paragraph(prompt_title, styles['CustomH3']))
         story.append(Spacer(1, 6))
         
-        # Response (Handle markdown to some extent or just dump text)
-        response_paragraphs = markdown_to_paragraphs(item['response'], styles)
+        # Response (markdown already converted to flowables)
         story.extend(response_paragraphs)
         story.append(Spacer(1, 12))
         
-    doc.build(story, onFirstPage=_footer_callback, onLaterPages=_footer_callback)
+    footer = PageFooter()
+    doc.build(story, onFirstPage=footer, onLaterPages=footer)
     return output_path
\ No newline at end of file
@@ -0,0 +1,213 @@
+import json
+import datetime
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Columns every ingested workbook must provide.
+REQUIRED_COLUMNS = [
+    'Symbol',
+    'Company Name',
+    'Reversal Date',
+    'Direction',
+    'Reversal Price',
+    'HR1 Value',
+    'Last Close Price'
+]
+
+CATEGORY_COLUMNS = ['Symbol', 'Direction']
+DATE_COLUMNS = ['Reversal Date', 'Last Price Date']
+FLOAT32_COLUMNS = [
+    'Reversal Price',
+    'HR1 Value',
+    'Last Open Price',
+    'Last Close Price',
+    'Last High Price',
+    'Last Low Price',
+    'Expected Magnitude %',
+    'Expected Magnitude',
+    'Remaining Expected Magnitude',
+    'Probability',
+    'Target Price',
+    'Difference from Target Price',
+    'Remaining Expected Magnitude %',
+    'High/Low of the cycle',
+    'Highest/Lowest Close Price',
+]
+
+
+def validate_frame(df: pd.DataFrame, required_columns: List[str] = REQUIRED_COLUMNS) -> pd.DataFrame:
+    """
+    Checks the ingested frame against the schema and converts it to compact types:
+    categorical symbols and directions, float32 prices and datetime dates.
+    Rows without a Symbol or a parseable Reversal Date are dropped.
+    Raises ValueError if a required column is missing.
+    """
+    missing_cols = [col for col in required_columns if col not in df.columns]
+    if missing_cols:
+        raise ValueError(f"Missing columns: {missing_cols}")
+
+    typed = {}
+    for col in DATE_COLUMNS:
+        if col in df.columns and not pd.api.types.is_datetime64_any_dtype(df[col]):
+            typed[col] = pd.to_datetime(df[col], errors='coerce')
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns and df[col].dtype != np.float32:
+            typed[col] = pd.to_numeric(df[col], errors='coerce').astype(np.float32)
+    for col in CATEGORY_COLUMNS:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            typed[col] = df[col].astype(str).str.strip().where(df[col].notna()).astype('category')
+    if typed:
+        df = df.assign(**typed)
+
+    valid = pd.Series(True, index=df.index)
+    if 'Symbol' in df.columns:
+        valid &= df['Symbol'].notna()
+    if 'Reversal Date' in df.columns:
+        valid &= df['Reversal Date'].notna()
+    if not valid.all():
+        print(f"Dropping {int((~valid).sum())} rows without a Symbol or a valid Reversal Date.")
+        df = df[valid].reset_index(drop=True)
+    return df
+
+
+def _price(value) -> Optional[float]:
+    """Converts a float32 cell to a Python float without float32 noise (88.35, not 88.3499984741211)."""
+    if value is None or pd.isna(value):
+        return None
+    return float(f"{value:.7g}")
+
+
+# Workbook column name -> ReversalRecord field.
+_FIELDS = {
+    'Symbol': 'symbol',
+    'Company Name': 'company_name',
+    'Reversal Date': 'reversal_date',
+    'Direction': 'direction',
+    'Reversal Price': 'reversal_price',
+    'HR1 Value': 'hr1_value',
+    'Last Close Price': 'last_close_price',
+    'SearchQuery': 'search_query',
+}
+# One bit per schema column, marking the columns a record has had set.
+_BITS = {key: 1 << i for i, key in enumerate(_FIELDS)}
+
+
+@dataclass(slots=True)
+class ReversalRecord:
+    """
+    One reversal row as passed through normalization, news fetching and reporting.
+    Supports dict-style access by workbook column name (record['Symbol'], record.get(...))
+    so stages written against plain dicts keep working.
+    """
+    symbol: str
+    company_name: Optional[str] = None
+    reversal_date: Optional[datetime.date] = None
+    direction: Optional[str] = None
+    reversal_price: Optional[float] = None
+    hr1_value: Optional[float] = None
+    last_close_price: Optional[float] = None
+    search_query: Optional[str] = None
+    # Columns outside the schema that a subset mode chose to keep
+    extras: Optional[Dict[str, Any]] = None
+    # Bitmask of the schema columns that have been set, so membership follows dict semantics
+    # even for None values. An int rather than a set per record keeps records compact.
+    _set: int = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        for key, name in _FIELDS.items():
+            if getattr(self, name) is not None:
+                self._set |= _BITS[key]
+
+    def __getitem__(self, key: str):
+        name = _FIELDS.get(key)
+        if name is not None:
+            return getattr(self, name)
+        if self.extras is not None and key in self.extras:
+            return self.extras[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key: str, value):
+        name = _FIELDS.get(key)
+        if name is not None:
+            setattr(self, name, value)
+            self._set |= _BITS[key]
+        else:
+            if self.extras is None:
+                self.extras = {}
+            self.extras[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        """Whether the column was set, like a dict key, even if its value is None."""
+        bit = _BITS.get(key)
+        if bit is not None:
+            return bool(self._set & bit)
+        return self.extras is not None and key in self.extras
+
+    def get(self, key: str, default=None):
+        try:
+            value = self[key]
+        except KeyError:
+            return default
+        return default if value is None else value
+
+    def keys(self) -> List[str]:
+        return [key for key, bit in _BITS.items() if self._set & bit] + list(self.extras or {})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Returns the record keyed by workbook column name, with the date as yyyy-mm-dd.
+        Schema columns without a value are left out to keep prompts compact.
+        """
+        data = {key: getattr(self, name) for key, name in _FIELDS.items() if getattr(self, name) is not None}
+        data.update(self.extras or {})
+        if isinstance(data.get('Reversal Date'), datetime.date):
+            data['Reversal Date'] = data['Reversal Date'].isoformat()
+        return data
+
+
+def records_from_frame(df: pd.DataFrame) -> List[ReversalRecord]:
+    """Converts a validated subset frame into ReversalRecords, one column at a time."""
+    if df.empty:
+        return []
+    columns = {}
+    for col in df.columns:
+        values = df[col]
+        if pd.api.types.is_datetime64_any_dtype(values):
+            columns[col] = [None if pd.isna(v) else v.date() for v in values]
+        elif col in FLOAT32_COLUMNS or values.dtype == np.float32:
+            columns[col] = [_price(v) for v in values.to_numpy()]
+        else:
+            columns[col] = [None if pd.isna(v) else v for v in values.tolist()]
+
+    extra_columns = [col for col in df.columns if col not in _FIELDS]
+    schema_columns = [col for col in _FIELDS if col in columns]
+    schema_mask = sum(_BITS[col] for col in schema_columns)
+    records = []
+    for i in range(len(df)):
+        record = ReversalRecord(symbol=str(columns['Symbol'][i]) if 'Symbol' in columns else None)
+        for col in schema_columns:
+            if col != 'Symbol':
+                setattr(record, _FIELDS[col], columns[col][i])
+        if extra_columns:
+            record.extras = {col: columns[col][i] for col in extra_columns}
+        # Every column of the frame is a key of its record, as in a row dict
+        record._set = schema_mask
+        records.append(record)
+    return records
+
+
+def serialize_records(records: Iterable, fields: List[str] = None) -> str:
+    """
+    Compact JSON for records or plain dicts, for prompts and logs.
+    fields limits each entry to those column names.
+    """
+    rows = []
+    for record in records:
+        data = record.to_dict() if isinstance(record, ReversalRecord) else dict(record)
+        if fields is not None:
+            data = {key: data[key] for key in fields if key in data}
+        rows.append(data)
+    return json.dumps(rows, default=str, separators=(',', ':'))
@@ -1,51 +1,200 @@
+import os
+import json
 import pandas as pd
+from typing import Callable, Dict, List, Tuple
+
+from price_reversal_core.schema import REQUIRED_COLUMNS, DATE_COLUMNS
+from price_reversal_core.watchlists import filter_to_watchlist
+
+# Modes of the form 'watchlist:<name>' narrow the frame to a config/<name>.json watchlist
+# and then apply the 'default' mode.
+WATCHLIST_PREFIX = "watchlist:"
+
+MODES_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "config", "subset_modes.json"))
+
+# Vectorized comparison for each filter op; 'latest' is handled separately.
+_FILTER_OPS: Dict[str, Callable[[pd.Series, object], pd.Series]] = {
+    'eq': lambda values, value: values == value,
+    'ne': lambda values, value: values != value,
+    'gt': lambda values, value: values > value,
+    'ge': lambda values, value: values >= value,
+    'lt': lambda values, value: values < value,
+    'le': lambda values, value: values <= value,
+    'in': lambda values, value: values.isin(value),
+    'not_in': lambda values, value: ~values.isin(value),
+    'notnull': lambda values, value: values.notna(),
+}
+
+# Compiled modes, rebuilt when the config file changes.
+_compiled_modes = {}
+_compiled_mtime = None
+
+
+class SubsetMode:
+    """
+    A subset mode compiled from its config spec: filters, sort keys, limit and output columns.
+    """
+
+    def __init__(self, name: str, spec: Dict):
+        self.name = name
+        self.filters = spec.get('filters', [])
+        self.sort = spec.get('sort', [])
+        self.limit = spec.get('limit')
+        self.columns = spec.get('columns', REQUIRED_COLUMNS)
+
+        for flt in self.filters:
+            if flt.get('op') != 'latest' and flt.get('op') not in _FILTER_OPS:
+                raise ValueError(f"Unknown filter op '{flt.get('op')}' in subset mode '{name}'")
+            if flt.get('column') in DATE_COLUMNS and 'value' in flt:
+                value = flt['value']
+                flt['value'] = [pd.Timestamp(v) for v in value] if isinstance(value, list) else pd.Timestamp(value)
+
+        self.sort_columns = [key['column'] for key in self.sort]
+        self.sort_ascending = [key.get('ascending', True) for key in self.sort]
+
+    def input_columns(self) -> List[str]:
+        """Every column this mode reads, in output-first order."""
+        needed = list(self.columns)
+        for col in [flt['column'] for flt in self.filters] + self.sort_columns:
+            if col not in needed:
+                needed.append(col)
+        return needed
+
+
+class SubsetEngine:
+    """
+    Applies subset modes to one ingested frame without mutating it.
+    Parsed date columns are computed once and shared by every mode run on the frame.
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self._values = {}
+        self._parsed = set()
+
+    def values(self, column: str) -> pd.Series:
+        """Returns the column, parsed to datetime for date columns, cached per engine."""
+        if column not in self._values:
+            values = self.df[column]
+            if column in DATE_COLUMNS and not pd.api.types.is_datetime64_any_dtype(values):
+                values = pd.to_datetime(values)
+                self._parsed.add(column)
+            self._values[column] = values
+        return self._values[column]
+
+    def select(self, mode: SubsetMode, limit_companies: int = None) -> pd.DataFrame:
+        """Builds one boolean mask from all filters, then sorts, limits and projects the survivors."""
+        df = self.df
+        mask = pd.Series(True, index=df.index)
+        for flt in mode.filters:
+            column = flt['column']
+            if column not in df.columns:
+                print(f"'{column}' column not found. Skipping {flt['op']} filter.")
+                continue
+            values = self.values(column)
+            if flt['op'] == 'latest':
+                latest = values.max()
+                print(f"Filtering for latest {column}: {latest}")
+                mask &= values == latest
+            else:
+                mask &= _FILTER_OPS[flt['op']](values, flt.get('value'))
+
+        index = mask.index[mask.to_numpy()]
+        print(f"Selected {len(index)} records after filters.")
+
+        sort_columns = [col for col in mode.sort_columns if col in df.columns]
+        if sort_columns and len(index):
+            keys = pd.DataFrame({col: self.values(col).loc[index] for col in sort_columns})
+            ascending = [asc for col, asc in zip(mode.sort_columns, mode.sort_ascending) if col in df.columns]
+            index = keys.sort_values(by=sort_columns, ascending=ascending, kind='stable').index
+
+        if mode.limit is not None:
+            index = index[:mode.limit]
+        if limit_companies is not None and len(index) > limit_companies:
+            index = index[:limit_companies]
+            print(f"Limited to {limit_companies} companies.")
+
+        # Filter out columns that do not exist in the DataFrame
+        existing_columns = [col for col in mode.columns if col in df.columns]
+        subset = df.loc[index, existing_columns]
+        for col in existing_columns:
+            if col in self._parsed:
+                subset[col] = self._values[col].loc[index]
+        return subset
+
+
+def load_modes(path: str = MODES_PATH) -> Dict[str, SubsetMode]:
+    """Loads and compiles the subset modes declared in config, recompiling only when the file changes."""
+    global _compiled_modes, _compiled_mtime
+    mtime = os.path.getmtime(path)
+    if mtime != _compiled_mtime:
+        with open(path, "r", encoding="utf-8") as f:
+            specs = json.load(f)
+        _compiled_modes = {name: SubsetMode(name, spec) for name, spec in specs.items()}
+        _compiled_mtime = mtime
+    return _compiled_modes
+
+
+def _split_watchlist(mode: str) -> Tuple[str, str]:
+    """Splits 'watchlist:<name>' into ('default', name); other modes return (mode, None)."""
+    if mode and mode.startswith(WATCHLIST_PREFIX):
+        return "default", mode[len(WATCHLIST_PREFIX):]
+    return mode, None
+
+
+def get_mode(mode: str = "default") -> SubsetMode:
+    """Returns the compiled mode, falling back to 'default' for unknown names."""
+    mode, _ = _split_watchlist(mode)
+    modes = load_modes()
+    if mode not in modes:
+        print(f"Unknown subset mode '{mode}'. Available modes: {list(modes)}. Using 'default'.")
+        mode = "default"
+    return modes[mode]
+
+
+def columns_for_mode(mode: str = "default") -> List[str]:
+    """
+    Returns the workbook columns that get_subset needs for the given mode,
+    so ingestion can skip reading everything else.
+    """
+    return get_mode(mode).input_columns()
+
+
+def get_subsets(df: pd.DataFrame, modes: List[str], limit_companies: int = None) -> Dict[str, pd.DataFrame]:
+    """Runs several modes against one ingested frame, sharing parsed columns between them."""
+    engine = SubsetEngine(df)
+    subsets = {}
+    for mode in modes:
+        watchlist = _split_watchlist(mode)[1]
+        if watchlist is None:
+            subsets[mode] = engine.select(get_mode(mode), limit_companies)
+        else:
+            subsets[mode] = SubsetEngine(filter_to_watchlist(df, watchlist)).select(get_mode(mode), limit_companies)
+    return subsets
+
 
 def get_subset(df: pd.DataFrame, mode: str = "default", limit_companies: int = None) -> pd.DataFrame:
     """
-    Selects a subset of the dataframe based on the mode.
+    Selects a subset of the dataframe based on the mode declared in config/subset_modes.json.
     Default behavior: Filter for records with the latest 'Reversal Date'.
+    'watchlist:<name>' first narrows the frame to the symbols in config/<name>.json.
     If limit_companies is specified, returns only that many companies.
+    The input frame is never modified.
     """
     if df.empty:
         print("Dataframe is empty. No records to process.")
         return df
 
-    # Ensure Reversal Date is datetime
-    if 'Reversal Date' in df.columns:
-        df['Reversal Date'] = pd.to_datetime(df['Reversal Date'])
-        latest_date = df['Reversal Date'].max()
-        print(f"Filtering for latest Reversal Date: {latest_date}")
-        df = df[df['Reversal Date'] == latest_date]
-        print(f"Selected {len(df)} records after date filter.")
-        # Show a preview of the subset
-        print("Subset preview:")
-        print(df.head().to_string(index=False))
-    else:
-        print("'Reversal Date' column not found. Skipping date filter.")
-
-    if mode == "big_movers":
-        # Example: Filter by % Change if column exists (using Expected Magnitude % as proxy based on file analysis)
-        if 'Expected Magnitude %' in df.columns:
-            df = df.sort_values(by='Expected Magnitude %', ascending=False).head(10)
-    
-    # Apply limit if specified
-    if limit_companies is not None and len(df) > limit_companies:
-        df = df.head(limit_companies)
-        print(f"Limited to {limit_companies} companies.")
-
-    # Select only the required columns
-    required_columns = [
-        'Symbol', 
-        'Company Name', 
-        'Reversal Date', 
-        'Direction',
-        'Reversal Price', 
-        'HR1 Value', 
-        'Last Close Price'
-    ]
-    
-    # Filter out columns that do not exist in the DataFrame
-    existing_columns = [col for col in required_columns if col in df.columns]
-    df = df[existing_columns]
-    
-    return df
+    watchlist = _split_watchlist(mode)[1]
+    if watchlist is not None:
+        df = filter_to_watchlist(df, watchlist)
+        if df.empty:
+            print(f"No records match watchlist '{watchlist}'.")
+            # Same columns as a non-empty subset of this mode
+            return df[[col for col in get_mode(mode).columns if col in df.columns]]
+
+    subset = SubsetEngine(df).select(get_mode(mode), limit_companies)
+    # Show a preview of the subset
+    print("Subset preview:")
+    print(subset.head().to_string(index=False))
+    return subset
@@ -0,0 +1,104 @@
+import os
+import time
+import sqlite3
+import threading
+from typing import Optional
+
+
+class TTLCache:
+    """
+    Small persistent key/value cache in a SQLite file.
+
+    Entries expire ttl_seconds after they were written. When the stored values exceed
+    max_bytes, the least recently read entries are evicted first. Hit and miss counts
+    are kept per instance, so callers can create one cache object per run and log them.
+    """
+
+    def __init__(self, path: str, ttl_seconds: float, max_bytes: int, table: str = "cache_entries"):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.table = table
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        conn = self._connect()
+        try:
+            conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.table} (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )
+            """)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, key: str) -> Optional[str]:
+        """Returns the cached value, or None if it is missing or expired."""
+        with self._lock:
+            conn = None
+            try:
+                conn = self._connect()
+                row = conn.execute(f"SELECT value, created_at FROM {self.table} WHERE key = ?", (key,)).fetchone()
+                now = time.time()
+                if row is None or now - row[1] > self.ttl_seconds:
+                    if row is not None:
+                        conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+                        conn.commit()
+                    self.misses += 1
+                    return None
+                conn.execute(f"UPDATE {self.table} SET accessed_at = ? WHERE key = ?", (now, key))
+                conn.commit()
+                self.hits += 1
+                return row[0]
+            except sqlite3.Error as e:
+                print(f"Cache read failed for {self.path}: {e}")
+                self.misses += 1
+                return None
+            finally:
+                if conn:
+                    conn.close()
+
+    def put(self, key: str, value: str):
+        """Stores the value, then evicts least recently read entries beyond max_bytes."""
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            conn = None
+            try:
+                conn = self._connect()
+                now = time.time()
+                conn.execute(f"""
+                    INSERT OR REPLACE INTO {self.table} (key, value, size, created_at, accessed_at)
+                    VALUES (?, ?, ?, ?, ?)
+                """, (key, value, size, now, now))
+                conn.execute(f"DELETE FROM {self.table} WHERE created_at < ?", (now - self.ttl_seconds,))
+                total = conn.execute(f"SELECT COALESCE(SUM(size), 0) FROM {self.table}").fetchone()[0]
+                if total > self.max_bytes:
+                    for old_key, old_size in conn.execute(f"SELECT key, size FROM {self.table} ORDER BY accessed_at").fetchall():
+                        if total <= self.max_bytes:
+                            break
+                        conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (old_key,))
+                        total -= old_size
+                conn.commit()
+            except sqlite3.Error as e:
+                print(f"Cache write failed for {self.path}: {e}")
+            finally:
+                if conn:
+                    conn.close()
+
+    def hit_rate(self) -> float:
+        """Fraction of lookups served from the cache so far, 0.0 if there were none."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
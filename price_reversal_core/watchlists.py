@@ -0,0 +1,98 @@
+import os
+import re
+import json
+import pandas as pd
+from typing import FrozenSet, List
+
+CONFIG_DIR = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "config"))
+
+# Watchlist names are plain file names in config, so a mode cannot point outside it.
+_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9_\-]*")
+
+# Loaded watchlists by name: (mtime, symbol set, single-column frame for merges).
+_watchlists = {}
+
+
+def watchlist_path(name: str, config_dir: str = CONFIG_DIR) -> str:
+    """
+    Returns the config file backing the named watchlist, e.g. 'tech_darlings'.
+    Raises ValueError for names that are not a plain file name, such as '../secrets'.
+    """
+    if not isinstance(name, str) or not _NAME.fullmatch(name):
+        raise ValueError(f"Invalid watchlist name {name!r}. Available watchlists: {available_watchlists(config_dir)}")
+    return os.path.join(config_dir, f"{name}.json")
+
+
+def _is_watchlist(entries) -> bool:
+    return isinstance(entries, list) and all(isinstance(entry, dict) and 'Ticker' in entry for entry in entries)
+
+
+def available_watchlists(config_dir: str = CONFIG_DIR) -> List[str]:
+    """Lists the watchlist names in config: JSON files holding a list of {'Ticker': ...} entries."""
+    names = []
+    for filename in sorted(os.listdir(config_dir)):
+        if not filename.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(config_dir, filename), "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if _is_watchlist(entries):
+            names.append(filename[:-len(".json")])
+    return names
+
+
+def _load(name: str, config_dir: str):
+    """
+    Returns the cached (mtime, symbols, frame) entry, reloading it when the file has changed.
+    Raises ValueError for unknown names and for config files that are not a list of
+    {'Ticker': ...} entries.
+    """
+    path = watchlist_path(name, config_dir)
+    if not os.path.exists(path):
+        raise ValueError(f"Unknown watchlist '{name}'. Available watchlists: {available_watchlists(config_dir)}")
+    mtime = os.path.getmtime(path)
+    cached = _watchlists.get(path)
+    if cached is None or cached[0] != mtime:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+        except ValueError as e:
+            raise ValueError(f"Watchlist '{name}' in {path} is not valid JSON: {e}") from e
+        if not _is_watchlist(entries):
+            raise ValueError(
+                f"'{name}' in {path} is not a watchlist: expected a list of {{\"Ticker\": ...}} entries. "
+                f"Available watchlists: {available_watchlists(config_dir)}"
+            )
+        symbols = frozenset(str(entry['Ticker']).strip().upper() for entry in entries if entry.get('Ticker'))
+        frame = pd.DataFrame({'Symbol': sorted(symbols)})
+        cached = (mtime, symbols, frame)
+        _watchlists[path] = cached
+        print(f"Loaded watchlist '{name}' with {len(symbols)} symbols.")
+    return cached
+
+
+def seed_watchlist(path: str, mtime: float, symbols: List[str]):
+    """Installs a watchlist parsed elsewhere (the context bundle) as if it had been loaded from path."""
+    symbols = frozenset(symbols)
+    _watchlists[path] = (mtime, symbols, pd.DataFrame({'Symbol': sorted(symbols)}))
+
+
+def load_watchlist(name: str, config_dir: str = CONFIG_DIR) -> FrozenSet[str]:
+    """Returns the watchlist's symbols as a set for O(1) membership checks."""
+    return _load(name, config_dir)[1]
+
+
+def filter_to_watchlist(df: pd.DataFrame, name: str, config_dir: str = CONFIG_DIR) -> pd.DataFrame:
+    """
+    Narrows the frame to rows whose Symbol is on the watchlist with an inner merge.
+    Row order of df is preserved.
+    """
+    if 'Symbol' not in df.columns:
+        print("'Symbol' column not found. Skipping watchlist filter.")
+        return df
+    frame = _load(name, config_dir)[2]
+    narrowed = df.merge(frame, on='Symbol', how='inner')
+    print(f"Watchlist '{name}' matched {len(narrowed)} of {len(df)} records.")
+    return narrowed
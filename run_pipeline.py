@@ -15,11 +15,65 @@ load_dotenv()
 sys.path.append(os.getcwd())
 
 # Import database manager
-from price_reversal_core.database_manager import initialize_database, insert_metrics_record
+from price_reversal_core.database_manager import initialize_database, insert_metrics_record, insert_run_stats, upsert_row_results
 
 logger = logging.getLogger(__name__)
 
-def execute_pipeline(file_path: str, mode: str = 'default', limit_companies: int = None) -> str or None:
+PRIMER_PATH = "price_reversal_primer.pdf"
+PROMPTS_PATH = "prompts/PRNSPrompts.txt"
+BACKFILL_MAX_WORKERS = int(os.getenv("BACKFILL_MAX_WORKERS", 4))
+
+def _generate_report_and_metrics(tickers_data: list, news_path: str, file_path: str, report_date: str = None, use_llm_cache: bool = True) -> str:
+    """
+    Generates the PDF report, calculates metrics on its content and stores them in the database.
+
+    Returns:
+        str: The full path to the generated PDF report.
+    """
+    # 5. PDF Report Generation
+    from price_reversal_core.pdf_report_generator import generate_pdf_report
+    from price_reversal_core.pdf_report_generator import extract_pdf_text
+    
+    from price_reversal_core.schema import serialize_records
+    logger.info(f"Tickers data being passed to PDF report generator: {serialize_records(tickers_data)}")
+    
+    # Generate PDF
+    report_stats = {}
+    report_path = generate_pdf_report(
+        subset_data=tickers_data,
+        news_summary_path=news_path,
+        primer_pdf_path=PRIMER_PATH,
+        prompts_path=PROMPTS_PATH,
+        output_dir="files/reports",
+        report_date=report_date,
+        use_llm_cache=use_llm_cache,
+        stats=report_stats
+    )
+    insert_run_stats(os.path.basename(file_path), 'report', report_stats)
+        
+    logger.info(f"Pipeline completed successfully. Report generated at: {report_path}")
+
+    # 6. Calculate Metrics on the generated PDF content
+    from price_reversal_core.metrics_calculator import calculate_text_metrics
+    
+    # Extract text from the generated PDF
+    pdf_content = extract_pdf_text(report_path)
+    
+    logger.info("Calculating metrics on PDF report content...")
+    metrics = calculate_text_metrics(pdf_content, tickers_data)
+    
+    logger.info("Metrics:")
+    for key, value in metrics.items():
+        logger.info(f"  {key}: {value}")
+    
+    # 7. Store Metrics in Database
+    input_filename = os.path.basename(file_path)
+    output_filename = os.path.basename(report_path)
+    insert_metrics_record(input_filename, output_filename, metrics)
+
+    return report_path
+
+def execute_pipeline(file_path: str, mode: str = 'default', limit_companies: int = None, delta: bool = False, use_llm_cache: bool = True) -> str or None:
     """
     Executes the price reversal analysis pipeline for a given Excel file.
 
@@ -27,6 +81,10 @@ def execute_pipeline(file_path: str, mode: str = 'default', limit_companies: int
         file_path (str): The path to the Excel file containing stock data.
         mode (str): The analysis mode (e.g., 'default'). Defaults to 'default'.
         limit_companies (int, optional): Limits the number of companies to process. Defaults to None.
+        delta (bool): Only send rows that are new or changed since the last completed upload
+            through normalization and news fetching. Also enabled by DELTA_MODE=True in .env.
+        use_llm_cache (bool): Answer report sections from the LLM response cache when the
+            prompt is unchanged. Pass False to ask Gemini again.
 
     Returns:
         str: The full path to the generated PDF report if successful, otherwise None.
@@ -34,68 +92,71 @@ def execute_pipeline(file_path: str, mode: str = 'default', limit_companies: int
     # run_id = str(uuid.uuid4()) # Managed by runner.py if needed
     
     try:
+        # Create any missing tables; runner.py calls in here without the script's __main__
+        initialize_database()
+
         # Check for debug mode from .env
         debug_mode_env = os.getenv("DEBUG_MODE", "False").lower() == "true"
         if debug_mode_env:
             logger.info("Debug mode active. Limiting companies to 2.")
             limit_companies = 2 # Override if debug mode is active
+        delta = delta or os.getenv("DELTA_MODE", "False").lower() == "true"
             
-        # 1. Ingestion
+        # Primer, prompts and watchlists come from the precompiled context bundle
+        from price_reversal_core.context_bundle import load_context_bundle
+        load_context_bundle(PRIMER_PATH, PROMPTS_PATH)
+
+        # 1. Ingestion (only the columns the selected mode needs)
         from price_reversal_core.ingestion import load_excel
-        df = load_excel(file_path)
+        from price_reversal_core.subsets import get_subset, columns_for_mode
+        from price_reversal_core.delta import row_key, has_keys, reusable_results
+        df = load_excel(file_path, columns=columns_for_mode(mode))
         
         # 2. Subset Selection
-        from price_reversal_core.subsets import get_subset
         subset_df = get_subset(df, mode, limit_companies=limit_companies)
         
-        # Convert to list of dicts
-        tickers_data = subset_df.to_dict(orient='records')
+        # Convert to compact typed records
+        from price_reversal_core.schema import records_from_frame
+        tickers_data = records_from_frame(subset_df)
+        keys = [row_key(item['Symbol'], item['Reversal Date']) for item in tickers_data] if has_keys(subset_df) else None
+
+        # Delta mode: rows unchanged since the last completed upload reuse that run's results
+        reused = {}
+        if delta and keys is not None:
+            reused = reusable_results(subset_df, file_path, columns_for_mode(mode))
+        pending = [item for i, item in enumerate(tickers_data) if keys is None or keys[i] not in reused]
         
         # 3. LLM Normalization
         from price_reversal_core.llm_normalizer import normalize_company_names
-        normalized_data = normalize_company_names(tickers_data)
+        if pending:
+            normalization_stats = {}
+            normalize_company_names(pending, metrics=normalization_stats)
+            insert_run_stats(os.path.basename(file_path), 'normalization', normalization_stats)
+        for i, item in enumerate(tickers_data):
+            if keys is not None and keys[i] in reused:
+                item['SearchQuery'] = reused[keys[i]]['search_query']
         
         # 4. News Fetching & Saving
-        from price_reversal_core.news_fetcher import save_news_summary
-        news_path = save_news_summary(normalized_data, output_dir="files")
+        from price_reversal_core.news_fetcher import fetch_news_records, save_news_summary
+        pending_news = fetch_news_records(pending) if pending else []
+        if pending_news is None:
+            news_list = None
+        else:
+            fetched = iter(pending_news)
+            news_list = [reused[keys[i]]['news'] if keys is not None and keys[i] in reused else next(fetched)
+                         for i in range(len(tickers_data))]
+        news_path = save_news_summary(tickers_data, output_dir="files", news_list=news_list, fetch=False)
 
-        # 5. PDF Report Generation
-        from price_reversal_core.pdf_report_generator import generate_pdf_report
-        from price_reversal_core.pdf_report_generator import extract_pdf_text
-        
-        primer_path = "price_reversal_primer.pdf"
-        prompts_path = "prompts/PRNSPrompts.txt"
-        
-        logger.info(f"Tickers data being passed to PDF report generator: {tickers_data}")
-        
-        # Generate PDF
-        report_path = generate_pdf_report(
-            subset_data=tickers_data,
-            news_summary_path=news_path,
-            primer_pdf_path=primer_path,
-            prompts_path=prompts_path,
-            output_dir="files/reports"
-        )
-            
-        logger.info(f"Pipeline completed successfully. Report generated at: {report_path}")
+        # Store per-row results so the next delta run can reuse them (failed fetches are retried instead)
+        if keys is not None and news_list is not None:
+            upsert_row_results(os.path.basename(file_path), [
+                {'symbol': key[0], 'reversal_date': key[1], 'search_query': item.get('SearchQuery'), 'news_section': news.to_json()}
+                for key, item, news in zip(keys, tickers_data, news_list)
+                if news.error is None
+            ])
 
-        # 6. Calculate Metrics on the generated PDF content
-        from price_reversal_core.metrics_calculator import calculate_text_metrics
-        
-        # Extract text from the generated PDF
-        pdf_content = extract_pdf_text(report_path)
-        
-        logger.info("Calculating metrics on PDF report content...")
-        metrics = calculate_text_metrics(pdf_content, tickers_data)
-        
-        logger.info("Metrics:")
-        for key, value in metrics.items():
-            logger.info(f"  {key}: {value}")
-        
-        # 7. Store Metrics in Database
-        input_filename = os.path.basename(file_path)
-        output_filename = os.path.basename(report_path)
-        insert_metrics_record(input_filename, output_filename, metrics)
+        # 5-7. PDF Report, Metrics and Database Record
+        report_path = _generate_report_and_metrics(tickers_data, news_path, file_path, use_llm_cache=use_llm_cache)
 
         return report_path # Return the path to the generated PDF
         
@@ -103,14 +164,104 @@ def execute_pipeline(file_path: str, mode: str = 'default', limit_companies: int
         logger.error(f"Pipeline failed for file {file_path}: {e}", exc_info=True)
         return None # Indicate failure
 
-if __name__ == "__main__":
-    # Initialize database at the start of the script
+def execute_backfill(file_path: str, mode: str = 'default', limit_companies: int = None, max_workers: int = BACKFILL_MAX_WORKERS, use_llm_cache: bool = True) -> dict:
+    """
+    Reprocesses every Reversal Date in an Excel file in one invocation.
+
+    The workbook is ingested once and grouped by Reversal Date. Normalization runs once
+    over the union of symbols. News is fetched per date, for the 7 days up to that
+    Reversal Date, one date after another so all requests stay within one rate limit.
+    Report generation for each date then runs on a bounded worker pool; the dates share
+    REPORT_MAX_CONCURRENCY Gemini calls between them rather than each getting their own.
+    Dates whose subset is empty are logged and skipped without calling Gemini.
+    DEBUG_MODE=True limits every date to 2 companies, as in execute_pipeline.
+
+    Args:
+        file_path (str): The path to the Excel file containing stock data.
+        mode (str): The subset mode applied within each date. Defaults to 'default'.
+        limit_companies (int, optional): Limits the number of companies per date. Defaults to None.
+        max_workers (int): Maximum number of dates processed concurrently.
+        use_llm_cache (bool): Reuse cached report sections for unchanged prompts.
+
+    Returns:
+        dict: Maps each reported Reversal Date (yyyy-mm-dd) to its PDF report path, or None if that date failed.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    from price_reversal_core.ingestion import load_excel
+    from price_reversal_core.subsets import get_subset, columns_for_mode
+    from price_reversal_core.schema import records_from_frame
+    from price_reversal_core.llm_normalizer import normalize_company_names
+    from price_reversal_core.news_fetcher import fetch_news_records, save_news_summary
+    from price_reversal_core.context_bundle import load_context_bundle
     initialize_database()
+    if os.getenv("DEBUG_MODE", "False").lower() == "true":
+        logger.info("Debug mode active. Limiting companies to 2 per Reversal Date.")
+        limit_companies = 2
+    load_context_bundle(PRIMER_PATH, PROMPTS_PATH)
+
+    # 1. Ingestion (Reversal Date is parsed and validated by load_excel)
+    df = load_excel(file_path, columns=columns_for_mode(mode))
+    if 'Reversal Date' not in df.columns or df.empty:
+        logger.error(f"Backfill needs a non-empty 'Reversal Date' column in {file_path}.")
+        return {}
+
+    # 2. Subset Selection per Reversal Date
+    tickers_by_date = {}
+    for reversal_date, group in df.groupby('Reversal Date', sort=True):
+        report_date = reversal_date.strftime('%Y-%m-%d')
+        subset_df = get_subset(group, mode, limit_companies=limit_companies)
+        if subset_df.empty:
+            logger.info(f"Skipping Reversal Date {report_date}: no records in subset mode '{mode}'.")
+            continue
+        tickers_by_date[report_date] = records_from_frame(subset_df)
+    logger.info(f"Backfilling {len(tickers_by_date)} Reversal Dates from {file_path} with up to {max_workers} workers.")
+
+    # 3. LLM Normalization, once per distinct symbol
+    unique_companies = {}
+    for tickers_data in tickers_by_date.values():
+        for item in tickers_data:
+            unique_companies.setdefault(item.get('Symbol'), item.to_dict())
+    normalization_stats = {}
+    normalized = normalize_company_names(list(unique_companies.values()), metrics=normalization_stats)
+    insert_run_stats(os.path.basename(file_path), 'normalization', normalization_stats)
+    search_queries = {item.get('Symbol'): item.get('SearchQuery') for item in normalized}
+    for tickers_data in tickers_by_date.values():
+        for item in tickers_data:
+            item['SearchQuery'] = search_queries.get(item.get('Symbol'), item.get('Company Name', ''))
+
+    # 4. News Fetching per date, for the window ending at that Reversal Date
+    news_by_date = {}
+    for report_date, tickers_data in tickers_by_date.items():
+        window_end = datetime.strptime(report_date, '%Y-%m-%d')
+        news_by_date[report_date] = fetch_news_records(tickers_data, end_date=window_end)
 
+    def process_date(report_date: str, tickers_data: list) -> str:
+        news_list = news_by_date[report_date]
+        news_path = save_news_summary(tickers_data, output_dir="files", report_date=report_date, news_list=news_list, fetch=False)
+        return _generate_report_and_metrics(tickers_data, news_path, file_path, report_date=report_date, use_llm_cache=use_llm_cache)
+
+    # 5-7. Report, Metrics and Database Record per date
+    results = {}
+    with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+        futures = {report_date: executor.submit(process_date, report_date, tickers_data)
+                   for report_date, tickers_data in tickers_by_date.items()}
+        for report_date, future in futures.items():
+            try:
+                results[report_date] = future.result()
+            except Exception as e:
+                logger.error(f"Backfill failed for Reversal Date {report_date}: {e}", exc_info=True)
+                results[report_date] = None
+    return results
+
+if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Run the Price Reversal News Summary pipeline.")
     parser.add_argument("mode", type=str, help="The analysis mode (e.g., 'default').")
     parser.add_argument("file_path", type=str, nargs='?', default=None, help="The path to the Excel file. If not provided, the newest .xlsx in 'files/uploads' will be used.")
     parser.add_argument("--limit-companies", type=int, default=None, help="Limit the number of companies to process.")
+    parser.add_argument("--delta", action="store_true", help="Reuse the previous run's results for rows unchanged since the last completed upload.")
+    parser.add_argument("--backfill", action="store_true", help="Generate a report for every Reversal Date in the file instead of only the latest.")
+    parser.add_argument("--no-llm-cache", action="store_true", help="Ask Gemini for every report section instead of reusing cached responses.")
+    parser.add_argument("--max-workers", type=int, default=BACKFILL_MAX_WORKERS, help="Maximum number of dates processed concurrently in backfill mode.")
     
     args = parser.parse_args()
     
@@ -128,8 +279,19 @@ if __name__ == "__main__":
         target_file_path = max(xlsx_files, key=os.path.getmtime)
         logger.info(f"No file_path provided. Automatically selected newest file: '{target_file_path}'")
     
+    if args.backfill:
+        # Backfill reprocesses history, so the input file is left where it is
+        backfill_results = execute_backfill(target_file_path, args.mode, limit_companies=args.limit_companies, max_workers=args.max_workers, use_llm_cache=not args.no_llm_cache)
+        for report_date, report_path in backfill_results.items():
+            logger.info(f"  {report_date}: {report_path or 'FAILED'}")
+        if not backfill_results or not all(backfill_results.values()):
+            logger.error("Backfill completed with failures.")
+            sys.exit(1)
+        logger.info(f"Backfill completed for {len(backfill_results)} Reversal Dates.")
+        sys.exit(0)
+
     # Run the pipeline
-    pdf_report_path = execute_pipeline(target_file_path, args.mode, limit_companies=args.limit_companies)
+    pdf_report_path = execute_pipeline(target_file_path, args.mode, limit_companies=args.limit_companies, delta=args.delta, use_llm_cache=not args.no_llm_cache)
     
     if pdf_report_path:
         logger.info(f"Pipeline executed successfully. PDF report: {pdf_report_path}")
@@ -0,0 +1,11 @@
+import pytest
+
+from price_reversal_core import database_manager
+
+
+@pytest.fixture
+def temp_db(tmp_path, monkeypatch):
+    """Points the database helpers at a fresh, initialized database in tmp_path."""
+    monkeypatch.setattr(database_manager, "DB_PATH", str(tmp_path / "pipeline_metrics.db"))
+    database_manager.initialize_database()
+    return database_manager.DB_PATH
@@ -0,0 +1,96 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+import openpyxl
+import pytest
+
+import run_pipeline
+from price_reversal_core import llm_normalizer, news_fetcher, pdf_report_generator
+from price_reversal_core.newsapi_replay import ReplayNewsApiClient
+from price_reversal_core.schema import REQUIRED_COLUMNS
+
+
+@pytest.fixture
+def history(tmp_path):
+    """A workbook with two Reversal Dates of watchlist symbols and one date without any."""
+    path = tmp_path / "history.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(REQUIRED_COLUMNS)
+    rows = [('AAPL', datetime(2025, 7, 10)), ('NVDA', datetime(2025, 7, 10)),
+            ('AAPL', datetime(2025, 7, 18)), ('ZZZZ', datetime(2025, 7, 14))]
+    for symbol, date in rows:
+        ws.append([symbol, f'{symbol} Inc', date, 'Up', 10.0, -0.6, 11.0])
+    wb.save(path)
+    return str(path)
+
+
+def test_backfill_fetches_and_reports_each_date_once(history, temp_db, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("DEBUG_MODE", "False")
+    monkeypatch.setattr(news_fetcher, 'NEWS_CACHE_ENABLED', False)
+    monkeypatch.setattr(news_fetcher, 'make_newsapi_client', lambda: ReplayNewsApiClient(recordings_dir=None, latency_ms=0))
+    monkeypatch.setattr(llm_normalizer, 'normalize_company_names', lambda companies, metrics=None: [
+        dict(company, SearchQuery=company['Company Name']) for company in companies])
+
+    fetches = []
+    real_fetch = news_fetcher.fetch_news_records
+
+    def fetch(companies, **kwargs):
+        news_list = real_fetch(companies, rate_per_sec=1000, **kwargs)
+        fetches.append((kwargs['end_date'], [company['Symbol'] for company in companies], news_list))
+        return news_list
+
+    monkeypatch.setattr(news_fetcher, 'fetch_news_records', fetch)
+    reports = []
+    lock = threading.Lock()
+
+    def report(tickers_data, news_path, file_path, report_date=None, use_llm_cache=True):
+        with lock:
+            reports.append((report_date, [item['Symbol'] for item in tickers_data]))
+        return f"files/reports/{report_date}.pdf"
+
+    monkeypatch.setattr(run_pipeline, '_generate_report_and_metrics', report)
+
+    results = run_pipeline.execute_backfill(history, 'watchlist:tech_darlings', max_workers=2)
+
+    # The date without watchlist symbols is neither fetched nor reported
+    assert results == {'2025-07-10': 'files/reports/2025-07-10.pdf', '2025-07-18': 'files/reports/2025-07-18.pdf'}
+    assert sorted(reports) == [('2025-07-10', ['AAPL', 'NVDA']), ('2025-07-18', ['AAPL'])]
+    assert [(end_date, symbols) for end_date, symbols, _ in fetches] == [
+        (datetime(2025, 7, 10), ['AAPL', 'NVDA']), (datetime(2025, 7, 18), ['AAPL'])]
+    # Every article falls within the 7 days ending at its Reversal Date
+    for end_date, _, news_list in fetches:
+        for news in news_list:
+            assert news.articles
+            for article in news.articles:
+                published = datetime.strptime(article.publishedAt, '%Y-%m-%dT%H:%M:%SZ')
+                assert end_date - timedelta(days=7) <= published < end_date + timedelta(days=1)
+
+
+def test_concurrent_reports_share_one_call_limit(monkeypatch):
+    slots = threading.BoundedSemaphore(2)
+    monkeypatch.setattr(pdf_report_generator, '_call_slots', slots)
+    in_flight, peak = [0], [0]
+    lock = threading.Lock()
+
+    class SlowModel:
+        def generate_content(self, prompt, **kwargs):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            time.sleep(0.2)
+            with lock:
+                in_flight[0] -= 1
+            return type("Response", (), {"text": prompt[-1], "usage_metadata": None})()
+
+    # Two reports of three prompts each, as two backfill dates would run them
+    threads = [threading.Thread(target=pdf_report_generator._generate_responses,
+                                args=(SlowModel(), ["a", "b", "c"], "primer", "news", "data"))
+               for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+    assert peak[0] == 2
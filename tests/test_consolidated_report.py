@@ -0,0 +1,71 @@
+import pytest
+
+from price_reversal_core.pdf_report_generator import _generate_consolidated, _parse_sections
+from price_reversal_core.ttl_cache import TTLCache
+
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+class ScriptedModel:
+    """Answers the consolidated prompt with consolidated_text and every other prompt with its task."""
+
+    def __init__(self, consolidated_text):
+        self.consolidated_text = consolidated_text
+        self.prompts = []
+
+    def generate_content(self, prompt, request_options=None):
+        self.prompts.append(prompt)
+        if "=== SECTION <task number> ===" in prompt:
+            return Response(self.consolidated_text)
+        return Response("Answer to " + prompt.split("TASK: ")[1].strip())
+
+
+@pytest.mark.parametrize("marker", [
+    "=== SECTION {n} ===",
+    "==SECTION {n}==",
+    "  === section {n} ===  ",
+    "**=== SECTION {n} ===**",
+    "### === SECTION {n} ===",
+    "## **=== SECTION {n} ===**",
+    "=== **SECTION {n}** ===",
+    "__=== SECTION {n} ===__",
+])
+def test_parse_sections_accepts_markdown_wrapped_markers(marker):
+    text = "\n".join(f"{marker.format(n=n)}\nAnswer {n}\n" for n in (1, 2))
+    assert _parse_sections(text, 2) == {1: "Answer 1", 2: "Answer 2"}
+
+
+def test_parse_sections_ignores_empty_repeated_and_out_of_range_sections():
+    text = (
+        "Preamble\n=== SECTION 1 ===\nFirst\n=== SECTION 1 ===\nRepeat\n"
+        "=== SECTION 2 ===\n\n=== SECTION 9 ===\nStray\n"
+        "The text === SECTION 3 === inside a line is not a marker\n"
+    )
+    assert _parse_sections(text, 3) == {1: "First"}
+
+
+def test_complete_consolidated_answer_is_split_and_cached(tmp_path):
+    cache = TTLCache(str(tmp_path / "llm.db"), 3600, 1 << 20)
+    model = ScriptedModel("=== SECTION 1 ===\nOne\n**=== SECTION 2 ===**\nTwo\n")
+    responses, fallbacks = _generate_consolidated(model, ["a", "b"], "primer", "news", "data", cache)
+    assert [r["response"] for r in responses] == ["One", "Two"] and fallbacks == 0
+
+    rerun = ScriptedModel("unused")
+    assert _generate_consolidated(rerun, ["a", "b"], "primer", "news", "data", cache)[0] == responses
+    assert rerun.prompts == []
+
+
+def test_partial_consolidated_answer_falls_back_and_is_not_cached(tmp_path):
+    cache = TTLCache(str(tmp_path / "llm.db"), 3600, 1 << 20)
+    model = ScriptedModel("=== SECTION 1 ===\nOne\n")
+    responses, fallbacks = _generate_consolidated(model, ["a", "b"], "primer", "news", "data", cache)
+    assert [r["response"] for r in responses] == ["One", "Answer to b"] and fallbacks == 1
+
+    # The next run asks for the consolidated answer again instead of reusing the partial one
+    rerun = ScriptedModel("=== SECTION 1 ===\nNew one\n=== SECTION 2 ===\nNew two\n")
+    responses, fallbacks = _generate_consolidated(rerun, ["a", "b"], "primer", "news", "data", cache)
+    assert [r["response"] for r in responses] == ["New one", "New two"] and fallbacks == 0
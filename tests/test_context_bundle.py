@@ -0,0 +1,92 @@
+import json
+import os
+
+import pytest
+from reportlab.pdfgen import canvas
+
+from price_reversal_core import watchlists
+from price_reversal_core.context_bundle import build_context_bundle
+
+
+@pytest.fixture
+def sources(tmp_path):
+    pdf_path = tmp_path / "primer.pdf"
+    pdf = canvas.Canvas(str(pdf_path))
+    pdf.drawString(72, 720, "Reversals   from the PDF primer.")
+    pdf.save()
+    md_path = tmp_path / "primer.md"
+    md_path.write_text("# Primer\n\n\n\nMarkdown   notes.  \n", encoding="utf-8")
+    prompts_path = tmp_path / "prompts.txt"
+    prompts_path.write_text("First prompt.\n\nSecond prompt\nspans lines.\n", encoding="utf-8")
+    config_dir = tmp_path / "config"
+    config_dir.mkdir()
+    (config_dir / "movers.json").write_text(json.dumps([{"Ticker": "msft "}, {"Ticker": "AAPL"}, {"Ticker": ""}]), encoding="utf-8")
+    (config_dir / "settings.json").write_text(json.dumps({"not": "a watchlist"}), encoding="utf-8")
+    return {
+        "primer_pdf_path": str(pdf_path),
+        "prompts_path": str(prompts_path),
+        "primer_md_path": str(md_path),
+        "config_dir": str(config_dir),
+        "bundle_path": str(tmp_path / "cache" / "bundle.json"),
+    }
+
+
+def test_first_build_parses_every_source(sources):
+    bundle = build_context_bundle(**sources)
+    assert sorted(bundle.rebuilt) == ["config:movers", "config:settings", "primer_md", "primer_pdf", "prompts"]
+    # The markdown primer comes first, then the PDF text, each normalized
+    assert bundle.primer_text == "# Primer\n\nMarkdown notes.\n\nReversals from the PDF primer."
+    assert bundle.prompts == ["First prompt.", "Second prompt\nspans lines."]
+    assert bundle.watchlists == {"movers": ["AAPL", "MSFT"]}
+    assert os.path.exists(sources["bundle_path"])
+
+
+def test_unchanged_sources_are_not_rebuilt(sources):
+    build_context_bundle(**sources)
+    bundle = build_context_bundle(**sources)
+    assert bundle.rebuilt == []
+    assert bundle.prompts == ["First prompt.", "Second prompt\nspans lines."]
+
+
+@pytest.mark.parametrize("key, path_key, content", [
+    ("primer_md", "primer_md_path", "Updated notes."),
+    ("prompts", "prompts_path", "Only prompt."),
+    ("config:movers", None, json.dumps([{"Ticker": "NVDA"}])),
+])
+def test_changed_source_is_rebuilt(sources, key, path_key, content):
+    build_context_bundle(**sources)
+    path = sources[path_key] if path_key else os.path.join(sources["config_dir"], "movers.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(content)
+    bundle = build_context_bundle(**sources)
+    assert bundle.rebuilt == [key]
+
+
+def test_touched_file_with_same_content_is_not_rebuilt(sources):
+    build_context_bundle(**sources)
+    stat = os.stat(sources["prompts_path"])
+    os.utime(sources["prompts_path"], (stat.st_atime, stat.st_mtime + 60))
+    bundle = build_context_bundle(**sources)
+    assert bundle.rebuilt == []
+    with open(sources["bundle_path"], encoding="utf-8") as f:
+        entry = json.load(f)["entries"]["prompts"]
+    # The new stat is stored, so the next run skips hashing it again
+    assert entry["stat"][0] == stat.st_mtime + 60
+
+
+def test_missing_sources_contribute_nothing(sources, tmp_path):
+    sources["primer_pdf_path"] = str(tmp_path / "missing.pdf")
+    bundle = build_context_bundle(**sources)
+    assert bundle.primer_text == "# Primer\n\nMarkdown notes."
+    assert "primer_pdf" not in bundle.rebuilt
+
+
+def test_watchlists_are_seeded_for_subset_selection(sources, monkeypatch):
+    monkeypatch.setattr(watchlists, "_watchlists", {})
+    build_context_bundle(**sources)
+    path = os.path.join(sources["config_dir"], "movers.json")
+    assert watchlists._watchlists[path][1] == frozenset({"AAPL", "MSFT"})
+
+    # Served from the seeded entry without reading the file again
+    monkeypatch.setattr(watchlists, "open", lambda *args, **kwargs: pytest.fail("watchlist read again"), raising=False)
+    assert watchlists.load_watchlist("movers", sources["config_dir"]) == frozenset({"AAPL", "MSFT"})
@@ -0,0 +1,92 @@
+import datetime
+import os
+
+from price_reversal_core.context_packer import company_pattern, estimate_tokens, pack_articles, pack_news_context, score_article
+from price_reversal_core.news_records import CompanyNews, NewsArticle, articles_path_for, write_articles_jsonl
+
+NOW = datetime.datetime(2025, 7, 18, 12, 0, tzinfo=datetime.timezone.utc)
+
+
+def _article(symbol, title, days_old=0.0, description=None, url=None):
+    published = (NOW - datetime.timedelta(days=days_old)).strftime('%Y-%m-%dT%H:%M:%SZ')
+    return NewsArticle(symbol=symbol, title=title, source='Wire', publishedAt=published,
+                       url=url or f'https://example.com/{symbol}/{title}', description=description)
+
+
+def test_company_pattern_matches_whole_words_only():
+    pattern = company_pattern({'Symbol': 'AAPL', 'Company Name': 'Apple Inc', 'SearchQuery': 'Apple'})
+    assert pattern.search('Apple unveils a new phone')
+    assert pattern.search("apple's results beat")
+    assert pattern.search('AAPL slides after earnings')
+    assert not pattern.search('Pineapple prices soar')
+
+
+def test_short_symbols_only_match_in_ticker_form():
+    pattern = company_pattern({'Symbol': 'ON', 'SearchQuery': 'ON Semiconductor'})
+    assert not pattern.search('Stocks move on news of rate cuts')
+    assert pattern.search('$ON rallies')
+    assert pattern.search('Chipmaker (ON) rises')
+    assert pattern.search('on semiconductor guidance')
+
+
+def test_score_article_ranks_title_over_description_over_unrelated():
+    pattern = company_pattern({'Symbol': 'AAPL', 'SearchQuery': 'Apple'})
+    in_title = score_article(_article('AAPL', 'Apple beats estimates'), pattern, NOW)
+    in_description = score_article(_article('AAPL', 'Tech stocks rally', description='Apple led gains'), pattern, NOW)
+    unrelated = score_article(_article('AAPL', 'Pineapple harvest'), pattern, NOW)
+    assert (in_title, in_description, unrelated) == (2.0, 1.5, 1.0)
+
+
+def test_score_article_recency_halves_every_half_life():
+    article = _article('AAPL', 'Unrelated', days_old=3)
+    assert score_article(article, None, NOW, half_life_days=3) == 0.5
+
+
+def test_pack_articles_prefers_relevant_articles():
+    companies = [{'Symbol': 'ON', 'SearchQuery': 'ON Semiconductor'}]
+    articles = [
+        _article('ON', 'Stocks move on news of rate cuts'),
+        _article('ON', 'ON Semiconductor beats estimates', days_old=1),
+    ]
+    packed = pack_articles(articles, companies, budget=1000, now=NOW)
+    lines = packed.text.splitlines()
+    assert lines[0] == '## ON'
+    assert 'ON Semiconductor beats' in lines[1]
+    assert packed.kept == 2
+
+
+def test_pack_articles_covers_every_symbol_before_second_articles():
+    companies = [{'Symbol': 'AAA', 'SearchQuery': 'Aaa'}, {'Symbol': 'BBB', 'SearchQuery': 'Bbb'}]
+    articles = [_article('AAA', f'Aaa story {i}') for i in range(5)] + [_article('BBB', 'Bbb story')]
+    one_each = sum(estimate_tokens(f"\n## {s}\n") for s in ('AAA', 'BBB')) + 2 * estimate_tokens('- 2025-07-18 Wire: Aaa story 0\n')
+    packed = pack_articles(articles, companies, budget=one_each, now=NOW)
+    assert '## AAA' in packed.text and '## BBB' in packed.text
+    assert packed.kept == 2
+    assert packed.dropped == {'AAA': 4}
+    assert packed.uncovered == []
+    assert packed.tokens <= packed.budget
+
+
+def test_pack_articles_reports_symbols_without_room():
+    companies = [{'Symbol': 'AAA', 'SearchQuery': 'Aaa'}, {'Symbol': 'BBB', 'SearchQuery': 'Bbb'}]
+    articles = [_article('AAA', 'Aaa ' + 'x' * 60), _article('BBB', 'Bbb ' + 'y' * 60)]
+    packed = pack_articles(articles, companies, budget=25, now=NOW)
+    assert packed.kept == 1
+    assert packed.uncovered == ['BBB']
+
+
+def test_pack_news_context_scores_recency_against_the_fetch_time(tmp_path):
+    summary_path = tmp_path / "NewsSummary-2025-07-18.txt"
+    summary_path.write_text("News Summary\n")
+    # Fresh but unrelated, against older and only named in the description: the order depends on the reference time
+    articles = [_article('AAA', 'Market wrap', days_old=0), _article('AAA', 'Sector update', days_old=4, description='Aaa guidance')]
+    write_articles_jsonl([CompanyNews(symbol='AAA', query='Aaa', articles=articles)], articles_path_for(str(summary_path)))
+    fetched_at = NOW.timestamp()
+    os.utime(articles_path_for(str(summary_path)), (fetched_at, fetched_at))
+
+    companies = [{'Symbol': 'AAA', 'SearchQuery': 'Aaa'}]
+    packed = pack_news_context(str(summary_path), companies, budget=1000)
+    # The same text as packing at fetch time, however long after the fetch it runs,
+    # so the report prompt and its cache key are unchanged on a rerun
+    assert packed.text == pack_articles(articles, companies, budget=1000, now=NOW).text
+    assert packed.text != pack_articles(articles, companies, budget=1000, now=NOW + datetime.timedelta(days=30)).text
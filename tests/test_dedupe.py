@@ -0,0 +1,48 @@
+from price_reversal_core.dedupe import NearDuplicateIndex, dedupe_news, minhash, shingles, BANDS, ROWS
+from price_reversal_core.news_records import CompanyNews, NewsArticle
+
+
+def _article(symbol, title, url):
+    return NewsArticle(symbol=symbol, title=title, source='Wire', publishedAt='2025-07-18T12:00:00Z', url=url)
+
+
+def test_shingles_ignore_case_and_punctuation():
+    assert shingles("Apple, Inc. RISES!") == shingles("apple inc rises")
+    assert shingles("abc") == {"abc"}
+    assert shingles("  ...  ") == set()
+
+
+def test_minhash_is_deterministic():
+    signature = minhash(shingles("Apple shares rise after earnings beat"))
+    assert signature.shape == (BANDS * ROWS,)
+    assert (signature == minhash(shingles("Apple shares rise after earnings beat"))).all()
+
+
+def test_index_rejects_near_duplicates_only():
+    index = NearDuplicateIndex(threshold=0.4)
+    assert index.add_if_new("Apple shares rise after strong quarterly earnings beat")
+    assert not index.add_if_new("Apple shares rise after strong quarterly earnings beat estimates")
+    assert index.add_if_new("Oil prices slump as OPEC raises output targets")
+    # Headlines without text never count as duplicates
+    assert index.add_if_new("")
+    assert index.add_if_new("")
+
+
+def test_dedupe_news_across_companies():
+    first = CompanyNews(symbol='AAPL', query='Apple', articles=[
+        _article('AAPL', 'Apple shares rise after strong quarterly earnings beat', 'https://a/1'),
+        _article('AAPL', 'Apple unveils new headset at developer conference', 'https://a/2'),
+    ])
+    second = CompanyNews(symbol='MSFT', query='Microsoft', articles=[
+        _article('MSFT', 'Completely different story', 'https://a/2'),
+        _article('MSFT', 'Apple shares rise after strong quarterly earnings beat, analysts say', 'https://b/1'),
+        _article('MSFT', 'Microsoft cloud revenue tops forecasts', 'https://b/2'),
+    ], error=None)
+
+    deduped = dedupe_news([first, second])
+
+    assert [a.url for a in deduped[0].articles] == ['https://a/1', 'https://a/2']
+    assert [a.url for a in deduped[1].articles] == ['https://b/2']
+    assert deduped[1].symbol == 'MSFT' and deduped[1].query == 'Microsoft'
+    # The input records are left as fetched
+    assert len(second.articles) == 3
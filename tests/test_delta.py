@@ -0,0 +1,51 @@
+import pandas as pd
+
+from price_reversal_core.database_manager import fetch_row_results, upsert_row_results
+from price_reversal_core.delta import find_changed_keys, row_key
+
+
+def _upload(rows):
+    return pd.DataFrame(rows, columns=['Symbol', 'Reversal Date', 'Close', 'HR1'])
+
+
+def test_find_changed_keys_without_previous_upload_returns_every_row():
+    current = _upload([['AAA', '2025-07-18', 10.0, -0.6], ['BBB', '2025-07-18', 20.0, -0.7]])
+    assert find_changed_keys(current, None) == {('AAA', '2025-07-18'), ('BBB', '2025-07-18')}
+    assert find_changed_keys(current, pd.DataFrame()) == {('AAA', '2025-07-18'), ('BBB', '2025-07-18')}
+
+
+def test_find_changed_keys_reports_new_and_changed_rows_only():
+    previous = _upload([['AAA', '2025-07-18', 10.0, -0.6], ['BBB', '2025-07-18', 20.0, -0.7]])
+    current = _upload([
+        ['AAA', '2025-07-18', 10.0, -0.6],   # unchanged
+        ['BBB', '2025-07-18', 21.0, -0.7],   # value changed
+        ['CCC', '2025-07-18', 30.0, -0.8],   # new
+        ['AAA', '2025-07-17', 10.0, -0.6],   # same symbol, new date
+    ])
+    assert find_changed_keys(current, previous) == {
+        ('BBB', '2025-07-18'), ('CCC', '2025-07-18'), ('AAA', '2025-07-17'),
+    }
+
+
+def test_find_changed_keys_matches_dates_regardless_of_type():
+    previous = _upload([['AAA', pd.Timestamp('2025-07-18'), 10.0, -0.6]])
+    current = _upload([['AAA', '2025-07-18', 10.0, -0.6]])
+    assert find_changed_keys(current, previous) == set()
+
+
+def test_find_changed_keys_ignores_columns_missing_from_previous_upload():
+    previous = _upload([['AAA', '2025-07-18', 10.0, -0.6]]).drop(columns=['HR1'])
+    current = _upload([['AAA', '2025-07-18', 10.0, -0.9]])
+    assert find_changed_keys(current, previous) == set()
+
+
+def test_find_changed_keys_of_empty_upload_is_empty():
+    assert find_changed_keys(_upload([]), _upload([['AAA', '2025-07-18', 10.0, -0.6]])) == set()
+
+
+def test_row_results_round_trip_on_fresh_database(temp_db):
+    key = row_key('AAA', '2025-07-18')
+    upsert_row_results('upload.xlsx', [{
+        'symbol': key[0], 'reversal_date': key[1], 'search_query': 'Aaa Corp', 'news_section': '{}',
+    }])
+    assert fetch_row_results([key, ('ZZZ', '2025-07-18')]) == {key: {'search_query': 'Aaa Corp', 'news_section': '{}'}}
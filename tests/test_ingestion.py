@@ -0,0 +1,90 @@
+import os
+from datetime import datetime
+
+import openpyxl
+import pandas as pd
+import pytest
+
+from price_reversal_core import ingestion
+from price_reversal_core.ingestion import evict_cache, iter_excel_chunks, load_excel
+from price_reversal_core.schema import REQUIRED_COLUMNS
+
+
+@pytest.fixture
+def workbook(tmp_path):
+    path = tmp_path / "upload.xlsx"
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(REQUIRED_COLUMNS + ['Unused'])
+    for i in range(5):
+        ws.append([f'SYM{i}', f'Company {i}', datetime(2025, 7, 18), 'Up', 10.0 + i, -0.5, 11.0 + i, 'x'])
+    ws.append([None] * (len(REQUIRED_COLUMNS) + 1))
+    wb.save(path)
+    return str(path)
+
+
+def test_iter_excel_chunks_yields_selected_columns_in_chunks(workbook):
+    chunks = list(iter_excel_chunks(workbook, ['Symbol', 'HR1 Value', 'Missing'], chunk_size=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    assert list(chunks[0].columns) == ['Symbol', 'HR1 Value']
+
+
+def test_load_excel_reads_and_types_only_the_requested_columns(workbook):
+    df = load_excel(workbook, columns=REQUIRED_COLUMNS, chunk_size=2, use_cache=False)
+    assert list(df.columns) == REQUIRED_COLUMNS
+    assert len(df) == 5
+    assert pd.api.types.is_datetime64_any_dtype(df['Reversal Date'])
+    assert isinstance(df['Symbol'].dtype, pd.CategoricalDtype)
+
+
+def test_load_excel_reports_missing_required_columns(workbook):
+    with pytest.raises(ValueError, match="Missing columns"):
+        load_excel(workbook, columns=['Symbol'], use_cache=False)
+
+
+def _cache_entries(cache_dir):
+    return sorted(path.name for path in cache_dir.glob("*.parquet"))
+
+
+def test_second_load_is_served_from_the_cache(workbook, tmp_path, monkeypatch):
+    cache_dir = tmp_path / "cache"
+    first = load_excel(workbook, columns=REQUIRED_COLUMNS, use_cache=True, cache_dir=str(cache_dir))
+    assert len(_cache_entries(cache_dir)) == 1
+
+    monkeypatch.setattr(ingestion, "iter_excel_chunks", lambda *args, **kwargs: pytest.fail("workbook parsed again"))
+    second = load_excel(workbook, columns=REQUIRED_COLUMNS, use_cache=True, cache_dir=str(cache_dir))
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_changed_workbook_content_misses_the_cache(workbook, tmp_path):
+    cache_dir = tmp_path / "cache"
+    load_excel(workbook, columns=REQUIRED_COLUMNS, use_cache=True, cache_dir=str(cache_dir))
+    wb = openpyxl.load_workbook(workbook)
+    wb.active.append(['NEW', 'New Co', datetime(2025, 7, 18), 'Down', 1.0, -0.5, 2.0, 'x'])
+    wb.save(workbook)
+
+    df = load_excel(workbook, columns=REQUIRED_COLUMNS, use_cache=True, cache_dir=str(cache_dir))
+    assert 'NEW' in df['Symbol'].tolist()
+    assert len(_cache_entries(cache_dir)) == 2
+
+
+def test_column_set_is_part_of_the_cache_key(workbook, tmp_path):
+    cache_dir = tmp_path / "cache"
+    load_excel(workbook, columns=REQUIRED_COLUMNS, use_cache=True, cache_dir=str(cache_dir))
+    df = load_excel(workbook, columns=REQUIRED_COLUMNS + ['Unused'], use_cache=True, cache_dir=str(cache_dir))
+    assert 'Unused' in df.columns
+    assert len(_cache_entries(cache_dir)) == 2
+
+
+def test_evict_cache_removes_least_recently_used_entries(tmp_path):
+    for age, name in enumerate(['newest', 'middle', 'oldest']):
+        path = tmp_path / f"{name}.parquet"
+        path.write_bytes(b"x" * 100)
+        os.utime(path, (1000 - age, 1000 - age))
+    (tmp_path / "other.txt").write_bytes(b"x" * 1000)
+
+    evict_cache(str(tmp_path), max_bytes=150)
+
+    assert _cache_entries(tmp_path) == ['newest.parquet']
+    assert (tmp_path / "other.txt").exists()
+    evict_cache(str(tmp_path / "missing"), max_bytes=0)
@@ -0,0 +1,25 @@
+from price_reversal_core.llm_normalizer import _parse_normalization_response
+
+
+def test_parses_fenced_json_with_surrounding_prose():
+    text = 'Here you go:\n```json\n[{"Symbol": "AAPL", "SearchQuery": "Apple"}, {"Symbol": "MSFT", "SearchQuery": "Microsoft"}]\n```\nDone.'
+    assert _parse_normalization_response(text) == {"AAPL": "Apple", "MSFT": "Microsoft"}
+
+
+def test_salvages_complete_objects_from_a_truncated_list():
+    text = '[{"Symbol": "AAPL", "SearchQuery": "Apple"}, {"Symbol": "MSFT", "SearchQuery": "Micro'
+    assert _parse_normalization_response(text) == {"AAPL": "Apple"}
+
+
+def test_skips_malformed_objects_and_incomplete_entries():
+    text = '[{"Symbol": "AAPL", "SearchQuery": "Apple"}, {"Symbol": "BAD", oops}, {"Symbol": "X", "SearchQuery": ""}, {"Symbol": "GOOG", "SearchQuery": "Alphabet"}'
+    assert _parse_normalization_response(text) == {"AAPL": "Apple", "GOOG": "Alphabet"}
+
+
+def test_ignores_non_object_entries():
+    assert _parse_normalization_response('["AAPL", {"Symbol": "IBM", "SearchQuery": "IBM"}, null]') == {"IBM": "IBM"}
+
+
+def test_no_json_yields_nothing():
+    assert _parse_normalization_response("I cannot help with that.") == {}
+    assert _parse_normalization_response("") == {}
@@ -0,0 +1,95 @@
+import pytest
+from reportlab.platypus import Paragraph, Preformatted, Spacer, Table
+from reportlab.platypus.flowables import HRFlowable
+
+from price_reversal_core.markdown_flowables import inline_markup, last_block_boundary, markdown_to_paragraphs, report_styles
+
+
+@pytest.fixture
+def styles():
+    return report_styles()
+
+
+def _kinds(story):
+    return [type(flowable).__name__ for flowable in story]
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("**bold** and *italic*", "<b>bold</b> and <i>italic</i>"),
+    ("__bold__ and _italic_", "<b>bold</b> and <i>italic</i>"),
+    ("***both***", "<b><i>both</i></b>"),
+    ("**a *b* c**", "<b>a <i>b</i> c</b>"),
+    ("`x < *y*` & z", '<font face="Courier">x &lt; *y*</font> &amp; z'),
+    ("snake_case_name and 2 * 3 * 4", "snake_case_name and 2 * 3 * 4"),
+])
+def test_inline_markup(text, expected):
+    assert inline_markup(text) == expected
+
+
+def test_block_elements(styles):
+    text = (
+        "# Title\n"
+        "## Section\n"
+        "### Detail\n"
+        "Plain line\n"
+        "\n"
+        "- item\n"
+        "    - nested\n"
+        "1. first\n"
+        "---\n"
+        "| A | B |\n"
+        "|---|---|\n"
+        "| 1 | 2 |\n"
+        "```\n"
+        "code **not bold**\n"
+        "```"
+    )
+    story = markdown_to_paragraphs(text, styles)
+    assert _kinds(story) == [
+        'Paragraph', 'Paragraph', 'Paragraph', 'Paragraph', 'Spacer',
+        'Paragraph', 'Paragraph', 'Paragraph', 'HRFlowable', 'Table', 'Spacer', 'Preformatted',
+    ]
+    assert [p.style.name for p in story[:3]] == ['CustomH1', 'CustomH2', 'CustomH3']
+    assert story[5].style.name == 'MdList0' and story[6].style.name == 'MdList2'
+    assert story[5].text == '• item'
+    assert story[7].text == '1. first'
+    assert story[11].lines == ['code **not bold**']
+
+
+def test_table_header_and_ragged_rows(styles):
+    table = markdown_to_paragraphs("| A | B | C |\n|---|---|---|\n| 1 |", styles)[0]
+    assert isinstance(table, Table)
+    assert table._cellvalues[0][0].text == '<b>A</b>'
+    assert len(table._cellvalues[1]) == 3
+
+
+def test_unterminated_fence_still_renders_code(styles):
+    story = markdown_to_paragraphs("```\nx = 1\ny = 2", styles)
+    assert isinstance(story[-1], Preformatted)
+    assert story[-1].lines == ['x = 1', 'y = 2']
+
+
+def test_crossed_emphasis_falls_back_to_plain_text(styles):
+    story = markdown_to_paragraphs("**a _b** c_", styles)
+    assert len(story) == 1 and isinstance(story[0], Paragraph)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("no blank line", -1),
+    ("one\n\ntwo", 3),
+    ("one\n\ntwo\n\nthree", 8),
+    # Blank lines inside an open fence are not block boundaries
+    ("one\n\n```\na\n\nb", 3),
+    ("```\na\n\nb", -1),
+    ("one\n\n```\na\n\nb\n```\n\nafter", 17),
+])
+def test_last_block_boundary(text, expected):
+    assert last_block_boundary(text) == expected
+
+
+def test_text_before_the_boundary_converts_the_same(styles):
+    text = "# Head\nline\n\n```\ncode\n\nmore\n```\n\n| A |\n|---|\n| 1 |\n\ntail"
+    cut = last_block_boundary(text)
+    prefix = markdown_to_paragraphs(text[:cut], report_styles())
+    whole = markdown_to_paragraphs(text, styles)
+    assert _kinds(prefix) == _kinds(whole)[:len(prefix)]
@@ -0,0 +1,83 @@
+import json
+
+import pytest
+
+from price_reversal_core.name_rules import ALIASES_PATH, load_aliases, normalize_name, strip_suffixes
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Zimmer Biomet Hldgs Inc", "Zimmer Biomet"),
+    ("Eli Lilly and Co", "Eli Lilly"),
+    ("The Hershey Co", "Hershey"),
+    ("Marsh & McLennan Cos", "Marsh & McLennan"),
+    ("Goldman Sachs Group Inc", "Goldman Sachs"),
+    ("Brown-Forman Corp 'B'", "Brown-Forman"),
+    ("Fox Corp Cl A", "Fox"),
+    ("Medtronic plc", "Medtronic"),
+    ("Carnival Corp.", "Carnival"),
+])
+def test_strip_suffixes_removes_legal_forms_and_share_classes(name, expected):
+    assert strip_suffixes(name) == expected
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Corteva Inc W", "Corteva Inc W"),
+    ("Amphenol Corp A", "Amphenol Corp A"),
+    ("Welltower OP Inc", "Welltower OP"),
+    ("Willis Towers Watson Public Li", "Willis Towers Watson Public Li"),
+    ("Baker Hughes a GE Co Cl A", "Baker Hughes a GE"),
+])
+def test_strip_suffixes_keeps_unknown_listing_notes(name, expected):
+    # Only real corporate suffixes are stripped; the rest is left for the LLM to resolve
+    assert strip_suffixes(name) == expected
+    assert normalize_name(name).ambiguous == "unrecognized listing suffix"
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Zimmer Biomet Hldgs Inc", "Zimmer Biomet"),
+    ("Fidelity Natl Finl Inc", "Fidelity Natl Financial"),
+    ("Intl Paper Co", "International Paper"),
+    ("Texas Pac Ld Corp", "Texas Pacific Land"),
+    ("T-Mobile US Inc", "T-Mobile US"),
+    ("Federal Rlty Inv Tr", "Federal Realty Investment Trust"),
+])
+def test_normalize_name_by_rules(name, expected):
+    result = normalize_name(name)
+    assert (result.query, result.ambiguous, result.path) == (expected, None, "rules")
+
+
+@pytest.mark.parametrize("name, reason", [
+    ("", "empty name"),
+    ("Brown (Acme) Co", "inverted or qualified name"),
+    ("Corteva Inc W", "unrecognized listing suffix"),
+    ("Align Tech Inc", "ambiguous abbreviation"),
+    ("Visa Inc", "too short or generic"),
+    ("Dow Inc", "too short or generic"),
+    ("HP Inc", "too short or generic"),
+])
+def test_normalize_name_leaves_ambiguous_names_to_the_llm(name, reason):
+    result = normalize_name(name)
+    assert (result.query, result.ambiguous) == (None, reason)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("Disney (Walt) Co", "Disney"),
+    ("Grainger (W.W.)", "W.W. Grainger"),
+    ("Booking Hldgs Inc", "Booking Holdings"),
+])
+def test_aliases_are_applied_before_the_rules(name, expected):
+    result = normalize_name(name)
+    assert (result.query, result.path) == (expected, "alias")
+
+
+def test_alias_config_has_no_identity_entries():
+    with open(ALIASES_PATH, encoding="utf-8") as f:
+        entries = json.load(f)
+    assert entries
+    assert [name for name, query in entries.items() if name == query] == []
+
+
+def test_load_aliases_keys_by_stripped_name(tmp_path):
+    path = tmp_path / "aliases.json"
+    path.write_text(json.dumps({"Citigrp Inc": "Citigroup", "Empty Corp": ""}))
+    assert load_aliases(str(path)) == {"citigrp": "Citigroup"}
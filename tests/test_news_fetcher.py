@@ -0,0 +1,108 @@
+from datetime import datetime
+
+import pytest
+from newsapi.newsapi_exception import NewsAPIException
+
+from price_reversal_core import news_fetcher
+from price_reversal_core.news_fetcher import ArticleMatcher, fetch_batch_news, fetch_news_records
+from price_reversal_core.rate_limiter import TokenBucket
+
+
+class FakeNewsApi:
+    """Records get_everything calls and answers each with the articles given per query."""
+
+    def __init__(self, articles_by_query=None, status='ok'):
+        self.articles_by_query = articles_by_query or {}
+        self.status = status
+        self.calls = []
+
+    def get_everything(self, **params):
+        self.calls.append(params)
+        return {'status': self.status, 'articles': self.articles_by_query.get(params['q'], [])}
+
+
+@pytest.fixture(autouse=True)
+def no_news_cache(monkeypatch):
+    monkeypatch.setattr(news_fetcher, 'NEWS_CACHE_ENABLED', False)
+
+
+def test_window_ends_at_end_date_and_skips_incremental_state(temp_db, monkeypatch):
+    monkeypatch.setattr(news_fetcher, '_incremental_since', lambda *args: pytest.fail("historical windows are fetched in full"))
+    newsapi = FakeNewsApi()
+    fetch_news_records([{'Symbol': 'AAA', 'SearchQuery': 'Aaa'}], newsapi=newsapi, batch_size=1,
+                       rate_per_sec=1000, incremental=True, end_date=datetime(2025, 7, 18))
+    assert [(call['from_param'], call['to']) for call in newsapi.calls] == [('2025-07-11', '2025-07-18')]
+
+
+def _api_article(title, description=None, url=None):
+    return {'title': title, 'description': description, 'source': {'name': 'Wire'},
+            'publishedAt': '2025-07-17T10:00:00Z', 'url': url or f'https://example.com/{title}'}
+
+
+def test_article_matcher_matches_whole_phrases_longest_first():
+    arch, arch_group, apple = (
+        {'Symbol': 'ACGL', 'SearchQuery': 'Arch Capital'},
+        {'Symbol': 'ACG', 'SearchQuery': 'Arch Capital Group'},
+        {'Symbol': 'AAPL', 'SearchQuery': 'Apple'},
+    )
+    matcher = ArticleMatcher([arch, arch_group, apple])
+    assert matcher.match(_api_article('Arch  Capital Group raises dividend')) == [arch_group]
+    assert matcher.match(_api_article('Arch Capital beats', 'apple and Arch Capital Group')) == [arch, apple, arch_group]
+    assert matcher.match(_api_article('Pineapple prices')) == []
+    assert ArticleMatcher([]).match(_api_article('Anything')) == []
+
+
+def test_batch_assigns_articles_by_symbol():
+    companies = [{'Symbol': 'AAA', 'SearchQuery': 'Aaa Corp'}, {'Symbol': 'BBB', 'SearchQuery': 'Bbb'},
+                 {'Symbol': 'AAA', 'SearchQuery': 'Aaa Corp'}]
+    newsapi = FakeNewsApi({'"Aaa Corp" OR "Bbb"': [
+        _api_article('Aaa Corp and Bbb merge'), _api_article('Bbb hires'), _api_article('Unrelated'),
+    ]})
+    news_list = fetch_batch_news(newsapi, companies, datetime(2025, 7, 11), datetime(2025, 7, 18),
+                                 limiter=TokenBucket(1000, 10))
+    assert [news.symbol for news in news_list] == ['AAA', 'BBB', 'AAA']
+    assert [[a.title for a in news.articles] for news in news_list] == [
+        ['Aaa Corp and Bbb merge'], ['Aaa Corp and Bbb merge', 'Bbb hires'], ['Aaa Corp and Bbb merge'],
+    ]
+    assert len(newsapi.calls) == 1
+
+
+def test_rejected_batch_is_retried_per_company():
+    class BatchFailsApi(FakeNewsApi):
+        def get_everything(self, **params):
+            self.calls.append(params)
+            if ' OR ' in params['q']:
+                # The live client raises on every non-200 response
+                raise NewsAPIException({'status': 'error', 'code': 'maximumResultsReached', 'message': 'Too many results'})
+            return {'status': 'ok', 'articles': [_api_article(f"{params['q']} news")]}
+
+    companies = [{'Symbol': 'AAA', 'SearchQuery': 'Aaa'}, {'Symbol': 'BBB', 'SearchQuery': 'Bbb'}]
+    newsapi = BatchFailsApi()
+    news_list = fetch_batch_news(newsapi, companies, datetime(2025, 7, 11), datetime(2025, 7, 18),
+                                 limiter=TokenBucket(1000, 10))
+    assert [call['q'] for call in newsapi.calls] == ['"Aaa" OR "Bbb"', 'Aaa', 'Bbb']
+    assert [[a.title for a in news.articles] for news in news_list] == [['Aaa news'], ['Bbb news']]
+    assert all(news.error is None for news in news_list)
+
+
+def test_rate_limited_batch_is_not_retried_per_company(monkeypatch):
+    class RateLimitedApi(FakeNewsApi):
+        def get_everything(self, **params):
+            self.calls.append(params)
+            raise NewsAPIException({'status': 'error', 'code': 'rateLimited', 'message': 'Too many requests'})
+
+    monkeypatch.setattr(news_fetcher, 'NEWSAPI_MAX_RETRIES', 0)
+    companies = [{'Symbol': 'AAA', 'SearchQuery': 'Aaa'}, {'Symbol': 'BBB', 'SearchQuery': 'Bbb'}]
+    newsapi = RateLimitedApi()
+    news_list = fetch_batch_news(newsapi, companies, datetime(2025, 7, 11), datetime(2025, 7, 18),
+                                 limiter=TokenBucket(1000, 10))
+    assert len(newsapi.calls) == 1
+    assert [news.error for news in news_list] == ['Too many requests', 'Too many requests']
+
+
+def test_save_news_summary_does_not_refetch_after_a_failed_fetch(tmp_path, monkeypatch):
+    monkeypatch.setattr(news_fetcher, 'fetch_news_records', lambda *args, **kwargs: pytest.fail("fetched twice"))
+    path = news_fetcher.save_news_summary([{'Symbol': 'AAA'}], output_dir=str(tmp_path), report_date='2025-07-18',
+                                          news_list=None, fetch=False)
+    with open(path, encoding='utf-8') as f:
+        assert f.read() == "Error: NEWSAPI_KEY not found."
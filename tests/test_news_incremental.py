@@ -0,0 +1,56 @@
+import json
+
+from price_reversal_core.database_manager import fetch_news_watermarks, store_news_articles
+from price_reversal_core.news_fetcher import _incremental_since, _merge_stored_news
+from price_reversal_core.news_records import CompanyNews, NewsArticle
+
+WINDOW_START = '2025-07-11'
+
+
+def _article(symbol, url, published_at, title='Headline'):
+    return NewsArticle(symbol=symbol, title=title, source='Wire', publishedAt=published_at, url=url)
+
+
+def _row(article):
+    return (article.symbol, article.url, article.publishedAt, json.dumps(article.to_dict()))
+
+
+def test_watermark_is_returned_with_its_stored_article(temp_db):
+    article = _article('AAA', 'https://example.com/a', '2025-07-17T10:00:00Z')
+    store_news_articles([_row(article)], [('AAA', 'Aaa Corp', '2025-07-17T10:00:00Z')])
+    assert fetch_news_watermarks(['AAA', 'BBB']) == {'AAA': ('Aaa Corp', '2025-07-17T10:00:00Z')}
+
+
+def test_watermark_without_stored_article_is_ignored(temp_db):
+    store_news_articles([], [('AAA', 'Aaa Corp', '2025-07-17T10:00:00Z')])
+    assert fetch_news_watermarks(['AAA']) == {}
+    assert _incremental_since([{'Symbol': 'AAA', 'SearchQuery': 'Aaa Corp'}], WINDOW_START) == {}
+
+
+def test_articles_without_url_do_not_advance_the_watermark(temp_db):
+    news = CompanyNews(symbol='AAA', query='Aaa Corp', articles=[
+        _article('AAA', 'https://example.com/a', '2025-07-16T09:00:00Z'),
+        _article('AAA', '', '2025-07-17T10:00:00Z'),
+    ])
+    _merge_stored_news([news], {}, WINDOW_START)
+    assert fetch_news_watermarks(['AAA']) == {'AAA': ('Aaa Corp', '2025-07-16T09:00:00Z')}
+
+
+def test_incremental_run_merges_stored_articles_and_keeps_the_mark(temp_db):
+    first = CompanyNews(symbol='AAA', query='Aaa Corp', articles=[_article('AAA', 'https://example.com/a', '2025-07-16T09:00:00Z')])
+    _merge_stored_news([first], {}, WINDOW_START)
+
+    companies = [{'Symbol': 'AAA', 'SearchQuery': 'Aaa Corp'}]
+    since = _incremental_since(companies, WINDOW_START)
+    assert since == {'AAA': '2025-07-16T09:00:00Z'}
+
+    # Nothing new since the mark: the stored article fills the window and the mark stays valid
+    merged = _merge_stored_news([CompanyNews(symbol='AAA', query='Aaa Corp')], since, WINDOW_START)
+    assert [article.url for article in merged[0].articles] == ['https://example.com/a']
+    assert _incremental_since(companies, WINDOW_START) == since
+
+
+def test_changed_query_needs_the_full_window(temp_db):
+    news = CompanyNews(symbol='AAA', query='Aaa Corp', articles=[_article('AAA', 'https://example.com/a', '2025-07-16T09:00:00Z')])
+    _merge_stored_news([news], {}, WINDOW_START)
+    assert _incremental_since([{'Symbol': 'AAA', 'SearchQuery': 'Aaa Corporation'}], WINDOW_START) == {}
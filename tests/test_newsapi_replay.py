@@ -0,0 +1,77 @@
+import json
+import os
+
+import pytest
+from newsapi.newsapi_exception import NewsAPIException
+
+from price_reversal_core.news_fetcher import _is_rate_limited
+from price_reversal_core.newsapi_replay import RecordingNewsApiClient, ReplayNewsApiClient, recording_key
+
+
+def _replay(**kwargs):
+    kwargs.setdefault("recordings_dir", None)
+    return ReplayNewsApiClient(latency_ms=0, **kwargs)
+
+
+class LiveStub:
+    def __init__(self, response):
+        self.response = response
+        self.calls = []
+
+    def get_everything(self, **params):
+        self.calls.append(params)
+        return self.response
+
+
+def test_recorded_response_is_replayed(tmp_path):
+    response = {'status': 'ok', 'totalResults': 2, 'articles': [{'title': 'One'}, {'title': 'Two'}]}
+    recorder = RecordingNewsApiClient(LiveStub(response), recordings_dir=str(tmp_path))
+    assert recorder.get_everything(q='Apple  Inc', from_param='2025-07-11', to='2025-07-18', language='en', page_size=5) == response
+    assert os.listdir(tmp_path) == [f"{recording_key({'q': 'Apple  Inc', 'language': 'en', 'page_size': 5})}.json"]
+
+    replay = _replay(recordings_dir=str(tmp_path))
+    # The key ignores the date window and normalizes the query
+    replayed = replay.get_everything(q='apple inc', from_param='2025-08-01', to='2025-08-08', language='en', page_size=5)
+    assert replayed == response
+    assert replay.replayed == 1
+    # page_size is part of the request, so another page size is not served from this recording
+    assert replay.get_everything(q='apple inc', language='en', page_size=1)['articles'] != [{'title': 'One'}]
+
+
+def test_failed_responses_are_not_recorded(tmp_path):
+    recorder = RecordingNewsApiClient(LiveStub({'status': 'error', 'code': 'apiKeyInvalid'}), recordings_dir=str(tmp_path))
+    recorder.get_everything(q='Apple', page_size=5)
+    assert os.listdir(tmp_path) == []
+
+
+def test_synthesis_is_deterministic_per_query_and_seed():
+    params = dict(q='"Apple" OR "Microsoft"', from_param='2025-07-11', to='2025-07-18', page_size=100)
+    first = _replay(articles_per_term=3).get_everything(**params)
+    assert first == _replay(articles_per_term=3).get_everything(**params)
+    assert first['status'] == 'ok' and len(first['articles']) == 6
+    assert {a['title'].split(':')[0] for a in first['articles']} == {'Apple', 'Microsoft'}
+    assert all('2025-07-11' <= a['publishedAt'] < '2025-07-19' for a in first['articles'])
+    assert [a['publishedAt'] for a in first['articles']] == sorted((a['publishedAt'] for a in first['articles']), reverse=True)
+    assert first != _replay(articles_per_term=3, seed=1).get_everything(**params)
+
+
+def test_page_size_caps_synthesized_articles():
+    response = _replay(articles_per_term=5).get_everything(q='Apple', page_size=2)
+    assert len(response['articles']) == 2
+
+
+def test_injected_rate_limits_raise_like_the_live_client():
+    replay = _replay(rate_limit_rate=1.0)
+    with pytest.raises(NewsAPIException) as excinfo:
+        replay.get_everything(q='Apple')
+    assert _is_rate_limited(excinfo.value)
+    assert replay.rate_limited == 1 and replay.calls == 1
+
+
+def test_injected_errors_raise_without_looking_rate_limited():
+    replay = _replay(error_rate=1.0)
+    with pytest.raises(NewsAPIException) as excinfo:
+        replay.get_everything(q='Apple')
+    assert not _is_rate_limited(excinfo.value)
+    assert excinfo.value.exception['code'] == 'unexpectedError'
+    assert replay.errors == 1
@@ -0,0 +1,14 @@
+from price_reversal_core import normalization_store
+from price_reversal_core.normalization_store import lookup_search_queries, remember_search_queries
+
+
+def test_stored_queries_are_reused_for_the_same_name(temp_db):
+    remember_search_queries([{'Symbol': 'AAA', 'Company Name': 'Aaa Corp W', 'SearchQuery': 'Aaa'}])
+    assert lookup_search_queries([{'Symbol': 'AAA', 'Company Name': 'Aaa Corp W'}]) == {'AAA': 'Aaa'}
+
+
+def test_stored_query_is_stale_after_a_rename_or_version_bump(temp_db, monkeypatch):
+    remember_search_queries([{'Symbol': 'AAA', 'Company Name': 'Aaa Corp W', 'SearchQuery': 'Aaa'}])
+    assert lookup_search_queries([{'Symbol': 'AAA', 'Company Name': 'Bbb Corp'}]) == {}
+    monkeypatch.setattr(normalization_store, 'NORMALIZER_VERSION', normalization_store.NORMALIZER_VERSION + 1)
+    assert lookup_search_queries([{'Symbol': 'AAA', 'Company Name': 'Aaa Corp W'}]) == {}
@@ -0,0 +1,44 @@
+import datetime
+import io
+
+import pypdf
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.units import inch
+from reportlab.platypus import PageBreak, Paragraph, SimpleDocTemplate
+
+from price_reversal_core.markdown_flowables import report_styles
+from price_reversal_core.pdf_report_generator import PageFooter
+
+
+def _build(footer, pages=3):
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter, leftMargin=0.5 * inch, rightMargin=0.5 * inch,
+                            topMargin=0.5 * inch, bottomMargin=inch)
+    story = []
+    for page in range(pages):
+        story += [Paragraph(f"Body {page}", report_styles()['Normal']), PageBreak()]
+    doc.build(story[:-1], onFirstPage=footer, onLaterPages=footer)
+    return pypdf.PdfReader(io.BytesIO(buffer.getvalue()))
+
+
+def test_footer_form_is_rendered_once_with_a_fixed_timestamp(monkeypatch):
+    footer = PageFooter(datetime.datetime(2025, 7, 18, 9, 30, 0))
+    renders = []
+    original = PageFooter._render_form
+    monkeypatch.setattr(PageFooter, "_render_form", lambda self, c, d: (renders.append(d.page), original(self, c, d)))
+
+    reader = _build(footer)
+
+    assert renders == [1]
+    for number, page in enumerate(reader.pages, start=1):
+        text = page.extract_text()
+        assert "Generated on: 2025-07-18 09:30:00" in text
+        assert "This content was created with Artificial Intelligence" in text
+        assert f"Page {number}" in text
+
+
+def test_each_document_gets_its_own_form():
+    footer = PageFooter(datetime.datetime(2025, 7, 18))
+    for _ in range(2):
+        reader = _build(footer, pages=1)
+        assert "Generated on: 2025-07-18 00:00:00" in reader.pages[0].extract_text()
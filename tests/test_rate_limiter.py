@@ -0,0 +1,79 @@
+from types import SimpleNamespace
+
+import pytest
+
+from price_reversal_core import rate_limiter
+from price_reversal_core.rate_limiter import TokenBucket
+
+
+class FakeClock:
+    """Stands in for time.monotonic and time.sleep; sleeping advances the clock."""
+
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(rate_limiter, "time", SimpleNamespace(monotonic=fake.monotonic, sleep=fake.sleep))
+    return fake
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_burst_up_to_capacity_then_waits_for_refill(clock):
+    bucket = TokenBucket(rate=2, capacity=3)
+    for _ in range(3):
+        bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.5)]
+
+
+def test_refill_is_capped_at_capacity(clock):
+    bucket = TokenBucket(rate=4, capacity=2)
+    clock.now += 60
+    bucket.acquire()
+    bucket.acquire()
+    assert clock.sleeps == []
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.25)]
+
+
+def test_penalize_halves_rate_and_empties_bucket(clock):
+    bucket = TokenBucket(rate=8, capacity=4, min_rate=3)
+    bucket.penalize()
+    assert bucket.rate == 4
+    bucket.acquire()
+    assert clock.sleeps == [pytest.approx(0.25)]
+    bucket.penalize()
+    assert bucket.rate == 3
+
+
+def test_reward_recovers_toward_configured_rate(clock):
+    bucket = TokenBucket(rate=10)
+    bucket.penalize()
+    bucket.reward()
+    assert bucket.rate == pytest.approx(6)
+    for _ in range(10):
+        bucket.reward()
+    assert bucket.rate == 10
+
+
+def test_default_min_rate(clock):
+    bucket = TokenBucket(rate=16)
+    for _ in range(10):
+        bucket.penalize()
+    assert bucket.rate == 1
@@ -0,0 +1,66 @@
+import threading
+import time
+
+from google.api_core.exceptions import DeadlineExceeded
+
+from price_reversal_core import pdf_report_generator
+from price_reversal_core.pdf_report_generator import _generate_responses
+
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+        self.usage_metadata = None
+
+
+class OutOfOrderModel:
+    """
+    'slow' only answers once 'fast' and 'medium' have finished, so the prompts complete
+    out of order, and only if they really run concurrently. 'timeout' and 'boom' fail.
+    """
+
+    def __init__(self):
+        self.finished = []
+        self.others_done = threading.Event()
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt, request_options=None):
+        task = prompt.split("TASK: ")[1].strip()
+        if task == "timeout":
+            raise DeadlineExceeded("deadline exceeded")
+        if task == "boom":
+            raise ValueError("boom")
+        if task == "slow":
+            assert self.others_done.wait(5), "slow prompt was not run alongside the others"
+        elif task == "medium":
+            time.sleep(0.05)
+        with self._lock:
+            self.finished.append(task)
+            if {"fast", "medium"} <= set(self.finished):
+                self.others_done.set()
+        return Response(f"Answer to {task}")
+
+
+def test_responses_come_back_in_prompt_order_despite_failures(monkeypatch):
+    monkeypatch.setattr(pdf_report_generator, "REPORT_MAX_CONCURRENCY", 5)
+    monkeypatch.setattr(pdf_report_generator, "_call_slots", threading.BoundedSemaphore(5))
+    model = OutOfOrderModel()
+    prompts = ["slow", "timeout", "fast", "boom", "medium"]
+
+    start = time.perf_counter()
+    responses = _generate_responses(model, prompts, "primer", "news", "data")
+
+    assert time.perf_counter() - start < 2
+    assert model.finished.index("slow") > model.finished.index("fast")
+    assert [r["prompt"] for r in responses] == prompts
+    assert [r["response"] for r in responses] == [
+        "Answer to slow",
+        "Content generation timed out.",
+        "Answer to fast",
+        "An unexpected error occurred: boom",
+        "Answer to medium",
+    ]
+
+
+def test_no_prompts_make_no_calls():
+    assert _generate_responses(None, [], "primer", "news", "data") == []
@@ -0,0 +1,115 @@
+import threading
+import time
+
+import pytest
+from reportlab.platypus import Paragraph
+
+from bench_markdown import synthetic_markdown
+from price_reversal_core import pdf_report_generator
+from price_reversal_core.markdown_flowables import markdown_to_paragraphs, report_styles
+from price_reversal_core.pdf_report_generator import DEADLINE_NOTE, StreamingSection, _stream_responses, _stream_section
+
+
+class Chunk:
+    def __init__(self, text):
+        self.text = text
+
+
+class Transport:
+    """Stands in for the gRPC call behind a streaming response."""
+
+    def __init__(self):
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class StreamingResponse:
+    def __init__(self, texts, on_chunk=None):
+        self.texts = texts
+        self.on_chunk = on_chunk
+        self.consumed = 0
+        self._iterator = Transport()
+        self.usage_metadata = None
+
+    def __iter__(self):
+        for text in self.texts:
+            self.consumed += 1
+            if self.on_chunk is not None:
+                self.on_chunk(self.consumed)
+            yield Chunk(text)
+
+
+class StreamingModel:
+    def __init__(self, make_response):
+        self.make_response = make_response
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        self.calls += 1
+        return self.make_response()
+
+
+def _signature(flowables):
+    """Flowable types with paragraph text, enough to compare two conversions."""
+    return [(type(f).__name__, f.text if isinstance(f, Paragraph) else None) for f in flowables]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 1000])
+def test_streamed_section_matches_whole_conversion(chunk_size):
+    text = synthetic_markdown(4, seed=3)
+    section = StreamingSection("prompt", report_styles())
+    for start in range(0, len(text), chunk_size):
+        section.feed(text[start:start + chunk_size])
+    section.finish()
+    assert _signature(section.flowables) == _signature(markdown_to_paragraphs(text, report_styles()))
+
+
+def test_section_past_deadline_never_starts_a_call():
+    model = StreamingModel(lambda: pytest.fail("no call after the deadline"))
+    section = StreamingSection("prompt", report_styles())
+    _stream_section(model, section, "full prompt", deadline=time.perf_counter() - 1)
+    assert model.calls == 0
+    assert section.done
+    assert section.flowables[-1].text == f"<i>{DEADLINE_NOTE}</i>"
+
+
+def test_closed_section_stops_and_closes_its_stream():
+    section = StreamingSection("prompt", report_styles())
+    responses = []
+
+    def make_response():
+        # The report closes the section (at its deadline) while the third chunk is read
+        response = StreamingResponse([f"Line {i}\n\n" for i in range(10)],
+                                     on_chunk=lambda n: section.finish(DEADLINE_NOTE) if n == 3 else None)
+        responses.append(response)
+        return response
+
+    _stream_section(StreamingModel(make_response), section, "full prompt")
+    assert responses[0].consumed == 3
+    assert responses[0]._iterator.cancelled
+
+
+def test_deadline_returns_without_waiting_for_blocked_streams(monkeypatch):
+    monkeypatch.setattr(pdf_report_generator, 'REPORT_MAX_CONCURRENCY', 2)
+    release = threading.Event()
+
+    def make_response():
+        return StreamingResponse(["Intro\n\n", "More\n\n"], on_chunk=lambda n: release.wait(5) if n == 2 else None)
+
+    model = StreamingModel(make_response)
+    start = time.perf_counter()
+    sections = _stream_responses(model, ["a", "b", "c", "d"], "primer", "news", "data", report_styles(),
+                                 deadline=time.perf_counter() + 0.3)
+    elapsed = time.perf_counter() - start
+    try:
+        assert elapsed < 2
+        assert all(section.done for section in sections)
+        # Only the first two sections were started; the queued ones never called Gemini
+        assert model.calls == 2
+        assert [f.text for f in sections[2].flowables] == [f"<i>{DEADLINE_NOTE}</i>"]
+        workers = [t for t in threading.enumerate() if t.name.startswith("report-stream-")]
+        assert workers and all(t.daemon for t in workers)
+    finally:
+        release.set()
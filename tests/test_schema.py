@@ -0,0 +1,79 @@
+import datetime
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_reversal_core.schema import ReversalRecord, records_from_frame, serialize_records, validate_frame
+
+
+def _frame(**overrides):
+    data = {
+        'Symbol': [' AAA', 'BBB', None, 'CCC'],
+        'Company Name': ['Aaa Corp', 'Bbb Inc', 'Nameless', 'Ccc Plc'],
+        'Reversal Date': ['2025-07-18', '2025-07-17', '2025-07-18', 'not a date'],
+        'Direction': ['Up', 'Down', 'Up', 'Up'],
+        'Reversal Price': ['88.35', 12, 1, 2],
+        'HR1 Value': [-0.6, -0.7, -0.8, -0.9],
+        'Last Close Price': [90.1, 11.5, 1, 2],
+    }
+    data.update(overrides)
+    return pd.DataFrame(data)
+
+
+def test_validate_frame_types_columns_and_drops_invalid_rows():
+    df = validate_frame(_frame())
+    assert df['Symbol'].tolist() == ['AAA', 'BBB']
+    assert isinstance(df['Direction'].dtype, pd.CategoricalDtype)
+    assert df['Reversal Price'].dtype == np.float32
+    assert pd.api.types.is_datetime64_any_dtype(df['Reversal Date'])
+
+
+def test_validate_frame_requires_schema_columns():
+    with pytest.raises(ValueError, match=r"Missing columns: \['HR1 Value'\]"):
+        validate_frame(_frame().drop(columns=['HR1 Value']))
+
+
+def test_records_from_frame_converts_values():
+    record = records_from_frame(validate_frame(_frame()))[0]
+    assert record['Symbol'] == 'AAA'
+    assert record['Reversal Date'] == datetime.date(2025, 7, 18)
+    assert record['Reversal Price'] == 88.35
+
+
+def test_record_membership_follows_dict_semantics():
+    record = records_from_frame(validate_frame(_frame(Note=[None, 'x', None, None])))[0]
+    # Columns of the frame are keys even when their value is None
+    assert 'Note' in record and record['Note'] is None
+    assert 'SearchQuery' not in record
+    record['SearchQuery'] = None
+    assert 'SearchQuery' in record
+    assert 'Unknown' not in record
+    assert set(record.keys()) == {key for key in record.keys() if key in record}
+
+
+def test_record_get_and_item_access():
+    record = ReversalRecord(symbol='AAA', company_name='Aaa Corp')
+    assert 'Company Name' in record and 'Direction' not in record
+    assert record.get('Direction', 'n/a') == 'n/a'
+    with pytest.raises(KeyError):
+        record['Unknown']
+    record['Sector'] = 'Tech'
+    assert record['Sector'] == 'Tech' and 'Sector' in record
+
+
+def test_serialized_records_leave_out_empty_schema_columns():
+    record = ReversalRecord(symbol='AAA', reversal_date=datetime.date(2025, 7, 18), extras={'Note': None})
+    record['SearchQuery'] = None
+    assert json.loads(serialize_records([record])) == [{'Symbol': 'AAA', 'Reversal Date': '2025-07-18', 'Note': None}]
+
+
+def test_records_are_smaller_than_row_dicts():
+    df = validate_frame(_frame())
+    records = records_from_frame(df)
+    # A set-once bitmask, not a per-record container, tracks which columns were set
+    assert isinstance(records[0]._set, int)
+    assert not hasattr(records[0], '__dict__')
+    assert sum(sys.getsizeof(record) for record in records) < sum(sys.getsizeof(row) for row in df.to_dict('records'))
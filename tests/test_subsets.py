@@ -0,0 +1,77 @@
+import pandas as pd
+import pytest
+
+from price_reversal_core.subsets import SubsetEngine, SubsetMode, get_subset, get_subsets
+
+
+@pytest.fixture
+def frame():
+    return pd.DataFrame({
+        'Symbol': ['AAA', 'BBB', 'CCC', 'DDD', 'EEE'],
+        'Reversal Date': ['2025-07-17', '2025-07-18', '2025-07-18', '2025-07-18', '2025-07-16'],
+        'Direction': ['Up', 'Down', 'Up', 'Up', 'Down'],
+        'Expected Magnitude %': [5.0, 2.0, 9.0, 4.0, 7.0],
+    })
+
+
+def _mode(**spec):
+    spec.setdefault('columns', ['Symbol', 'Reversal Date'])
+    return SubsetMode('test', spec)
+
+
+def test_latest_filter_keeps_the_newest_date(frame):
+    subset = SubsetEngine(frame).select(_mode(filters=[{'column': 'Reversal Date', 'op': 'latest'}]))
+    assert subset['Symbol'].tolist() == ['BBB', 'CCC', 'DDD']
+    assert pd.api.types.is_datetime64_any_dtype(subset['Reversal Date'])
+
+
+@pytest.mark.parametrize("flt, expected", [
+    ({'column': 'Direction', 'op': 'eq', 'value': 'Up'}, ['AAA', 'CCC', 'DDD']),
+    ({'column': 'Direction', 'op': 'ne', 'value': 'Up'}, ['BBB', 'EEE']),
+    ({'column': 'Expected Magnitude %', 'op': 'gt', 'value': 5}, ['CCC', 'EEE']),
+    ({'column': 'Expected Magnitude %', 'op': 'ge', 'value': 5}, ['AAA', 'CCC', 'EEE']),
+    ({'column': 'Expected Magnitude %', 'op': 'lt', 'value': 4}, ['BBB']),
+    ({'column': 'Expected Magnitude %', 'op': 'le', 'value': 4}, ['BBB', 'DDD']),
+    ({'column': 'Symbol', 'op': 'in', 'value': ['AAA', 'EEE']}, ['AAA', 'EEE']),
+    ({'column': 'Symbol', 'op': 'not_in', 'value': ['AAA', 'EEE']}, ['BBB', 'CCC', 'DDD']),
+    ({'column': 'Reversal Date', 'op': 'ge', 'value': '2025-07-17'}, ['AAA', 'BBB', 'CCC', 'DDD']),
+    ({'column': 'Missing', 'op': 'eq', 'value': 1}, ['AAA', 'BBB', 'CCC', 'DDD', 'EEE']),
+])
+def test_filter_ops(frame, flt, expected):
+    assert SubsetEngine(frame).select(_mode(filters=[flt]))['Symbol'].tolist() == expected
+
+
+def test_sort_limit_and_limit_companies(frame):
+    mode = _mode(sort=[{'column': 'Expected Magnitude %', 'ascending': False}], limit=4)
+    engine = SubsetEngine(frame)
+    assert engine.select(mode)['Symbol'].tolist() == ['CCC', 'EEE', 'AAA', 'DDD']
+    assert engine.select(mode, limit_companies=2)['Symbol'].tolist() == ['CCC', 'EEE']
+
+
+def test_unknown_filter_op_is_rejected():
+    with pytest.raises(ValueError, match="Unknown filter op 'between'"):
+        _mode(filters=[{'column': 'Symbol', 'op': 'between'}])
+
+
+def test_select_projects_columns_and_leaves_the_frame_untouched(frame):
+    original = frame.copy()
+    subset = SubsetEngine(frame).select(_mode(filters=[{'column': 'Reversal Date', 'op': 'latest'}], columns=['Symbol', 'Nope']))
+    assert list(subset.columns) == ['Symbol']
+    pd.testing.assert_frame_equal(frame, original)
+
+
+def test_configured_modes(frame):
+    subsets = get_subsets(frame, ['default', 'big_movers', 'no_such_mode'])
+    assert subsets['default']['Symbol'].tolist() == ['BBB', 'CCC', 'DDD']
+    assert subsets['big_movers']['Symbol'].tolist() == ['CCC', 'DDD', 'BBB']
+    # Unknown modes fall back to default
+    assert subsets['no_such_mode']['Symbol'].tolist() == ['BBB', 'CCC', 'DDD']
+    assert get_subset(frame.iloc[:0]).empty
+
+
+def test_watchlist_without_matches_keeps_the_mode_columns(frame):
+    matched = frame.assign(Symbol=['AAPL', 'AAPL', 'NVDA', 'AAA', 'BBB'])
+    empty = get_subset(frame, 'watchlist:tech_darlings')
+    assert empty.empty
+    assert list(empty.columns) == list(get_subset(matched, 'watchlist:tech_darlings').columns)
+    assert 'Expected Magnitude %' not in empty.columns
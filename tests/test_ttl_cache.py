@@ -0,0 +1,69 @@
+from types import SimpleNamespace
+
+import pytest
+
+from price_reversal_core import ttl_cache
+from price_reversal_core.ttl_cache import TTLCache
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = SimpleNamespace(now=1000.0)
+    monkeypatch.setattr(ttl_cache, "time", SimpleNamespace(time=lambda: fake.now))
+    return fake
+
+
+def _cache(tmp_path, ttl_seconds=60, max_bytes=1000):
+    return TTLCache(str(tmp_path / "cache" / "test.db"), ttl_seconds, max_bytes)
+
+
+def test_round_trip_and_counters(tmp_path, clock):
+    cache = _cache(tmp_path)
+    assert cache.hit_rate() == 0.0
+    assert cache.get("k") is None
+    cache.put("k", "value")
+    assert cache.get("k") == "value"
+    assert cache.get("k") == "value"
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.hit_rate() == pytest.approx(2 / 3)
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = _cache(tmp_path, ttl_seconds=60)
+    cache.put("k", "value")
+    clock.now += 60
+    assert cache.get("k") == "value"
+    clock.now += 1
+    assert cache.get("k") is None
+    # The expired row was deleted, not just skipped
+    clock.now -= 61
+    assert cache.get("k") is None
+
+
+def test_least_recently_read_entries_are_evicted(tmp_path, clock):
+    cache = _cache(tmp_path, max_bytes=10)
+    cache.put("a", "aaaa")
+    clock.now += 1
+    cache.put("b", "bbbb")
+    clock.now += 1
+    assert cache.get("a") == "aaaa"
+    clock.now += 1
+    cache.put("c", "cccc")
+    assert cache.get("b") is None
+    assert cache.get("a") == "aaaa"
+    assert cache.get("c") == "cccc"
+
+
+def test_values_larger_than_the_cache_are_not_stored(tmp_path, clock):
+    cache = _cache(tmp_path, max_bytes=10)
+    cache.put("small", "abc")
+    cache.put("big", "x" * 11)
+    assert cache.get("big") is None
+    assert cache.get("small") == "abc"
+
+
+def test_entries_persist_across_instances(tmp_path, clock):
+    _cache(tmp_path).put("k", "value")
+    cache = _cache(tmp_path)
+    assert cache.get("k") == "value"
+    assert (cache.hits, cache.misses) == (1, 0)
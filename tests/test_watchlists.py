@@ -0,0 +1,45 @@
+import json
+
+import pandas as pd
+import pytest
+
+from price_reversal_core.watchlists import available_watchlists, filter_to_watchlist, load_watchlist, watchlist_path
+
+
+@pytest.fixture
+def config_dir(tmp_path):
+    (tmp_path / "megacaps.json").write_text(json.dumps([{"Ticker": "aapl "}, {"Ticker": "MSFT"}, {"Ticker": ""}]))
+    (tmp_path / "subset_modes.json").write_text(json.dumps({"default": {}}))
+    (tmp_path / "no_tickers.json").write_text(json.dumps([{"Symbol": "AAPL"}]))
+    (tmp_path / "broken.json").write_text("[{")
+    return str(tmp_path)
+
+
+def test_available_watchlists_lists_only_ticker_lists(config_dir):
+    assert available_watchlists(config_dir) == ["megacaps"]
+
+
+def test_load_watchlist_normalizes_symbols(config_dir):
+    assert load_watchlist("megacaps", config_dir) == {"AAPL", "MSFT"}
+
+
+@pytest.mark.parametrize("name", ["../megacaps", "sub/megacaps", "..", "", ".hidden"])
+def test_names_outside_the_config_dir_are_rejected(config_dir, name):
+    with pytest.raises(ValueError, match="Invalid watchlist name"):
+        watchlist_path(name, config_dir)
+
+
+@pytest.mark.parametrize("name, message", [
+    ("missing", "Unknown watchlist"),
+    ("subset_modes", "is not a watchlist"),
+    ("no_tickers", "is not a watchlist"),
+    ("broken", "is not valid JSON"),
+])
+def test_invalid_watchlists_raise_value_error(config_dir, name, message):
+    with pytest.raises(ValueError, match=message):
+        load_watchlist(name, config_dir)
+
+
+def test_filter_to_watchlist_keeps_row_order(config_dir):
+    df = pd.DataFrame({"Symbol": ["MSFT", "XOM", "AAPL"], "Close": [1.0, 2.0, 3.0]})
+    assert filter_to_watchlist(df, "megacaps", config_dir)["Symbol"].tolist() == ["MSFT", "AAPL"]